@@ -14,23 +14,30 @@ _project_root = os.path.abspath(os.path.join(_current_dir, '../../..'))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from poker.game_history import GameHistoryDB
+from poker.game_history import DEFAULT_DB_PATH, GameHistoryReader
 
 
 def _find_latest_game_db() -> Optional[str]:
     """
-    db/ディレクトリから最新のgame_history_*.sqlite3ファイルを検出
+    db/ディレクトリから履歴データベースを検出
+
+    全セッションを記録する game_history.sqlite3 があればそれを使い、
+    なければ旧形式（実行ごとの game_history_*.sqlite3）の最新のファイルを使う
     
     Returns:
-        最新のデータベースファイルのパス、見つからない場合はNone
+        データベースファイルのパス、見つからない場合はNone
     """
     # プロジェクトルートのdb/ディレクトリを確認
     db_dir = os.path.join(_project_root, 'db')
     
     if not os.path.exists(db_dir):
         return None
+
+    store_path = os.path.join(db_dir, os.path.basename(DEFAULT_DB_PATH))
+    if os.path.exists(store_path):
+        return store_path
     
-    # game_history_*.sqlite3 パターンのファイルを検索
+    # 旧形式の game_history_*.sqlite3 パターンのファイルを検索
     pattern = os.path.join(db_dir, 'game_history_*.sqlite3')
     db_files = glob.glob(pattern)
     
@@ -65,13 +72,14 @@ def get_recent_hands(limit: int = 5) -> str:
         if db_path is None:
             return json.dumps({
                 "error": "データベースが見つかりません",
-                "message": "db/ディレクトリにgame_history_*.sqlite3ファイルが存在しません"
+                "message": "db/ディレクトリにgame_history.sqlite3ファイルが存在しません"
             }, ensure_ascii=False, indent=2)
         
-        # データベースに接続
-        db = GameHistoryDB(db_path=db_path)
+        # 読み込み専用で接続（参照するのは最後に開始したセッション = 記録中のゲーム）
+        db = GameHistoryReader(db_path=db_path)
         
         # 最近のハンドを取得
+        session_id = db.session_id
         hands = db.get_recent_hands(limit)
         
         # データベースを閉じる
@@ -80,6 +88,7 @@ def get_recent_hands(limit: int = 5) -> str:
         # 整形して返す
         result = {
             "database_path": db_path,
+            "session_id": session_id,
             "hands_count": len(hands),
             "hands": hands
         }
@@ -1,23 +1,23 @@
 """
 Analyzes the hand for draw potential (flush or straight draws).
 """
-from typing import List, Dict, Any, Set
+import os
+import sys
+from typing import List, Dict, Any
 
-RANKS = '23456789TJQKA'
-RANK_MAP = {rank: i for i, rank in enumerate(RANKS)}
+# プロジェクトルートをパスに追加（agents/ から adk api_server を起動した場合でも poker を読み込めるように）
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.abspath(os.path.join(_current_dir, '../../../..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from poker.evaluator import HandRank, IncrementalHand
+from poker.game_models import Card
 
-def _parse_card(card_str):
-    rank_str = card_str[:-1]
-    suit_str = card_str[-1]
-    rank = rank_str.upper()
-    suit = suit_str.lower()
-    if rank == '10':
-        rank = 'T'
-    return rank, suit
 
 def analyze_draw_potential(hole_cards: List[str], community_cards: List[str]) -> Dict[str, Any]:
     """
-    Identifies flush and open-ended straight draws.
+    Identifies flush and straight draws and counts the cards that complete them.
 
     Args:
         hole_cards: The player's two hole cards.
@@ -30,54 +30,28 @@ def analyze_draw_potential(hole_cards: List[str], community_cards: List[str]) ->
     if len(all_cards) < 4 or len(all_cards) > 6:
         return {"draws": [], "total_outs": 0}
 
-    parsed_cards = [_parse_card(c) for c in all_cards]
+    # The same incremental state the engine carries street by street
+    hand = IncrementalHand(Card.from_str(c) for c in all_cards)
+    state = hand.draws()
     draws = []
-    total_outs = 0
-    all_outs: Set[str] = set()
 
     # 1. Flush Draw Analysis
-    suit_counts = {}
-    for rank, suit in parsed_cards:
-        suit_counts[suit] = suit_counts.get(suit, 0) + 1
-    
-    for suit, count in suit_counts.items():
-        if count == 4:
-            # It's a flush draw
-            outs = 9
-            draws.append({"type": "FLUSH_DRAW", "outs": outs})
-            # Add actual out cards to the set
-            drawn_ranks = {RANK_MAP[r] for r, s in parsed_cards if s == suit}
-            for i in range(len(RANKS)):
-                if i not in drawn_ranks:
-                    all_outs.add(f"{RANKS[i]}{suit}")
+    flush_suit = state["flush_draw"]
+    if flush_suit is not None:
+        suited_ranks = sum(1 for card in hand.cards if card.suit == flush_suit)
+        draws.append({"type": "FLUSH_DRAW", "outs": 13 - suited_ranks})
 
-    # 2. Straight Draw Analysis
-    unique_ranks = sorted(list(set([RANK_MAP[r] for r, s in parsed_cards])))
-    
-    # Open-ended straight draw (OESD)
-    for i in range(len(unique_ranks) - 2):
-        # Check for 4 cards in a 5-card window
-        sub_sequence = unique_ranks[i:i+4]
-        if len(sub_sequence) == 4 and (sub_sequence[3] - sub_sequence[0] == 3):
-            # It's an open-ended draw, e.g., 5,6,7,8
-            low_end = sub_sequence[0]
-            high_end = sub_sequence[3]
-            outs = 0
-            if low_end > 0: # Not a straight starting with 2
-                outs += 4
-            if high_end < 12: # Not a straight ending with Ace
-                outs += 4
-            if outs > 0:
-                draws.append({"type": "OESD", "outs": outs})
-                # This is a simplification; doesn't calculate actual card outs for straights yet
-                # to avoid conflicts with flush draw outs.
+    # 2. Straight Draw Analysis (open-ended/double gutter or gutshot)
+    straight_ranks = state["straight_ranks"]
+    if straight_ranks:
+        # Completing ranks are never already held, so all four suits are live
+        draws.append({"type": state["straight_draw"], "outs": 4 * len(straight_ranks)})
 
-    # Sum up unique outs
-    # For now, we will just sum the raw outs, acknowledging they can overlap
-    # A more advanced version would use the `all_outs` set.
-    total_outs = sum(d['outs'] for d in draws)
+    # Unique outs: cards that complete a straight or better (overlaps counted once)
+    out_cards = hand.outs(target=HandRank.STRAIGHT) if len(all_cards) >= 5 else []
 
     return {
         "draws": draws,
-        "total_outs": total_outs
+        "total_outs": len(out_cards) if out_cards else sum(d["outs"] for d in draws),
+        "out_cards": [str(card) for card in out_cards],
     }
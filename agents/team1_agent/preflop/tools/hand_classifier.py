@@ -2,7 +2,17 @@
 Hand Classifier Tool - ハンド分類
 """
 
-from typing import List, Dict, Any
+import os
+import sys
+from typing import List, Dict, Any, Optional
+
+# プロジェクトルートをパスに追加（agents/ から adk api_server を起動した場合でも poker を読み込めるように）
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.abspath(os.path.join(_current_dir, '../../../..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from poker.preflop_equity import equity_vs_random
 from .hand_category import HandCategory
 
 
@@ -59,6 +69,18 @@ def _convert_to_hand_notation(hole_cards: List[str]) -> str:
         return f"{rank1}{rank2}{suited_suffix}"
 
 
+def _preflop_equity(hand_notation: str) -> Optional[float]:
+    """
+    事前計算テーブルからランダムハンド相手のエクイティを参照
+
+    テーブルが読み込めない場合や手表記が不正な場合は None を返し、分類自体は続ける
+    """
+    try:
+        return round(equity_vs_random(hand_notation), 3)
+    except (OSError, ValueError):
+        return None
+
+
 def classify_hand(hole_cards: List[str], position: str) -> Dict[str, Any]:
     """
     ハンドをカテゴリーで分類し、スコア(0-6)を返す
@@ -93,6 +115,9 @@ def classify_hand(hole_cards: List[str], position: str) -> Dict[str, Any]:
             HandCategory.GRAY: 0,
         }
         
+        # 事前計算テーブルからランダムハンド相手のエクイティを参照
+        preflop_equity = _preflop_equity(hand_notation)
+
         # HandCategoryから手を探す
         for category in HandCategory:
             score = category_score_map[category]
@@ -105,6 +130,7 @@ def classify_hand(hole_cards: List[str], position: str) -> Dict[str, Any]:
                     "hole_cards": hole_cards,
                     "category": category.value,
                     "category_score": score,
+                    "preflop_equity": preflop_equity,
                     "position": position
                 }
         
@@ -113,6 +139,7 @@ def classify_hand(hole_cards: List[str], position: str) -> Dict[str, Any]:
             "hole_cards": hole_cards,
             "category": HandCategory.GRAY.value,
             "category_score": 0,
+            "preflop_equity": preflop_equity,
             "position": position
         }
     
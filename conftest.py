@@ -0,0 +1,19 @@
+"""
+pytest の共通設定
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_history_db(tmp_path, monkeypatch):
+    """
+    既定の履歴DBをテストごとの一時ディレクトリに向ける
+
+    PokerGame などは既定で db/game_history.sqlite3 に記録するため、そのままでは
+    テストのセッションが溜まり、エージェントの履歴ツールが読む最新のセッションになってしまう。
+    tests/ だけでなくルートの test_*.py にも効くよう、プロジェクトルートに置いている。
+    """
+    path = str(tmp_path / "db" / "game_history.sqlite3")
+    monkeypatch.setattr("poker.game_history.DEFAULT_DB_PATH", path)
+    return path
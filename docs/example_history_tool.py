@@ -32,30 +32,18 @@ def analyze_opponent_tendencies(opponent_id: int) -> Dict[str, Any]:
     hands_played = max(stats["hands_played"], 1)  # ゼロ除算回避
     action_counts = stats["action_counts"]
     
-    # 総アクション数
-    total_actions = sum(action_counts.values())
-    
-    # VPIP（自発的に参加した割合）の概算
-    # コール + レイズ + オールイン / 総アクション数
-    voluntary_actions = (
-        action_counts.get("call", 0) + 
-        action_counts.get("raise", 0) + 
-        action_counts.get("all_in", 0)
-    )
-    vpip = voluntary_actions / max(total_actions, 1)
-    
-    # アグレッションファクター（レイズ / コール）
-    raise_count = action_counts.get("raise", 0) + action_counts.get("all_in", 0)
-    call_count = max(action_counts.get("call", 1), 1)  # ゼロ除算回避
-    aggression_factor = raise_count / call_count
-    
-    # ショーダウン傾向
-    showdown_rate = stats["showdowns"] / hands_played
+    # VPIP・アグレッションファクター・WTSD・W$SD は記録のたびに更新される集計テーブルの値
+    # （データがなく計算できない場合は None なので 0 として扱う）
+    vpip = stats["vpip"] or 0.0
+    
+    # アグレッションファクター（フロップ以降の レイズ / コール）
+    aggression_factor = stats["aggression_factor"] or 0.0
+    
+    # ショーダウン傾向（フロップを見たハンドのうちショーダウンまで行った割合）
+    showdown_rate = stats["wtsd"] or 0.0
     
     # ショーダウン勝率
-    win_rate = 0.0
-    if stats["showdowns"] > 0:
-        win_rate = stats["showdown_wins"] / stats["showdowns"]
+    win_rate = stats["wsd"] or 0.0
     
     return {
         "player_id": opponent_id,
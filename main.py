@@ -53,6 +53,14 @@ def setup_logging(uuid_suffix: str = None):
     poker_logger.addHandler(console_handler)
 
 
+def positive_int(value: str) -> int:
+    """1以上の整数だけを受け付ける argparse の型"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
+
+
 def main():
     """メイン関数"""
     # 統一UUIDを生成（DB、ログ、結果ファイルで使用）
@@ -99,6 +107,31 @@ def main():
         default=10,
         help="CPU専用・エージェント専用モードでの最大ハンド数（CPU専用:10、エージェント専用:20）",
     )
+    parser.add_argument(
+        "--duplicate",
+        action="store_true",
+        help="エージェント専用モードをデュプリケート形式で実行（同じ配牌を座席ローテーションごとに配り直して比較）",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="エージェント専用モードの配牌の乱数シード（省略時はランダム）",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="CHECKPOINT",
+        help="中断したエージェント専用モードをチェックポイントから再開（パス省略時は最新のもの）",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=positive_int,
+        default=1,
+        help="エージェント専用モードでチェックポイントを保存する間隔（ハンド数、デフォルト: 1）",
+    )
     parser.add_argument(
         "--display-interval",
         type=int,
@@ -111,7 +144,14 @@ def main():
     setup_logging(unified_uuid)
 
     try:
-        if args.cli:
+        if args.resume:
+            # 中断したエージェント専用モードを再開（設定はチェックポイントから読み込む）
+            ui = PokerUI()
+            ui.run_agent_only_mode(
+                resume_from=args.resume,
+                checkpoint_interval=args.checkpoint_interval,
+            )
+        elif args.cli:
             # CLI モード
             ui = PokerUI()
 
@@ -127,7 +167,21 @@ def main():
                 max_hands = (
                     args.max_hands if args.max_hands is not None else 20
                 )  # エージェント専用モードのデフォルトは20
-                ui.run_agent_only_mode(max_hands=max_hands, agents_config=args.agents, uuid_suffix=unified_uuid)
+                if args.duplicate:
+                    ui.run_duplicate_agent_mode(
+                        max_hands=max_hands,
+                        agents_config=args.agents,
+                        uuid_suffix=unified_uuid,
+                        seed=args.seed,
+                    )
+                else:
+                    ui.run_agent_only_mode(
+                        max_hands=max_hands,
+                        agents_config=args.agents,
+                        uuid_suffix=unified_uuid,
+                        seed=args.seed,
+                        checkpoint_interval=args.checkpoint_interval,
+                    )
             else:
                 # 通常のゲームを実行
                 ui.run_game()
@@ -0,0 +1,201 @@
+"""
+Structured action event log
+
+PokerGame のアクション履歴を型付きのイベント（ActionEvent）として追記専用で保持する。
+表示用の英語文字列（"Player 3 raised to 120" など）は参照されたときにだけ生成し、
+プレイヤーごとの最新のベッティングアクションは索引から O(1) で取得できる。
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .game_models import Card
+
+# プレイヤーのベッティングアクション（最新アクションの索引対象）
+BETTING_ACTIONS = frozenset({"fold", "check", "call", "raise", "all_in"})
+
+
+class ActionEvent:
+    """
+    1件のアクションイベント
+
+    action の種類:
+        small_blind / big_blind / fold / check / call / raise / all_in:
+            seat のプレイヤーのアクション（amount は実際に出した額、raise はレイズ後の総額）
+        deal: コミュニティカードの公開（cards に公開されたカード）
+        note: その他の記録（ショーダウン結果など。text をそのまま表示する）
+    """
+
+    __slots__ = (
+        "hand",
+        "street",
+        "seat",
+        "action",
+        "amount",
+        "pot_after",
+        "cards",
+        "text",
+        "_rendered",
+    )
+    _FIELDS = __slots__[:-1]
+
+    def __init__(
+        self,
+        hand: int,
+        street: str,
+        seat: Optional[int],
+        action: str,
+        amount: int = 0,
+        pot_after: int = 0,
+        cards: Tuple[Card, ...] = (),
+        text: Optional[str] = None,
+    ):
+        self.hand = hand
+        self.street = street
+        self.seat = seat
+        self.action = action
+        self.amount = amount
+        self.pot_after = pot_after
+        self.cards = cards
+        self.text = text
+        self._rendered: Optional[str] = None
+
+    def render(self) -> str:
+        """表示用の文字列を取得（初回参照時に生成して保持する）"""
+        if self._rendered is None:
+            self._rendered = self._format()
+        return self._rendered
+
+    def _format(self) -> str:
+        if self.text is not None:
+            return self.text
+        action = self.action
+        if action == "fold":
+            return f"Player {self.seat} folded"
+        if action == "check":
+            return f"Player {self.seat} checked"
+        if action == "call":
+            return f"Player {self.seat} called {self.amount}"
+        if action == "raise":
+            return f"Player {self.seat} raised to {self.amount}"
+        if action == "all_in":
+            return f"Player {self.seat} went all-in with {self.amount}"
+        if action == "small_blind":
+            return f"Player {self.seat} posted small blind {self.amount}"
+        if action == "big_blind":
+            return f"Player {self.seat} posted big blind {self.amount}"
+        if action == "deal":
+            cards = ", ".join(str(card) for card in self.cards)
+            return f"{self.street.capitalize()} dealt: {cards}"
+        return f"Player {self.seat} {action} {self.amount}"
+
+    def to_dict(self) -> Dict[str, object]:
+        """辞書形式に変換"""
+        return {
+            "hand": self.hand,
+            "street": self.street,
+            "seat": self.seat,
+            "action": self.action,
+            "amount": self.amount,
+            "pot_after": self.pot_after,
+            "cards": [str(card) for card in self.cards],
+            "text": self.render(),
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ActionEvent):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    def __repr__(self) -> str:
+        return f"ActionEvent({self.render()!r}, hand={self.hand}, street={self.street!r})"
+
+
+class ActionLog(Sequence[str]):
+    """
+    追記専用のアクションイベントログ
+
+    従来の文字列リストと同じように len / 添字 / スライス / 反復で表示用の文字列を返すため、
+    既存の表示コードはそのまま使える。構造化されたイベントは events から参照する。
+    """
+
+    def __init__(self, events: Iterable[ActionEvent] = ()):
+        self.events: List[ActionEvent] = []
+        # プレイヤーID -> 最新のベッティングアクション
+        self._latest: Dict[int, ActionEvent] = {}
+        self.extend(events)
+
+    def record(self, event: ActionEvent) -> ActionEvent:
+        """イベントを追記"""
+        self.events.append(event)
+        if event.action in BETTING_ACTIONS:
+            self._latest[event.seat] = event
+        return event
+
+    def append(self, text: str):
+        """自由形式の文字列を記録（従来の action_history.append との互換用）"""
+        self.record(ActionEvent(0, "", None, "note", text=text))
+
+    @classmethod
+    def from_strings(cls, texts: Iterable[str]) -> "ActionLog":
+        """文字列のリストからログを作成（各文字列は note イベントになる）"""
+        log = cls()
+        for text in texts:
+            log.append(text)
+        return log
+
+    def extend(self, events: Iterable[ActionEvent]):
+        """イベントをまとめて追記"""
+        for event in events:
+            self.record(event)
+
+    def latest_for(self, seat: int) -> Optional[ActionEvent]:
+        """プレイヤーの最新のベッティングアクション（なければ None）"""
+        return self._latest.get(seat)
+
+    def truncate(self, length: int):
+        """先頭 length 件だけを残す（スナップショットからの復元用）"""
+        removed = self.events[length:]
+        if not removed:
+            return
+        del self.events[length:]
+        stale = {event.seat for event in removed if event.action in BETTING_ACTIONS}
+        for seat in stale:
+            self._latest.pop(seat, None)
+        # 削除されたプレイヤーの最新アクションを残りの末尾から探し直す
+        for event in reversed(self.events):
+            if not stale:
+                break
+            if event.seat in stale and event.action in BETTING_ACTIONS:
+                self._latest[event.seat] = event
+                stale.discard(event.seat)
+
+    def clear(self):
+        """すべてのイベントを破棄"""
+        self.events.clear()
+        self._latest.clear()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [event.render() for event in self.events[index]]
+        return self.events[index].render()
+
+    def __iter__(self) -> Iterator[str]:
+        for event in self.events:
+            yield event.render()
+
+    def __reversed__(self) -> Iterator[str]:
+        for event in reversed(self.events):
+            yield event.render()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ActionLog):
+            return self.events == other.events
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ActionLog({list(self)!r})"
@@ -3,12 +3,19 @@ CLI User Interface for Poker Game
 """
 
 import json
+import os
+import random
 from pathlib import Path
 from time import sleep
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 from .game import PokerGame, GamePhase
 from .player_models import Player, HumanPlayer, PlayerStatus
 from .evaluator import HandEvaluator
+from .simulation import AgentStats, rotate_seats
+
+# エージェント専用モードのチェックポイント
+CHECKPOINT_DIR = Path("checkpoints")
+CHECKPOINT_VERSION = 1
 
 
 class PokerUI:
@@ -515,16 +522,66 @@ class PokerUI:
             print("ゲームを終了します。")
 
     def run_agent_only_mode(
-        self, max_hands: int = 20, agents_config: str = "team1_agent:2,team2_agent:2", uuid_suffix: str = None
+        self,
+        max_hands: int = 20,
+        agents_config: str = "team1_agent:2,team2_agent:2",
+        uuid_suffix: str = None,
+        seed: Optional[int] = None,
+        resume_from: Optional[str] = None,
+        checkpoint_interval: int = 1,
     ):
         """
         エージェント専用モード - LLMエージェントのみで完全自動進行ゲーム
 
+        checkpoint_interval ハンドごとにチェックポイント（チップ、ボタン位置、ハンド番号、
+        乱数の状態、統計）を checkpoints/ に保存し、中断したランを resume_from から再開できる。
+        ハンドの途中で中断した場合は、そのハンドを最初から（同じ配牌で）やり直す。
+        再開したランは元の履歴セッションに続けて記録し、チェックポイントの後に記録済みのハンドは
+        再実行の前に履歴から削除する（HUD の集計で二重に数えないように）。
+
         Args:
             max_hands: 最大ハンド数（デフォルト20）
             agents_config: エージェント設定（例: "team1_agent:2,team2_agent:1,beginner_agent:1"）
             uuid_suffix: 統一UUID（DB、ログ、結果ファイルで使用）
+            seed: 配牌の乱数シード（None の場合はランダムに決める）
+            resume_from: 再開するチェックポイントのパス（"latest" の場合は最新のもの）。
+                指定した場合、max_hands・agents_config・uuid_suffix・seed はチェックポイントの値を使う
+            checkpoint_interval: チェックポイントを保存する間隔（ハンド数、1以上）
+
+        Raises:
+            ValueError: checkpoint_interval が1未満の場合
         """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+
+        checkpoint = None
+        if resume_from is not None:
+            try:
+                checkpoint_path = (
+                    self._find_latest_checkpoint()
+                    if resume_from == "latest"
+                    else Path(resume_from)
+                )
+                if checkpoint_path is None:
+                    raise FileNotFoundError("checkpoints/ にチェックポイントがありません")
+                checkpoint = self._load_checkpoint(checkpoint_path)
+            except Exception as e:
+                print(f"チェックポイントの読み込みに失敗しました: {e}")
+                return
+            if checkpoint.get("completed"):
+                print(f"このランは完了済みです: {checkpoint_path}")
+                return
+            agents_config = checkpoint["agents_config"]
+            max_hands = checkpoint["max_hands"]
+            uuid_suffix = checkpoint["uuid_suffix"]
+            seed = checkpoint["game"]["seed"]
+            print(f"チェックポイントから再開します: {checkpoint_path}")
+            print(f"完了済み: {checkpoint['hand_count']}ハンド\n")
+        else:
+            checkpoint_path = self._checkpoint_path(uuid_suffix)
+        if seed is None:
+            seed = random.randrange(2**32)
+
         print("=== エージェント専用モード ===")
         print("LLMエージェントのみで完全自動進行します")
         print(f"最大{max_hands}ハンドまで実行します")
@@ -543,23 +600,52 @@ class PokerUI:
             print(f"エージェント設定の解析に失敗しました: {e}")
             return
 
-        # ゲームセットアップ
-        self.game = PokerGame(uuid_suffix=uuid_suffix)
+        # ゲームセットアップ（再開時はチェックポイントと同じ履歴セッションに続けて記録する）
+        history_session_id = checkpoint.get("history_session_id") if checkpoint else None
+        self.game = PokerGame(
+            uuid_suffix=uuid_suffix, seed=seed, history_session_id=history_session_id
+        )
         self.game.setup_configurable_game_with_models(player_configs)
 
-        # 統計情報の初期化
-        player_stats = {}
-        for player in self.game.players:
-            player_stats[player.name] = {
-                "hands_won": 0,
-                "total_winnings": 0,
-                "hands_played": 0,
-                "agent_type": self._get_agent_type_for_player(player, player_configs),
-            }
+        if checkpoint is not None:
+            # チェックポイントの後に記録されたハンドは再実行するので、履歴から消しておく
+            if history_session_id is not None:
+                self.game.db.truncate_session(checkpoint.get("history_last_hand_id"))
+            # チェックポイントの状態と統計を復元
+            self.game.restore_checkpoint_state(checkpoint["game"])
+            player_stats = checkpoint["player_stats"]
+            hand_count = checkpoint["hand_count"]
+        else:
+            # 統計情報の初期化
+            player_stats = {}
+            for player in self.game.players:
+                player_stats[player.name] = {
+                    "hands_won": 0,
+                    "total_winnings": 0,
+                    "hands_played": 0,
+                    "agent_type": self._get_agent_type_for_player(player, player_configs),
+                }
+            hand_count = 0
 
         import time
 
-        hand_count = 0
+        def save_checkpoint(completed: bool = False):
+            self._save_checkpoint(
+                checkpoint_path,
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "uuid_suffix": uuid_suffix,
+                    "agents_config": agents_config,
+                    "max_hands": max_hands,
+                    "hand_count": hand_count,
+                    "completed": completed,
+                    "player_stats": player_stats,
+                    "game": self.game.checkpoint_state(),
+                    "history_session_id": self.game.db.session_id,
+                    "history_last_hand_id": self.game.current_hand_id,
+                },
+            )
+
         try:
             print("ゲーム開始...")
             print("-" * 60)
@@ -676,6 +762,11 @@ class PokerUI:
                             )
                     print("-" * 40)
 
+                if hand_count % checkpoint_interval == 0:
+                    save_checkpoint()
+
+            save_checkpoint(completed=True)
+
             # 最終結果表示
             print(f"\n{'='*70}")
             print(f"エージェント専用モード完了 - {hand_count}ハンド実行")
@@ -746,15 +837,182 @@ class PokerUI:
 
         except KeyboardInterrupt:
             print("\n\nエージェント専用モードを中断しました。")
+            print(f"再開するには: python main.py --resume {checkpoint_path}")
         except Exception as e:
             print(f"\nエラーが発生しました: {e}")
             import traceback
 
             traceback.print_exc()
+            print(f"再開するには: python main.py --resume {checkpoint_path}")
         finally:
             # 結果をテキストファイルに保存
             self._save_agent_only_results(player_stats, agents_config, hand_count, uuid_suffix)
 
+    def run_duplicate_agent_mode(
+        self,
+        max_hands: int = 20,
+        agents_config: str = "team1_agent:2,team2_agent:2",
+        uuid_suffix: str = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, AgentStats]:
+        """
+        デュプリケートモード - 同じ配牌を座席ローテーションごとに配り直してエージェントを比較
+
+        座席ローテーション（プレイヤー数と同じ回数）ごとに同じシードで max_hands ハンドを実行する。
+        毎ハンド全員を初期チップで開始するため、各ローテーションの配牌は完全に同じになり、
+        各エージェントがすべての座席のカードを1回ずつ担当する。収支をローテーション全体で
+        合算することでカード運の影響が打ち消され、通常モードより少ないハンド数で順位が安定する。
+
+        Args:
+            max_hands: 1ローテーションあたりのハンド数（総ハンド数は max_hands × プレイヤー数）
+            agents_config: エージェント設定（例: "team1_agent:2,team2_agent:2"）
+            uuid_suffix: 統一UUID（DB、ログで使用。ローテーションごとに "_r<番号>" を付ける）
+            seed: 配牌の乱数シード（None の場合はランダムに決めて表示する）
+
+        Returns:
+            参加者別の集計統計（同じエージェントが複数いる場合は "team1_agent#1" のように番号付き）
+        """
+        if seed is None:
+            seed = random.randrange(2**32)
+
+        print("=== デュプリケートモード ===")
+        print("同じ配牌を座席ローテーションごとに配り直してエージェントを比較します")
+        print(f"エージェント設定: {agents_config}")
+        print(f"シード: {seed}\n")
+
+        try:
+            player_configs = self._parse_agents_config(agents_config)
+        except Exception as e:
+            print(f"エージェント設定の解析に失敗しました: {e}")
+            return {}
+
+        rotations = len(player_configs)
+        # 同じエージェントを複数席で動かしても別々に集計できるよう、参加者ごとの表示名で集計する
+        entrant_labels = dict(
+            zip(
+                (config["user_id"] for config in player_configs),
+                self._entrant_labels(player_configs),
+            )
+        )
+        agent_stats: Dict[str, AgentStats] = {}
+        hand_count = 0
+        try:
+            for rotation in range(rotations):
+                seat_configs = rotate_seats(player_configs, rotation)
+                suffix = f"{uuid_suffix}_r{rotation}" if uuid_suffix else None
+                self.game = PokerGame(uuid_suffix=suffix, seed=seed)
+                self.game.setup_configurable_game_with_models(seat_configs)
+                labels = [entrant_labels[config["user_id"]] for config in seat_configs]
+                label_by_player = dict(zip(self.game.players, labels))
+                for label in labels:
+                    agent_stats.setdefault(label, AgentStats()).seats += 1
+
+                print(f"--- ローテーション {rotation + 1}/{rotations} ---")
+                print("  " + ", ".join(f"座席{i}: {label}" for i, label in enumerate(labels)))
+
+                rotation_net = {label: 0 for label in labels}
+                for _ in range(max_hands):
+                    for player in self.game.players:
+                        player.chips = self.game.initial_chips
+                    result = self.game.play_hand()
+                    hand_count += 1
+
+                    for player, label in label_by_player.items():
+                        net = player.chips - self.game.initial_chips
+                        agent_stats[label].hands_played += 1
+                        agent_stats[label].net_chips += net
+                        rotation_net[label] += net
+                    if result:
+                        for winner_id in {info["player_id"] for info in result["results"]}:
+                            winner = self.game.get_player(winner_id)
+                            agent_stats[label_by_player[winner]].hands_won += 1
+
+                print(
+                    "  収支: "
+                    + ", ".join(f"{label} {net:+d}" for label, net in rotation_net.items())
+                )
+
+        except KeyboardInterrupt:
+            print("\n\nデュプリケートモードを中断しました。")
+
+        big_blind = self.game.big_blind if self.game else 20
+        print(f"\n{'='*70}")
+        print(f"デュプリケートモード完了 - {hand_count}ハンド実行（{rotations}ローテーション）")
+        print(f"{'='*70}")
+        ranking = sorted(agent_stats.items(), key=lambda item: item[1].net_chips, reverse=True)
+        for i, (label, stats) in enumerate(ranking):
+            print(
+                f"{i+1}位 {label:>15s}: {stats.bb_per_100(big_blind):+8.2f} bb/100 "
+                f"| 収支 {stats.net_chips:+d} | 勝利: {stats.hands_won}/{stats.hands_played}回"
+            )
+        return agent_stats
+
+    @staticmethod
+    def _entrant_labels(player_configs: List[Dict[str, Any]]) -> List[str]:
+        """
+        参加者ごとに重複しない表示名を作成
+
+        1人だけのエージェントはエージェントIDをそのまま使い、
+        複数いるエージェントには登場順に "#1", "#2" ... を付ける。
+
+        Args:
+            player_configs: _parse_agents_config が返すプレイヤー設定のリスト
+
+        Returns:
+            player_configs と同じ順序の表示名リスト
+        """
+        totals: Dict[str, int] = {}
+        for config in player_configs:
+            totals[config["agent_id"]] = totals.get(config["agent_id"], 0) + 1
+
+        seen: Dict[str, int] = {}
+        labels = []
+        for config in player_configs:
+            agent_id = config["agent_id"]
+            if totals[agent_id] == 1:
+                labels.append(agent_id)
+            else:
+                seen[agent_id] = seen.get(agent_id, 0) + 1
+                labels.append(f"{agent_id}#{seen[agent_id]}")
+        return labels
+
+    @staticmethod
+    def _checkpoint_path(uuid_suffix: str = None) -> Path:
+        """エージェント専用モードのチェックポイントファイルのパスを生成"""
+        from datetime import datetime
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if uuid_suffix is None:
+            import uuid
+            uuid_suffix = str(uuid.uuid4())[:4]  # 4桁のUUID
+        return CHECKPOINT_DIR / f"agent_only_{timestamp}_{uuid_suffix}.json"
+
+    @staticmethod
+    def _save_checkpoint(path: Path, data: Dict[str, Any]):
+        """チェックポイントを書き込む（一時ファイルに書いてから置き換えるため、途中で落ちても壊れない）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _load_checkpoint(path: Path) -> Dict[str, Any]:
+        """チェックポイントを読み込む"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {data.get('version')}")
+        return data
+
+    @staticmethod
+    def _find_latest_checkpoint() -> Optional[Path]:
+        """最後に更新されたチェックポイントのパス（なければ None）"""
+        checkpoints = list(CHECKPOINT_DIR.glob("agent_only_*.json"))
+        if not checkpoints:
+            return None
+        return max(checkpoints, key=lambda path: path.stat().st_mtime)
+
     def _save_agent_only_results(self, player_stats: Dict[str, Any], agents_config: str, hand_count: int, uuid_suffix: str = None):
         """エージェント専用モードの結果をテキストファイルに保存"""
         from datetime import datetime
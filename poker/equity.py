@@ -0,0 +1,623 @@
+"""
+Monte Carlo equity engine
+
+残りのデッキからボードのランアウトと相手のホールカードをサンプリングし、
+ヒーローのエクイティ（勝ち + 引き分け時の分配分）を推定する。
+サンプル数・時間予算を指定でき、大きな予算はプロセスプールに分散して実行する。
+残りのランアウトが少ない場合（ターン・リバーやヘッズアップのフロップ）は
+全ランアウトを列挙して厳密なエクイティを求める。
+スートの入れ替えで同型になる状況は同じ正規化キーにまとめ、結果をキャッシュできる。
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .evaluator import BoardState, HandEvaluator, _build_tables
+from .game_models import ALL_CARDS, Card
+
+CardLike = Union[Card, int, str]
+
+# これ未満のサンプル数ではプロセス間通信のコストの方が大きいので同一プロセスで実行する
+PARALLEL_MIN_SAMPLES = 5000
+
+# 1ワーカーあたりの最小サンプル数
+_MIN_CHUNK_SAMPLES = 2000
+
+# 時間予算の確認間隔（サンプル数）
+_DEADLINE_CHECK_INTERVAL = 256
+
+# レンジ同士のカードの衝突で続けて引き直せる回数の上限
+_MAX_REJECTED_DEALS = 100_000
+
+# スート（0〜3）の全置換
+_SUIT_PERMUTATIONS = [tuple(p) for p in permutations(range(4))]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+
+@dataclass
+class EquityResult:
+    """エクイティ推定結果"""
+
+    equity: float  # 勝ち + 引き分け分配を合わせた期待シェア
+    win: float  # 単独で勝つ割合
+    tie: float  # 引き分けになる割合
+    samples: int  # 実際に評価したサンプル数
+    std_error: float  # equity の標準誤差
+    elapsed: float  # 経過時間（秒）
+    exact: bool = False  # 全列挙による厳密値かどうか
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "equity": self.equity,
+            "win": self.win,
+            "tie": self.tie,
+            "samples": self.samples,
+            "std_error": self.std_error,
+            "elapsed": self.elapsed,
+            "exact": self.exact,
+        }
+
+
+def to_card(card: CardLike) -> Card:
+    """Card / 整数表現（0〜51）/ 文字列 を Card に変換"""
+    if isinstance(card, str):
+        return Card.from_str(card)
+    return ALL_CARDS[card]
+
+
+def estimate_equity(
+    hole_cards: Sequence[CardLike],
+    board: Sequence[CardLike] = (),
+    num_opponents: int = 1,
+    opponent_ranges: Optional[Sequence[Sequence[Tuple[CardLike, CardLike]]]] = None,
+    samples: int = 10000,
+    time_budget: Optional[float] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    mode: str = "auto",
+) -> EquityResult:
+    """
+    ヒーローのエクイティを推定（モンテカルロ法または全列挙）
+
+    Args:
+        hole_cards: ヒーローのホールカード（2枚）
+        board: 既に公開されているコミュニティカード（0〜5枚）
+        num_opponents: 相手の人数（opponent_ranges より少ない場合はレンジ数に合わせる）
+        opponent_ranges: 相手ごとのレンジ（ホールカード2枚組のリスト）。
+            先頭から順に相手に割り当て、残りの相手はランダムなハンドとする
+        samples: サンプル数の上限
+        time_budget: 時間予算（秒）。指定時は上限に達する前でも打ち切る
+        workers: プロセス数（None の場合はCPU数、1以下なら同一プロセスで実行）
+        seed: 乱数シード（再現性が必要な場合）
+        mode: "auto"（列挙数が samples 以下なら全列挙）/ "exact" / "monte_carlo"
+
+    Returns:
+        EquityResult: 推定結果
+    """
+    started = time.monotonic()
+    hero, board_cards, ranges, random_opponents = _prepare(
+        hole_cards, board, num_opponents, opponent_ranges
+    )
+    if samples <= 0:
+        raise ValueError("samples must be positive")
+    if mode not in ("auto", "exact", "monte_carlo"):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    if mode == "exact" or (
+        mode == "auto"
+        and enumeration_size(hero, board_cards, ranges, random_opponents) <= samples
+    ):
+        totals = _enumerate_exact(hero, board_cards, ranges, random_opponents)
+        return _summarize(totals, time.monotonic() - started, exact=True)
+
+    deadline = started + time_budget if time_budget is not None else None
+    seed_source = random.Random(seed)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, samples // _MIN_CHUNK_SAMPLES))
+
+    if workers == 1 or samples < PARALLEL_MIN_SAMPLES:
+        totals = _run_chunk(
+            hero,
+            board_cards,
+            ranges,
+            random_opponents,
+            samples,
+            seed_source.getrandbits(64),
+            deadline,
+        )
+    else:
+        executor = _get_executor(workers)
+        chunk_sizes = [samples // workers] * workers
+        for i in range(samples % workers):
+            chunk_sizes[i] += 1
+        futures = [
+            executor.submit(
+                _run_chunk,
+                hero,
+                board_cards,
+                ranges,
+                random_opponents,
+                size,
+                seed_source.getrandbits(64),
+                deadline,
+            )
+            for size in chunk_sizes
+        ]
+        totals = [0, 0.0, 0.0, 0, 0]
+        for future in futures:
+            for i, value in enumerate(future.result()):
+                totals[i] += value
+
+    return _summarize(totals, time.monotonic() - started)
+
+
+def exact_equity(
+    hole_cards: Sequence[CardLike],
+    board: Sequence[CardLike] = (),
+    num_opponents: int = 1,
+    opponent_ranges: Optional[Sequence[Sequence[Tuple[CardLike, CardLike]]]] = None,
+) -> EquityResult:
+    """
+    残りのランアウトと相手ハンドを全列挙して厳密なエクイティを計算
+
+    リバー前の1枚、ターン前の2枚（フロップ時点）などの少数のランアウトを想定している。
+    列挙数は enumeration_size で事前に確認できる。
+    """
+    return estimate_equity(
+        hole_cards,
+        board,
+        num_opponents=num_opponents,
+        opponent_ranges=opponent_ranges,
+        mode="exact",
+    )
+
+
+def enumeration_size(
+    hero: Sequence[int],
+    board: Sequence[int],
+    ranges: Sequence[Sequence[Tuple[int, int]]],
+    random_opponents: int,
+) -> int:
+    """全列挙で評価する（ランアウト × 相手ハンド）の組み合わせ数の上限"""
+    live_count = 52 - len(hero) - len(board)
+    board_needed = 5 - len(board)
+    size = math.comb(live_count, board_needed)
+    for combos in ranges:
+        size *= len(combos)
+    remaining = live_count - board_needed - 2 * len(ranges)
+    for i in range(random_opponents):
+        size *= math.comb(remaining - 2 * i, 2)
+    return size
+
+
+def canonical_key(
+    hole_cards: Sequence[CardLike],
+    board: Sequence[CardLike] = (),
+    opponent_ranges: Optional[Sequence[Sequence[Tuple[CardLike, CardLike]]]] = None,
+) -> Tuple:
+    """
+    スートの入れ替えに対して不変な正規化キーを取得
+
+    例えば Ah Kh / Qh Jd 2c と As Ks / Qs Jc 2d は同じキーになる。
+    ボード内・レンジ内の順序や相手（レンジ）の順序にも依存しない。
+    """
+    hero, board_cards, ranges, _ = _prepare(
+        hole_cards, board, max(1, len(opponent_ranges or ())), opponent_ranges
+    )
+    return _canonical_key(hero, board_cards, ranges)
+
+
+class EquityCache:
+    """
+    正規化キー（スート同型）で引くエクイティ結果の LRU キャッシュ
+
+    キーは (正規化キー, ランダムな相手の人数, モード)。保存した結果は、厳密値か、実際に評価した
+    サンプル数が要求したサンプル数以上の場合だけ再利用する（時間予算で打ち切られた結果を、
+    後から時間予算なしで同じサンプル数を要求した呼び出しに返さないように）。
+    ワーカー数・シードはキーに含めない。
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, EquityResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def estimate(
+        self,
+        hole_cards: Sequence[CardLike],
+        board: Sequence[CardLike] = (),
+        num_opponents: int = 1,
+        opponent_ranges: Optional[Sequence[Sequence[Tuple[CardLike, CardLike]]]] = None,
+        samples: int = 10000,
+        time_budget: Optional[float] = None,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        mode: str = "auto",
+    ) -> EquityResult:
+        """キャッシュを引き、なければ estimate_equity で計算して保存（引数は同じ）"""
+        hero, board_cards, ranges, random_opponents = _prepare(
+            hole_cards, board, num_opponents, opponent_ranges
+        )
+        key = (_canonical_key(hero, board_cards, ranges), random_opponents, mode)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and (cached.exact or cached.samples >= samples):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = estimate_equity(
+            hero,
+            board_cards,
+            num_opponents=len(ranges) + random_opponents,
+            opponent_ranges=ranges,
+            samples=samples,
+            time_budget=time_budget,
+            workers=workers,
+            seed=seed,
+            mode=mode,
+        )
+
+        with self._lock:
+            # 並行して計算された結果のうち、サンプル数の多い方を残す
+            cached = self._entries.get(key)
+            if cached is None or result.exact or result.samples > cached.samples:
+                self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """キャッシュと統計をクリア"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット率などの統計情報"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_default_cache = EquityCache()
+
+
+def cached_equity(
+    hole_cards: Sequence[CardLike],
+    board: Sequence[CardLike] = (),
+    num_opponents: int = 1,
+    opponent_ranges: Optional[Sequence[Sequence[Tuple[CardLike, CardLike]]]] = None,
+    samples: int = 10000,
+    **kwargs,
+) -> EquityResult:
+    """モジュール共通の EquityCache を通して estimate_equity を呼び出す"""
+    return _default_cache.estimate(
+        hole_cards,
+        board,
+        num_opponents=num_opponents,
+        opponent_ranges=opponent_ranges,
+        samples=samples,
+        **kwargs,
+    )
+
+
+def get_default_cache() -> EquityCache:
+    """cached_equity が使用するキャッシュを取得"""
+    return _default_cache
+
+
+def shutdown_pool():
+    """エクイティ計算用のプロセスプールを終了"""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+        _executor_workers = 0
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """プロセスプールを取得（同じプロセス数なら呼び出し間で使い回す）"""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        shutdown_pool()
+        _executor = ProcessPoolExecutor(max_workers=workers, initializer=_build_tables)
+        _executor_workers = workers
+    return _executor
+
+
+def _prepare(
+    hole_cards: Sequence[CardLike],
+    board: Sequence[CardLike],
+    num_opponents: int,
+    opponent_ranges: Optional[Sequence[Sequence[Tuple[CardLike, CardLike]]]],
+):
+    """入力を整数表現に正規化し、矛盾がないか検証"""
+    hero = [int(to_card(card)) for card in hole_cards]
+    board_cards = [int(to_card(card)) for card in board]
+
+    if len(hero) != 2:
+        raise ValueError("hole_cards must contain exactly 2 cards")
+    if len(board_cards) > 5:
+        raise ValueError("board must contain at most 5 cards")
+    if len(set(hero + board_cards)) != len(hero) + len(board_cards):
+        raise ValueError("Duplicate cards in hole_cards/board")
+
+    dead = set(hero) | set(board_cards)
+    ranges: List[List[Tuple[int, int]]] = []
+    for opponent_range in opponent_ranges or []:
+        combos = []
+        for combo in opponent_range:
+            first, second = (int(to_card(card)) for card in combo)
+            if first != second and first not in dead and second not in dead:
+                combos.append((first, second))
+        if not combos:
+            raise ValueError("Opponent range has no combos compatible with known cards")
+        ranges.append(combos)
+    if ranges and next(_opponent_deals(ranges, 0, [], set()), None) is None:
+        raise ValueError("Opponent ranges cannot be dealt together without sharing cards")
+
+    total_opponents = max(num_opponents, len(ranges))
+    if total_opponents < 1:
+        raise ValueError("At least one opponent is required")
+    if total_opponents > 9:
+        raise ValueError("At most 9 opponents are supported")
+
+    random_opponents = total_opponents - len(ranges)
+    return hero, board_cards, ranges, random_opponents
+
+
+def _canonical_key(
+    hero: List[int], board: List[int], ranges: List[List[Tuple[int, int]]]
+) -> Tuple:
+    """全スート置換のうち辞書順最小となる表現をキーとする"""
+    best = None
+    for perm in _SUIT_PERMUTATIONS:
+
+        def remap(card: int) -> int:
+            return card - (card & 3) + perm[card & 3]
+
+        key = (
+            tuple(sorted(remap(card) for card in hero)),
+            tuple(sorted(remap(card) for card in board)),
+        )
+        if best is not None and key > best[:2]:
+            continue
+        if ranges:
+            key += (
+                tuple(
+                    sorted(
+                        tuple(sorted(tuple(sorted(map(remap, combo))) for combo in combos))
+                        for combos in ranges
+                    )
+                ),
+            )
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def _run_chunk(
+    hero: List[int],
+    board: List[int],
+    ranges: List[List[Tuple[int, int]]],
+    random_opponents: int,
+    samples: int,
+    seed: int,
+    deadline: Optional[float],
+) -> Tuple[int, float, float, int, int]:
+    """
+    サンプリングを実行して集計値を返す（プロセスプールのワーカーでも実行される）
+
+    Returns:
+        (サンプル数, シェア合計, シェア二乗合計, 単独勝ち回数, 引き分け回数)
+    """
+    rng = random.Random(seed)
+    prepare_board = HandEvaluator.prepare_board
+    evaluate = HandEvaluator.evaluate_with_board
+    dead = set(hero) | set(board)
+    live = [card for card in range(52) if card not in dead]
+    board_needed = 5 - len(board)
+    draw_count = board_needed + 2 * random_opponents
+
+    done = 0
+    rejected = 0  # 続けて引き直した回数
+    share_sum = 0.0
+    share_sq_sum = 0.0
+    wins = 0
+    ties = 0
+
+    while done < samples:
+        if (
+            deadline is not None
+            and done % _DEADLINE_CHECK_INTERVAL == 0
+            and time.monotonic() > deadline
+            and done > 0
+        ):
+            break
+
+        if ranges:
+            hands = _deal_from_ranges(rng, ranges)
+            if hands is None:
+                # レンジ同士でカードが衝突した場合は引き直す（サンプルが増えなくても時間予算で打ち切る）
+                rejected += 1
+                if rejected >= _MAX_REJECTED_DEALS:
+                    raise ValueError("Opponent ranges can rarely be dealt together")
+                if (
+                    deadline is not None
+                    and rejected % _DEADLINE_CHECK_INTERVAL == 0
+                    and time.monotonic() > deadline
+                ):
+                    break
+                continue
+            rejected = 0
+            taken = {card for hand in hands for card in hand}
+            drawn = rng.sample([card for card in live if card not in taken], draw_count)
+        else:
+            hands = []
+            drawn = rng.sample(live, draw_count)
+
+        for i in range(board_needed, draw_count, 2):
+            hands.append(drawn[i : i + 2])
+
+        board_state = prepare_board(board + drawn[:board_needed])
+        share = _showdown_share(board_state, evaluate(board_state, hero), hands)
+        if share == 1.0:
+            wins += 1
+        elif share:
+            ties += 1
+
+        done += 1
+        share_sum += share
+        share_sq_sum += share * share
+
+    return done, share_sum, share_sq_sum, wins, ties
+
+
+def _enumerate_exact(
+    hero: List[int],
+    board: List[int],
+    ranges: List[List[Tuple[int, int]]],
+    random_opponents: int,
+) -> Tuple[int, float, float, int, int]:
+    """全ランアウト × 全相手ハンドを列挙して集計値を返す（_run_chunk と同じ形式）"""
+    prepare_board = HandEvaluator.prepare_board
+    evaluate = HandEvaluator.evaluate_with_board
+    dead = set(hero) | set(board)
+    live = [card for card in range(52) if card not in dead]
+
+    done = 0
+    share_sum = 0.0
+    share_sq_sum = 0.0
+    wins = 0
+    ties = 0
+
+    for runout in combinations(live, 5 - len(board)):
+        # ボード部分はランアウトごとに1度だけ計算し、各ハンドは2枚分の差分だけ評価する
+        board_state = prepare_board(board + list(runout))
+        hero_strength = evaluate(board_state, hero)
+        for hands in _opponent_deals(ranges, random_opponents, live, set(runout)):
+            share = _showdown_share(board_state, hero_strength, hands)
+            if share == 1.0:
+                wins += 1
+            elif share:
+                ties += 1
+            done += 1
+            share_sum += share
+            share_sq_sum += share * share
+
+    return done, share_sum, share_sq_sum, wins, ties
+
+
+def _opponent_deals(
+    ranges: List[List[Tuple[int, int]]],
+    random_opponents: int,
+    live: List[int],
+    blocked: set,
+):
+    """ランアウト確定後に取り得る相手ハンドの割り当てを全列挙"""
+    if ranges:
+        for first, second in ranges[0]:
+            if first in blocked or second in blocked:
+                continue
+            blocked.add(first)
+            blocked.add(second)
+            for rest in _opponent_deals(ranges[1:], random_opponents, live, blocked):
+                yield [[first, second]] + rest
+            blocked.discard(first)
+            blocked.discard(second)
+    elif random_opponents:
+        available = [card for card in live if card not in blocked]
+        for first, second in combinations(available, 2):
+            blocked.add(first)
+            blocked.add(second)
+            for rest in _opponent_deals(ranges, random_opponents - 1, live, blocked):
+                yield [[first, second]] + rest
+            blocked.discard(first)
+            blocked.discard(second)
+    else:
+        yield []
+
+
+def _showdown_share(
+    board_state: BoardState, hero_strength: int, hands: List[List[int]]
+) -> float:
+    """ヒーローの取り分（負け=0、単独勝ち=1、k人と引き分け=1/(k+1)）"""
+    evaluate = HandEvaluator.evaluate_with_board
+    tied = 0
+    for hand in hands:
+        strength = evaluate(board_state, hand)
+        if strength > hero_strength:
+            return 0.0
+        if strength == hero_strength:
+            tied += 1
+    return 1.0 / (tied + 1)
+
+
+def _deal_from_ranges(
+    rng: random.Random, ranges: List[List[Tuple[int, int]]]
+) -> Optional[List[List[int]]]:
+    """各レンジから1組ずつ選ぶ（カードが衝突した場合は None）"""
+    taken = set()
+    hands = []
+    for combos in ranges:
+        first, second = rng.choice(combos)
+        if first in taken or second in taken:
+            return None
+        taken.add(first)
+        taken.add(second)
+        hands.append([first, second])
+    return hands
+
+
+def _summarize(totals, elapsed: float, exact: bool = False) -> EquityResult:
+    """集計値から EquityResult を作成"""
+    done, share_sum, share_sq_sum, wins, ties = totals
+    if done == 0:
+        return EquityResult(0.0, 0.0, 0.0, 0, 0.0, elapsed, exact)
+
+    mean = share_sum / done
+    if done > 1 and not exact:
+        variance = max(0.0, (share_sq_sum - done * mean * mean) / (done - 1))
+        std_error = math.sqrt(variance / done)
+    else:
+        std_error = 0.0
+
+    return EquityResult(
+        equity=mean,
+        win=wins / done,
+        tie=ties / done,
+        samples=done,
+        std_error=std_error,
+        elapsed=elapsed,
+        exact=exact,
+    )
@@ -1,11 +1,16 @@
 """
 Poker hand evaluation system
+
+役の判定は事前計算したルックアップテーブルで行う。
+- ランク多重集合（各ランクの枚数）を加算キーに写像し、非フラッシュ役の強さを1回の辞書参照で得る
+- スートごとのランクビットマスク（13bit）から、フラッシュ/ストレートフラッシュの強さを配列参照で得る
+5〜7枚のカードは1パスで単一の整数強度に変換され、HandResultはその薄いラッパーとして構築される。
+IncrementalHand はストリートごとに配られたカードを O(1) で積み上げる評価状態を保持する。
 """
 
-from typing import List, Tuple, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 from enum import Enum
-from collections import Counter
-from .game_models import Card
+from .game_models import ALL_CARDS, SUITS, Card, Suit
 
 
 class HandRank(Enum):
@@ -23,6 +28,236 @@ class HandRank(Enum):
     HIGH_CARD = 1
 
 
+# 整数強度のレイアウト: 役カテゴリ(HandRank.value) << 20 | キッカー5個を4bitずつ上位から詰める
+_KICKER_BITS = 4
+_MAX_KICKERS = 5
+_CATEGORY_SHIFT = _KICKER_BITS * _MAX_KICKERS
+
+# 役ごとのキッカー数（HandResult.kickers の長さ）
+_KICKER_COUNTS = {
+    HandRank.ROYAL_FLUSH: 1,
+    HandRank.STRAIGHT_FLUSH: 1,
+    HandRank.FOUR_OF_A_KIND: 2,
+    HandRank.FULL_HOUSE: 2,
+    HandRank.FLUSH: 5,
+    HandRank.STRAIGHT: 1,
+    HandRank.THREE_OF_A_KIND: 3,
+    HandRank.TWO_PAIR: 3,
+    HandRank.ONE_PAIR: 4,
+    HandRank.HIGH_CARD: 5,
+}
+
+# 役ごとに各キッカーが占めるカード枚数（5枚のハンド構築用）
+_KICKER_WIDTHS = {
+    HandRank.FOUR_OF_A_KIND: (4, 1),
+    HandRank.FULL_HOUSE: (3, 2),
+    HandRank.THREE_OF_A_KIND: (3, 1, 1),
+    HandRank.TWO_PAIR: (2, 2, 1),
+    HandRank.ONE_PAIR: (2, 1, 1, 1),
+    HandRank.HIGH_CARD: (1, 1, 1, 1, 1),
+}
+
+# ランク r (2-14) の加算キー。各ランクの枚数は最大4なので5進数の桁として衝突しない
+_RANK_KEYS = [5 ** (rank - 2) for rank in range(2, 15)]
+
+# カードの整数表現（0〜51）ごとの加算キーとランクビット
+_CARD_KEYS = [_RANK_KEYS[index >> 2] for index in range(52)]
+_CARD_BITS = [1 << (index >> 2) for index in range(52)]
+
+# A-5ストレート（ホイール）のビットマスク
+_WHEEL_MASK = (1 << 12) | 0b1111
+
+# 遅延構築されるテーブル
+_STRAIGHT_HIGH: List[int] = []
+_FLUSH_STRENGTH: List[int] = []
+_RANK_STRENGTH: Dict[int, int] = {}
+
+
+def _pack_strength(category: int, kickers: Iterable[int]) -> int:
+    """役カテゴリとキッカーを単一の整数強度に詰める"""
+    strength = category << _CATEGORY_SHIFT
+    shift = _CATEGORY_SHIFT
+    for kicker in kickers:
+        shift -= _KICKER_BITS
+        strength |= kicker << shift
+    return strength
+
+
+def _unpack_strength(strength: int):
+    """整数強度を (HandRank, キッカーのリスト) に戻す"""
+    rank = HandRank(strength >> _CATEGORY_SHIFT)
+    kickers = []
+    shift = _CATEGORY_SHIFT
+    for _ in range(_KICKER_COUNTS[rank]):
+        shift -= _KICKER_BITS
+        kickers.append((strength >> shift) & 0xF)
+    return rank, kickers
+
+
+def _straight_high(mask: int) -> int:
+    """13bitのランクマスクに含まれる最高のストレートのトップランク（なければ0）"""
+    for top in range(12, 3, -1):
+        window = 0b11111 << (top - 4)
+        if mask & window == window:
+            return top + 2
+    if mask & _WHEEL_MASK == _WHEEL_MASK:
+        return 5
+    return 0
+
+
+def _top_ranks(mask: int, count: int) -> List[int]:
+    """ランクマスクから上位 count 個のランクを降順で取得"""
+    ranks = []
+    for bit in range(12, -1, -1):
+        if mask >> bit & 1:
+            ranks.append(bit + 2)
+            if len(ranks) == count:
+                break
+    return ranks
+
+
+def _flush_strength(mask: int) -> int:
+    """同一スート5枚以上のランクマスクからフラッシュ系の強度を計算"""
+    top = _STRAIGHT_HIGH[mask]
+    if top == 14:
+        return _pack_strength(HandRank.ROYAL_FLUSH.value, [14])
+    if top:
+        return _pack_strength(HandRank.STRAIGHT_FLUSH.value, [top])
+    return _pack_strength(HandRank.FLUSH.value, _top_ranks(mask, 5))
+
+
+def _rank_counts_strength(counts: List[int]) -> int:
+    """ランクごとの枚数（インデックス0=2, 12=A）から非フラッシュ役の強度を計算"""
+    ranks_desc = [i + 2 for i in range(12, -1, -1) if counts[i]]
+    quads = [r for r in ranks_desc if counts[r - 2] == 4]
+    trips = [r for r in ranks_desc if counts[r - 2] == 3]
+    pairs = [r for r in ranks_desc if counts[r - 2] == 2]
+
+    if quads:
+        quad = quads[0]
+        kicker = next(r for r in ranks_desc if r != quad)
+        return _pack_strength(HandRank.FOUR_OF_A_KIND.value, [quad, kicker])
+
+    if trips and (len(trips) > 1 or pairs):
+        trip = trips[0]
+        pair = max(trips[1:] + pairs)
+        return _pack_strength(HandRank.FULL_HOUSE.value, [trip, pair])
+
+    mask = 0
+    for r in ranks_desc:
+        mask |= 1 << (r - 2)
+    top = _STRAIGHT_HIGH[mask]
+    if top:
+        return _pack_strength(HandRank.STRAIGHT.value, [top])
+
+    if trips:
+        trip = trips[0]
+        others = [r for r in ranks_desc if r != trip][:2]
+        return _pack_strength(HandRank.THREE_OF_A_KIND.value, [trip] + others)
+
+    if len(pairs) > 1:
+        high, low = pairs[0], pairs[1]
+        kicker = next(r for r in ranks_desc if r != high and r != low)
+        return _pack_strength(HandRank.TWO_PAIR.value, [high, low, kicker])
+
+    if pairs:
+        pair = pairs[0]
+        others = [r for r in ranks_desc if r != pair][:3]
+        return _pack_strength(HandRank.ONE_PAIR.value, [pair] + others)
+
+    return _pack_strength(HandRank.HIGH_CARD.value, ranks_desc[:5])
+
+
+def _build_tables():
+    """ルックアップテーブルを構築（初回評価時に1度だけ実行）"""
+    if _RANK_STRENGTH:
+        return
+
+    _STRAIGHT_HIGH[:] = [_straight_high(mask) for mask in range(1 << 13)]
+    _FLUSH_STRENGTH[:] = [
+        _flush_strength(mask) if mask.bit_count() >= 5 else 0
+        for mask in range(1 << 13)
+    ]
+
+    table: Dict[int, int] = {}
+    counts = [0] * 13
+
+    def enumerate_counts(index: int, remaining: int, key: int):
+        if index < 0:
+            if remaining == 0:
+                table[key] = _rank_counts_strength(counts)
+            return
+        for count in range(min(4, remaining) + 1):
+            counts[index] = count
+            enumerate_counts(index - 1, remaining - count, key + count * _RANK_KEYS[index])
+        counts[index] = 0
+
+    for size in (5, 6, 7):
+        enumerate_counts(12, size, 0)
+
+    _RANK_STRENGTH.update(table)
+
+
+class BoardState(NamedTuple):
+    """ボード部分の事前計算結果（ホールカード分だけを加えて評価するため）"""
+
+    key: int  # ボードのランク加算キー
+    suit_masks: Tuple[int, int, int, int]  # スート別のランクマスク
+    flush_suits: Tuple[int, ...]  # ホールカード2枚を加えるとフラッシュになり得るスート
+
+
+class ShowdownResult(NamedTuple):
+    """複数プレイヤーのショーダウン評価結果"""
+
+    strengths: Dict[Any, int]  # プレイヤー → 整数強度
+    ranking: List[List[Any]]  # 強い順の順位（同じ強さのプレイヤーは同じグループ）
+
+    def winners(self, eligible: Optional[Iterable[Any]] = None) -> List[Any]:
+        """
+        勝者（同点なら複数）を取得
+
+        Args:
+            eligible: 対象プレイヤー（サイドポットの受給資格者など）。None なら全員
+        """
+        if eligible is None:
+            return list(self.ranking[0]) if self.ranking else []
+        eligible = set(eligible)
+        for group in self.ranking:
+            members = [player for player in group if player in eligible]
+            if members:
+                return members
+        return []
+
+
+# NumPy一括評価用のテーブル（初回の evaluate_batch 呼び出し時に構築）
+_BATCH_TABLES: Dict[str, object] = {}
+
+
+def _build_batch_tables():
+    """evaluate_batch 用に、ルックアップテーブルを NumPy 配列へ変換"""
+    import numpy as np
+
+    if _BATCH_TABLES:
+        return _BATCH_TABLES
+    _build_tables()
+
+    keys = np.fromiter(_RANK_STRENGTH.keys(), dtype=np.int64, count=len(_RANK_STRENGTH))
+    values = np.fromiter(
+        _RANK_STRENGTH.values(), dtype=np.int64, count=len(_RANK_STRENGTH)
+    )
+    order = np.argsort(keys)
+    _BATCH_TABLES.update(
+        {
+            "rank_keys": keys[order],
+            "rank_strength": values[order],
+            "flush_strength": np.array(_FLUSH_STRENGTH, dtype=np.int64),
+            "card_keys": np.array(_CARD_KEYS, dtype=np.int64),
+            "card_bits": np.array(_CARD_BITS, dtype=np.int64),
+        }
+    )
+    return _BATCH_TABLES
+
+
 class HandResult:
     """ハンド評価結果"""
 
@@ -38,6 +273,11 @@ class HandResult:
         self.kickers = kickers or []  # 同じランクの場合の比較用
         self.description = description
 
+    @property
+    def strength(self) -> int:
+        """役とキッカーを詰めた整数強度（大きいほど強い）"""
+        return _pack_strength(self.rank.value, self.kickers[:_MAX_KICKERS])
+
     def __lt__(self, other):
         """ハンドの強さを比較（弱い方がTrue）"""
         if self.rank.value != other.rank.value:
@@ -75,10 +315,11 @@ class HandEvaluator:
         Returns:
             HandResult: 最強ハンドの評価結果
         """
-        all_cards = hole_cards + community_cards
+        all_cards = list(hole_cards) + list(community_cards)
 
         if len(all_cards) < 5:
             # 5枚未満の場合はハイカードとして評価
+            all_cards = [ALL_CARDS[card] for card in all_cards]
             sorted_cards = sorted(all_cards, key=lambda c: c.rank, reverse=True)
             return HandResult(
                 HandRank.HIGH_CARD,
@@ -87,139 +328,267 @@ class HandEvaluator:
                 f"High Card: {sorted_cards[0]}",
             )
 
-        # 7枚から最強の5枚の組み合わせを探す
-        from itertools import combinations
+        strength = HandEvaluator.evaluate_strength(all_cards)
+        return HandEvaluator.result_from_strength(strength, all_cards)
+
+    @staticmethod
+    def evaluate_strength(cards: List[Card]) -> int:
+        """
+        5〜7枚のカードを1パスで整数強度に変換する（大きいほど強い）
 
-        best_hand = None
-        for five_cards in combinations(all_cards, 5):
-            hand_result = HandEvaluator._evaluate_five_cards(list(five_cards))
-            if (
-                best_hand is None
-                or hand_result.rank.value > best_hand.rank.value
-                or (hand_result.rank == best_hand.rank and not hand_result < best_hand)
-            ):
-                best_hand = hand_result
+        Args:
+            cards: 評価するカード（5〜7枚、Card または整数表現 0〜51）
 
-        return best_hand
+        Returns:
+            int: 役カテゴリとキッカーを詰めた整数強度
+        """
+        if not _RANK_STRENGTH:
+            _build_tables()
+
+        key = 0
+        suit_masks = [0, 0, 0, 0]
+        for card in cards:
+            key += _CARD_KEYS[card]
+            suit_masks[card & 3] |= _CARD_BITS[card]
+
+        strength = _RANK_STRENGTH[key]
+        for mask in suit_masks:
+            if mask.bit_count() >= 5:
+                flush = _FLUSH_STRENGTH[mask]
+                if flush > strength:
+                    strength = flush
+        return strength
 
     @staticmethod
-    def _evaluate_five_cards(cards: List[Card]) -> HandResult:
-        """5枚のカードからハンドを評価"""
-        if len(cards) != 5:
-            raise ValueError("Must evaluate exactly 5 cards")
+    def prepare_board(board: List[Card]) -> BoardState:
+        """
+        ボードのランクキーとスート別マスクを1度だけ計算する
 
-        # カードをランク順にソート（降順）
-        sorted_cards = sorted(cards, key=lambda c: c.rank, reverse=True)
-        ranks = [c.rank for c in sorted_cards]
-        suits = [c.suit for c in sorted_cards]
+        同じボードで複数のホールカードを評価する場合（ショーダウン、エクイティ計算）に
+        evaluate_with_board と組み合わせて使う。
+        """
+        if not _RANK_STRENGTH:
+            _build_tables()
+
+        key = 0
+        suit_masks = [0, 0, 0, 0]
+        for card in board:
+            key += _CARD_KEYS[card]
+            suit_masks[card & 3] |= _CARD_BITS[card]
+        flush_suits = tuple(
+            suit for suit, mask in enumerate(suit_masks) if mask.bit_count() >= 3
+        )
+        return BoardState(key, tuple(suit_masks), flush_suits)
 
-        # 各ランクの枚数をカウント
-        rank_counts = Counter(ranks)
-        count_values = sorted(rank_counts.values(), reverse=True)
+    @staticmethod
+    def evaluate_with_board(board_state: BoardState, hole_cards: List[Card]) -> int:
+        """
+        事前計算したボードにホールカードを加えた整数強度を計算
 
-        # フラッシュとストレートをチェック
-        is_flush = len(set(suits)) == 1
-        is_straight = HandEvaluator._is_straight(ranks)
+        Args:
+            board_state: prepare_board の結果
+            hole_cards: ホールカード（2枚、ボードと合わせて5〜7枚になること）
 
-        # ロイヤルフラッシュ
-        if is_flush and is_straight and ranks[0] == 14:  # A-K-Q-J-10
-            return HandResult(HandRank.ROYAL_FLUSH, sorted_cards, [14], "Royal Flush")
+        Returns:
+            int: evaluate_strength(hole_cards + board) と同じ整数強度
+        """
+        key = board_state.key
+        for card in hole_cards:
+            key += _CARD_KEYS[card]
+        strength = _RANK_STRENGTH[key]
+
+        for suit in board_state.flush_suits:
+            mask = board_state.suit_masks[suit]
+            for card in hole_cards:
+                if card & 3 == suit:
+                    mask |= _CARD_BITS[card]
+            if mask.bit_count() >= 5:
+                flush = _FLUSH_STRENGTH[mask]
+                if flush > strength:
+                    strength = flush
+        return strength
 
-        # ストレートフラッシュ
-        if is_flush and is_straight:
-            high_card = ranks[0] if ranks != [14, 5, 4, 3, 2] else 5  # A-5 straight
-            return HandResult(
-                HandRank.STRAIGHT_FLUSH,
-                sorted_cards,
-                [high_card],
-                f"Straight Flush: {sorted_cards[0]}-high",
-            )
+    @staticmethod
+    def evaluate_showdown(
+        hands: Dict[Any, List[Card]],
+        board: Union[List[Card], "IncrementalHand", BoardState],
+    ) -> ShowdownResult:
+        """
+        ボードを1度だけ前処理し、各プレイヤーはホールカード2枚分の差分だけ評価する
 
-        # フォーカード
-        if count_values == [4, 1]:
-            four_rank = [rank for rank, count in rank_counts.items() if count == 4][0]
-            kicker = [rank for rank, count in rank_counts.items() if count == 1][0]
-            return HandResult(
-                HandRank.FOUR_OF_A_KIND,
-                sorted_cards,
-                [four_rank, kicker],
-                f"Four of a Kind: {Card.RANK_NAMES[four_rank]}s",
-            )
+        Args:
+            hands: プレイヤー（IDなど）→ ホールカード
+            board: コミュニティカード、またはその IncrementalHand / BoardState
 
-        # フルハウス
-        if count_values == [3, 2]:
-            three_rank = [rank for rank, count in rank_counts.items() if count == 3][0]
-            pair_rank = [rank for rank, count in rank_counts.items() if count == 2][0]
-            return HandResult(
-                HandRank.FULL_HOUSE,
-                sorted_cards,
-                [three_rank, pair_rank],
-                f"Full House: {Card.RANK_NAMES[three_rank]}s over {Card.RANK_NAMES[pair_rank]}s",
+        Returns:
+            ShowdownResult: 各プレイヤーの整数強度と強い順の順位
+        """
+        if isinstance(board, IncrementalHand):
+            board_size = len(board)
+            board_state = board.board_state() if board_size >= 3 else None
+            board_cards = board.cards
+        elif isinstance(board, BoardState):
+            board_size = 5
+            board_state = board
+            board_cards = None
+        else:
+            board_cards = list(board)
+            board_size = len(board_cards)
+            board_state = (
+                HandEvaluator.prepare_board(board_cards) if board_size >= 3 else None
             )
 
-        # フラッシュ
-        if is_flush:
-            return HandResult(
-                HandRank.FLUSH, sorted_cards, ranks, f"Flush: {sorted_cards[0]}-high"
-            )
+        strengths: Dict[Any, int] = {}
+        for player, hole_cards in hands.items():
+            if board_state is not None and board_size + len(hole_cards) >= 5:
+                strengths[player] = HandEvaluator.evaluate_with_board(
+                    board_state, hole_cards
+                )
+            else:
+                # フロップ前など5枚に満たない場合は従来の評価にフォールバック
+                strengths[player] = HandEvaluator.evaluate_hand(
+                    hole_cards, board_cards or []
+                ).strength
+
+        ranking: List[List[Any]] = []
+        previous = None
+        for player in sorted(strengths, key=strengths.get, reverse=True):
+            if strengths[player] == previous:
+                ranking[-1].append(player)
+            else:
+                ranking.append([player])
+                previous = strengths[player]
+        return ShowdownResult(strengths, ranking)
 
-        # ストレート
-        if is_straight:
-            high_card = ranks[0] if ranks != [14, 5, 4, 3, 2] else 5  # A-5 straight
-            return HandResult(
-                HandRank.STRAIGHT,
-                sorted_cards,
-                [high_card],
-                f"Straight: {Card.RANK_NAMES[high_card]}-high",
-            )
+    @staticmethod
+    def evaluate_batch(hole, board):
+        """
+        大量のハンドを NumPy のテーブル参照で一括評価する（NumPyが必要）
 
-        # スリーカード
-        if count_values == [3, 1, 1]:
-            three_rank = [rank for rank, count in rank_counts.items() if count == 3][0]
-            kickers = sorted(
-                [rank for rank, count in rank_counts.items() if count == 1],
-                reverse=True,
-            )
-            return HandResult(
-                HandRank.THREE_OF_A_KIND,
-                sorted_cards,
-                [three_rank] + kickers,
-                f"Three of a Kind: {Card.RANK_NAMES[three_rank]}s",
-            )
+        Args:
+            hole: ホールカードの整数表現（形状 (N, 2)）
+            board: ボードの整数表現（形状 (N, k) または全ハンド共通の (k,)、k は3〜5）
 
-        # ツーペア
-        if count_values == [2, 2, 1]:
-            pairs = sorted(
-                [rank for rank, count in rank_counts.items() if count == 2],
-                reverse=True,
-            )
-            kicker = [rank for rank, count in rank_counts.items() if count == 1][0]
-            return HandResult(
-                HandRank.TWO_PAIR,
-                sorted_cards,
-                pairs + [kicker],
-                f"Two Pair: {Card.RANK_NAMES[pairs[0]]}s and {Card.RANK_NAMES[pairs[1]]}s",
-            )
+        Returns:
+            numpy.ndarray: 各ハンドの整数強度（形状 (N,)、evaluate_strength と同じ値）
 
-        # ワンペア
-        if count_values == [2, 1, 1, 1]:
-            pair_rank = [rank for rank, count in rank_counts.items() if count == 2][0]
-            kickers = sorted(
-                [rank for rank, count in rank_counts.items() if count == 1],
-                reverse=True,
-            )
-            return HandResult(
-                HandRank.ONE_PAIR,
-                sorted_cards,
-                [pair_rank] + kickers,
-                f"One Pair: {Card.RANK_NAMES[pair_rank]}s",
-            )
+        Raises:
+            ValueError: 形状が不正な場合、0〜51 以外のカードや同じハンド内で重複するカードがある場合
+        """
+        import numpy as np
+
+        tables = _build_batch_tables()
+
+        hole = np.asarray(hole, dtype=np.intp)
+        board = np.asarray(board, dtype=np.intp)
+        if hole.ndim != 2:
+            raise ValueError("hole must have shape (N, 2)")
+        if board.ndim == 1:
+            board = np.broadcast_to(board, (hole.shape[0], board.shape[0]))
+        if board.ndim != 2 or board.shape[0] != hole.shape[0]:
+            raise ValueError("board must have shape (N, k) or (k,)")
+
+        cards = np.concatenate([hole, board], axis=1)
+        if not 5 <= cards.shape[1] <= 7:
+            raise ValueError("Each hand must contain 5 to 7 cards")
+        if cards.size and (cards.min() < 0 or cards.max() >= 52):
+            raise ValueError("Cards must be integers from 0 to 51")
+        # 行ごとにソートして隣同士を比べ、ホールカードとボードを含めた重複を検出する
+        ordered = np.sort(cards, axis=1)
+        duplicated = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        if duplicated.any():
+            row = int(np.argmax(duplicated))
+            raise ValueError(f"Duplicate card in hand {row}: {cards[row].tolist()}")
+
+        # 非フラッシュ役: 加算キーをソート済みキー配列から二分探索
+        keys = tables["card_keys"][cards].sum(axis=1)
+        index = np.searchsorted(tables["rank_keys"], keys)
+        strength = tables["rank_strength"][index]
+
+        # フラッシュ系: スートごとのランクマスク（同スート内でビットは重複しないので和=論理和）
+        bits = tables["card_bits"][cards]
+        suits = cards & 3
+        for suit in range(4):
+            mask = np.where(suits == suit, bits, 0).sum(axis=1)
+            np.maximum(strength, tables["flush_strength"][mask], out=strength)
+
+        return strength
+
+    @staticmethod
+    def result_from_strength(strength: int, cards: List[Card]) -> HandResult:
+        """整数強度と元のカードから HandResult（構成5枚・説明文付き）を構築"""
+        rank, kickers = _unpack_strength(strength)
+        cards = [ALL_CARDS[card] for card in cards]
+
+        if rank in (HandRank.ROYAL_FLUSH, HandRank.STRAIGHT_FLUSH, HandRank.FLUSH):
+            # 5枚以上あるスートがフラッシュのスート
+            suit_counts: Dict[Suit, int] = {}
+            for card in cards:
+                suit_counts[card.suit] = suit_counts.get(card.suit, 0) + 1
+            flush_suit = max(suit_counts, key=suit_counts.get)
+            pool = [card for card in cards if card.suit == flush_suit]
+        else:
+            pool = list(cards)
+
+        if rank in (HandRank.ROYAL_FLUSH, HandRank.STRAIGHT_FLUSH, HandRank.STRAIGHT):
+            top = kickers[0]
+            needed = [14 if r == 1 else r for r in range(top, top - 5, -1)]
+            widths = (1, 1, 1, 1, 1)
+        elif rank == HandRank.FLUSH:
+            needed = kickers
+            widths = (1, 1, 1, 1, 1)
+        else:
+            needed = kickers
+            widths = _KICKER_WIDTHS[rank]
+
+        # 同ランクのカードが余る場合は従来どおり後ろ側のカードを採用する
+        chosen: List[Card] = []
+        for needed_rank, width in zip(needed, widths):
+            matches = [card for card in pool if card.rank == needed_rank]
+            chosen.extend(matches[-width:])
+        sorted_cards = sorted(chosen, key=lambda c: c.rank, reverse=True)
 
-        # ハイカード
         return HandResult(
-            HandRank.HIGH_CARD, sorted_cards, ranks, f"High Card: {sorted_cards[0]}"
+            rank,
+            sorted_cards,
+            kickers,
+            HandEvaluator._describe(rank, kickers, sorted_cards),
         )
 
+    @staticmethod
+    def _describe(rank: HandRank, kickers: List[int], sorted_cards: List[Card]) -> str:
+        """役の説明文を作成"""
+        names = Card.RANK_NAMES
+        if rank == HandRank.ROYAL_FLUSH:
+            return "Royal Flush"
+        if rank == HandRank.STRAIGHT_FLUSH:
+            # A-5 のストレートフラッシュ（スティールホイール）は5-high
+            return f"Straight Flush: {names[kickers[0]]}-high"
+        if rank == HandRank.FOUR_OF_A_KIND:
+            return f"Four of a Kind: {names[kickers[0]]}s"
+        if rank == HandRank.FULL_HOUSE:
+            return f"Full House: {names[kickers[0]]}s over {names[kickers[1]]}s"
+        if rank == HandRank.FLUSH:
+            return f"Flush: {sorted_cards[0]}-high"
+        if rank == HandRank.STRAIGHT:
+            return f"Straight: {names[kickers[0]]}-high"
+        if rank == HandRank.THREE_OF_A_KIND:
+            return f"Three of a Kind: {names[kickers[0]]}s"
+        if rank == HandRank.TWO_PAIR:
+            return f"Two Pair: {names[kickers[0]]}s and {names[kickers[1]]}s"
+        if rank == HandRank.ONE_PAIR:
+            return f"One Pair: {names[kickers[0]]}s"
+        return f"High Card: {sorted_cards[0]}"
+
+    @staticmethod
+    def _evaluate_five_cards(cards: List[Card]) -> HandResult:
+        """5枚のカードからハンドを評価"""
+        if len(cards) != 5:
+            raise ValueError("Must evaluate exactly 5 cards")
+
+        strength = HandEvaluator.evaluate_strength(cards)
+        return HandEvaluator.result_from_strength(strength, cards)
+
     @staticmethod
     def _is_straight(ranks: List[int]) -> bool:
         """ストレートかどうかをチェック"""
@@ -277,3 +646,189 @@ class HandEvaluator:
             HandRank.HIGH_CARD: "ハイカード",
         }
         return descriptions.get(hand.rank, "不明なハンド")
+
+
+class IncrementalHand:
+    """
+    ストリートごとにカードを追加していく評価状態
+
+    フロップ・ターン・リバーでカードが配られるたびに add で O(1) 更新し、
+    強度・ドロー・アウツは保持しているランク加算キー・ランク別枚数・
+    スート別枚数・スート別ランクマスク・ランクマスクから直接求める。
+    """
+
+    __slots__ = (
+        "cards",
+        "key",
+        "rank_counts",
+        "suit_counts",
+        "suit_masks",
+        "rank_mask",
+        "card_mask",
+    )
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        if not _RANK_STRENGTH:
+            _build_tables()
+        self.cards: List[Card] = []
+        self.key = 0  # ランク加算キー
+        self.rank_counts = [0] * 13  # ランク別枚数（インデックス0=2, 12=A）
+        self.suit_counts = [0, 0, 0, 0]
+        self.suit_masks = [0, 0, 0, 0]  # スート別のランクマスク
+        self.rank_mask = 0  # 含まれるランクのマスク（ストレート判定用）
+        self.card_mask = 0  # 含まれるカードの52bitマスク（重複検出用）
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: Card) -> "IncrementalHand":
+        """カードを1枚追加（自身を返す）"""
+        card = ALL_CARDS[card]
+        bit = 1 << card
+        if self.card_mask & bit:
+            raise ValueError(f"Duplicate card: {card}")
+        if len(self.cards) >= 7:
+            raise ValueError("A hand holds at most 7 cards")
+
+        rank_bit = _CARD_BITS[card]
+        self.cards.append(card)
+        self.key += _CARD_KEYS[card]
+        self.rank_counts[card >> 2] += 1
+        self.suit_counts[card & 3] += 1
+        self.suit_masks[card & 3] |= rank_bit
+        self.rank_mask |= rank_bit
+        self.card_mask |= bit
+        return self
+
+    def extend(self, cards: Iterable[Card]) -> "IncrementalHand":
+        """複数のカードを追加（自身を返す）"""
+        for card in cards:
+            self.add(card)
+        return self
+
+    def copy(self) -> "IncrementalHand":
+        """状態を複製（ボードの状態から各プレイヤーのハンドを派生させる場合など）"""
+        clone = IncrementalHand.__new__(IncrementalHand)
+        clone.cards = list(self.cards)
+        clone.key = self.key
+        clone.rank_counts = list(self.rank_counts)
+        clone.suit_counts = list(self.suit_counts)
+        clone.suit_masks = list(self.suit_masks)
+        clone.rank_mask = self.rank_mask
+        clone.card_mask = self.card_mask
+        return clone
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def board_state(self) -> BoardState:
+        """保持している状態をボードとして BoardState に変換（再計算なし）"""
+        return BoardState(
+            self.key,
+            tuple(self.suit_masks),
+            tuple(suit for suit, count in enumerate(self.suit_counts) if count >= 3),
+        )
+
+    def __contains__(self, card: Card) -> bool:
+        return bool(self.card_mask >> card & 1)
+
+    @property
+    def strength(self) -> int:
+        """現在のカードの整数強度（5枚以上必要、evaluate_strength と同じ値）"""
+        if len(self.cards) < 5:
+            raise ValueError("At least 5 cards are required to compute strength")
+        return self._strength_with(self.key, self.suit_masks)
+
+    @property
+    def hand_rank(self) -> HandRank:
+        """現在の役カテゴリ"""
+        return HandRank(self.strength >> _CATEGORY_SHIFT)
+
+    def result(self) -> HandResult:
+        """HandResult 形式の評価結果（5枚未満はハイカード扱い）"""
+        if len(self.cards) < 5:
+            return HandEvaluator.evaluate_hand(self.cards, [])
+        return HandEvaluator.result_from_strength(self.strength, self.cards)
+
+    def flush_draw_suit(self) -> Optional[Suit]:
+        """あと1枚でフラッシュになるスート（フラッシュ完成済み・リバー後は None）"""
+        if len(self.cards) >= 7 or max(self.suit_counts) >= 5:
+            return None
+        for suit_index, count in enumerate(self.suit_counts):
+            if count == 4:
+                return SUITS[suit_index]
+        return None
+
+    def straight_draw_ranks(self) -> List[int]:
+        """あと1枚でストレートが完成するランクの一覧（完成済み・リバー後は空）"""
+        if len(self.cards) >= 7 or _STRAIGHT_HIGH[self.rank_mask]:
+            return []
+        return [
+            bit + 2
+            for bit in range(12, -1, -1)
+            if not self.rank_mask >> bit & 1
+            and _STRAIGHT_HIGH[self.rank_mask | 1 << bit]
+        ]
+
+    def draws(self) -> Dict[str, object]:
+        """フラッシュドロー・ストレートドロー（オープンエンド/ガットショット）の判定"""
+        flush_suit = self.flush_draw_suit()
+        straight_ranks = self.straight_draw_ranks()
+        if len(straight_ranks) >= 2:
+            straight_draw = "OESD"
+        elif straight_ranks:
+            straight_draw = "GUTSHOT"
+        else:
+            straight_draw = None
+        return {
+            "flush_draw": flush_suit,
+            "straight_draw": straight_draw,
+            "straight_ranks": straight_ranks,
+        }
+
+    def outs(
+        self, dead_cards: Iterable[Card] = (), target: Optional[HandRank] = None
+    ) -> List[Card]:
+        """
+        次の1枚で役カテゴリが上がる未知のカード
+
+        Args:
+            dead_cards: 既に見えている（山札に残っていない）カード
+            target: 指定時は、この役以上に届くカードのみを数える
+                （例: HandRank.STRAIGHT でストレート・フラッシュ系のドローのアウツ）
+
+        Returns:
+            アウツとなるカードのリスト（5〜6枚の状態でのみ計算、それ以外は空）
+        """
+        if not 5 <= len(self.cards) <= 6:
+            return []
+        current = self.strength >> _CATEGORY_SHIFT
+        if target is not None:
+            current = max(current, target.value - 1)
+        blocked = self.card_mask
+        for card in dead_cards:
+            blocked |= 1 << card
+
+        outs = []
+        suit_masks = list(self.suit_masks)
+        for card in ALL_CARDS:
+            if blocked >> card & 1:
+                continue
+            suit = card & 3
+            original = suit_masks[suit]
+            suit_masks[suit] = original | _CARD_BITS[card]
+            strength = self._strength_with(self.key + _CARD_KEYS[card], suit_masks)
+            suit_masks[suit] = original
+            if strength >> _CATEGORY_SHIFT > current:
+                outs.append(card)
+        return outs
+
+    @staticmethod
+    def _strength_with(key: int, suit_masks: List[int]) -> int:
+        """ランク加算キーとスート別マスクから整数強度を求める"""
+        strength = _RANK_STRENGTH[key]
+        for mask in suit_masks:
+            if mask.bit_count() >= 5:
+                flush = _FLUSH_STRENGTH[mask]
+                if flush > strength:
+                    strength = flush
+        return strength
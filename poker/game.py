@@ -2,13 +2,23 @@
 Texas Hold'em Poker Game Management
 """
 
+import copy
+import functools
 import json
 import random
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Generator, Optional, Tuple
 from enum import Enum
 
-from .game_models import Deck, GamePhase, GameState, PlayerInfo
+from .game_models import (
+    Card,
+    Deck,
+    GamePhase,
+    GameSnapshot,
+    GameState,
+    PlayerInfo,
+    PlayerSnapshot,
+)
 from .player_models import (
     Player,
     HumanPlayer,
@@ -17,8 +27,9 @@ from .player_models import (
     LLMApiPlayer,
     PlayerStatus,
 )
-from .evaluator import HandEvaluator, HandResult
-from .game_history import GameHistoryDB
+from .action_log import ActionEvent, ActionLog
+from .evaluator import HandEvaluator, HandResult, IncrementalHand
+from .game_history import EventBuffer, GameHistoryDB
 
 # ゲーム専用のロガーを設定
 game_logger = logging.getLogger("poker_game")
@@ -34,24 +45,91 @@ if not game_logger.handlers:
     game_logger.addHandler(handler)
 
 
+def _mutates_state(method):
+    """ゲーム状態を変更するメソッド用のデコレータ（終了時に状態バージョンを進める）"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._state_version += 1
+
+    return wrapper
+
+
+def _rng_state(rng) -> Optional[List[Any]]:
+    """乱数生成器の状態をJSONに変換できる形で取得（専用の生成器でなければ None）"""
+    if not isinstance(rng, random.Random):
+        return None
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def _rng_state_from_json(state: List[Any]) -> Tuple:
+    """_rng_state で保存した状態を random.Random.setstate に渡せる形に戻す"""
+    version, internal, gauss_next = state
+    return version, tuple(internal), gauss_next
+
+
 class PokerGame:
     """テキサスホールデムゲーム管理クラス"""
 
     def __init__(
-        self, small_blind: int = 10, big_blind: int = 20, initial_chips: int = 2000, uuid_suffix: str = None
+        self,
+        small_blind: int = 10,
+        big_blind: int = 20,
+        initial_chips: int = 2000,
+        uuid_suffix: str = None,
+        sim_mode: bool = False,
+        event_buffer_size: Optional[int] = 100_000,
+        seed: Optional[int] = None,
+        history_batch_hands: Optional[int] = None,
+        history_async_writes: bool = False,
+        history_session_id: Optional[str] = None,
     ):
+        """
+        Args:
+            small_blind: スモールブラインド額
+            big_blind: ビッグブラインド額
+            initial_chips: 初期チップ
+            uuid_suffix: 履歴データベースのセッションIDの末尾に付ける統一UUID
+            sim_mode: True の場合はヘッドレスのシミュレーションモード
+                （ログ出力を止め、履歴はDBではなくメモリ上の EventBuffer に積む）
+            event_buffer_size: シミュレーションモードで保持するイベント数の上限
+            seed: 乱数シード。指定するとボタン位置・各ハンドのデッキ・ランダムプレイヤーの
+                行動がこのゲーム専用の乱数ストリームから決まり、(seed, hand_number) から
+                任意のハンドを再現できる（None の場合は共有の random モジュールを使う）
+            history_batch_hands: 履歴DBへの書き込みをまとめてコミットするハンド数
+                （None なら書き込みごとにコミットし、進行中のハンドのアクションも
+                エージェントの履歴ツールなど他の接続からすぐに見える。1 ならハンドごと。
+                まとめるのはシミュレーションなど、進行中のハンドを読む必要がない場合のみ）
+            history_async_writes: True の場合は履歴DBへの書き込みを専用スレッドで行い、
+                ゲームの進行がディスクI/Oを待たないようにする（終了時に db.close() が必要）
+            history_session_id: 履歴DBに記録するセッションのID（チェックポイントから再開する場合に
+                元のセッションへ続けて記録する。None の場合は uuid_suffix から新しく作る）
+        """
+        self.sim_mode = sim_mode
+        # ホットパスのログ出力（文字列整形を含む）を行うかどうか
+        self._log_enabled = not sim_mode
+
         self.small_blind = small_blind
         self.big_blind = big_blind
         self.initial_chips = initial_chips
 
-        # プレイヤー管理
-        self.players: List[Player] = []
+        # 乱数（シード指定時はゲーム専用のストリーム）
+        self.seed = seed
+        self.rng = self.rng_stream("game") if seed is not None else random
+
+        # プレイヤー管理（players への代入で座席インデックスも作り直される）
+        self.players = []
         self.dealer_button = 0
         self.current_player_index = 0
 
         # ゲーム状態
-        self.deck = Deck()
+        self.deck = Deck(lazy=sim_mode)  # シミュレーションでは配る分だけ乱数を引く
         self.community_cards = []
+        self.board_hand = IncrementalHand()  # コミュニティカードの評価状態（配るたびに更新）
         self.current_phase = GamePhase.PREFLOP
         self.pot = 0
         self.current_bet = 0  # 現在の最高ベット額
@@ -63,38 +141,185 @@ class PokerGame:
         # このベッティングラウンドでブラインド以外の「ベット/レイズ」が発生したか
         self.has_bet_or_raise_this_round = False
 
-        # アクション履歴
-        self.action_history = []
+        # アクション履歴（構造化イベントログ。文字列は表示時に生成）
+        self.action_history = ActionLog()
+        self._hand_history_start = 0  # 現在のハンドの履歴が始まる位置
 
         # ゲーム統計
         self.game_stats = {"hands_played": 0, "players_eliminated": []}
 
+        # get_llm_game_state のキャッシュ（状態を変更するたびに _state_version が進む）
+        self._state_version = 0
+        self._state_cache: Dict[int, Tuple[int, GameState]] = {}
+        self._shared_state: Optional[
+            Tuple[int, Tuple[str, ...], Tuple[PlayerInfo, ...], Tuple[str, ...]]
+        ] = None
+
         # 最後に実行したショーダウン結果（観戦UI向けに公開するため）
         self.last_showdown_results: Optional[Dict[str, Any]] = None
 
-        # ゲーム履歴データベース
-        self.db = GameHistoryDB(uuid_suffix=uuid_suffix)  # 統一UUID付きで自動作成
+        # ゲーム履歴データベース（シミュレーションモードではメモリ上のバッファ）
+        if sim_mode:
+            self.db = EventBuffer(maxlen=event_buffer_size)
+        else:
+            # 全セッション共通の履歴DBに、統一UUID付きのセッションとして記録
+            self.db = GameHistoryDB(
+                uuid_suffix=uuid_suffix,
+                batch_hands=history_batch_hands,
+                async_writes=history_async_writes,
+                session_id=history_session_id,
+            )
         self.current_hand_id: Optional[int] = None
 
-        game_logger.info(
-            "PokerGame initialized with SB=%d, BB=%d, initial_chips=%d",
-            small_blind,
-            big_blind,
-            initial_chips,
-        )
+        if self._log_enabled:
+            game_logger.info(
+                "PokerGame initialized with SB=%d, BB=%d, initial_chips=%d",
+                small_blind,
+                big_blind,
+                initial_chips,
+            )
+
+    @property
+    def action_history(self) -> ActionLog:
+        """アクション履歴（文字列のシーケンスとしても扱える構造化ログ）"""
+        return self._action_log
+
+    @action_history.setter
+    def action_history(self, history):
+        # 文字列のリストが代入された場合は note イベントとして取り込む
+        if not isinstance(history, ActionLog):
+            history = ActionLog.from_strings(history)
+        self._action_log = history
+
+    @property
+    def players(self) -> List[Player]:
+        """座席順のプレイヤーリスト"""
+        return self._players
+
+    @players.setter
+    def players(self, players: List[Player]):
+        self._players = players
+        self._rebuild_seat_index()
+
+    def _rebuild_seat_index(self):
+        """
+        座席インデックスを作り直す
+
+        プレイヤーID→プレイヤーの対応と、状態ごとの座席ビットセット（bit i = 座席 i）を持つ。
+        ビットセットは Player.status の変更通知で更新されるため、
+        ベッティング中の「次のアクティブな座席」や人数の判定は座席数に依存しない。
+        """
+        players = self._players
+        self._indexed_count = len(players)
+        self._player_by_id: Dict[int, Player] = {}
+        self._seat_by_player: Dict[int, int] = {}
+        self._status_seats = {status: 0 for status in PlayerStatus}
+        for seat, player in enumerate(players):
+            self._player_by_id.setdefault(player.id, player)
+            self._seat_by_player[id(player)] = seat
+            self._status_seats[player.status] |= 1 << seat
+            player._status_listener = self._on_player_status_change
+        self._big_blind_seat: Optional[int] = None
+
+    def _on_player_status_change(self, player: Player, old_status, new_status):
+        """Player.status の変更通知を受けて状態ごとの座席ビットセットを更新"""
+        seat = self._seat_by_player.get(id(player))
+        if seat is None or seat >= len(self._players) or self._players[seat] is not player:
+            # このゲームの座席にいない（別のゲームに移された）プレイヤー
+            player._status_listener = None
+            return
+        bit = 1 << seat
+        if old_status is not None:
+            self._status_seats[old_status] &= ~bit
+        self._status_seats[new_status] |= bit
+
+    def _seats_with(self, *statuses: PlayerStatus) -> int:
+        """指定した状態の座席のビットセット"""
+        if len(self._players) != self._indexed_count:
+            # players.append などで直接追加された場合
+            self._rebuild_seat_index()
+        mask = 0
+        for status in statuses:
+            mask |= self._status_seats[status]
+        return mask
+
+    def _count_seats(self, *statuses: PlayerStatus) -> int:
+        """指定した状態のプレイヤー数"""
+        return self._seats_with(*statuses).bit_count()
+
+    @staticmethod
+    def _iter_seats(mask: int):
+        """ビットセットに含まれる座席を昇順に列挙"""
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _next_seat(self, mask: int, seat: int, include_self: bool = False) -> Optional[int]:
+        """
+        座席順で seat の次にある mask 内の座席（一周して見つからなければ None）
+
+        include_self が True の場合は一周した最後に seat 自身も候補にする。
+        """
+        after = mask >> (seat + 1) << (seat + 1)
+        if after:
+            return (after & -after).bit_length() - 1
+        before = mask & ((1 << (seat + 1 if include_self else seat)) - 1)
+        if before:
+            return (before & -before).bit_length() - 1
+        return None
 
+    def _get_big_blind_seat(self) -> Optional[int]:
+        """ビッグブラインドの座席（_post_blinds で記録した座席を優先して使う）"""
+        seat = self._big_blind_seat
+        if seat is not None and seat < len(self._players) and self._players[seat].is_big_blind:
+            return seat
+        for i, player in enumerate(self._players):
+            if player.is_big_blind:
+                self._big_blind_seat = i
+                return i
+        return None
+
+    @_mutates_state
     def add_player(self, player: Player):
         """プレイヤーを追加"""
         if len(self.players) >= 10:
             raise ValueError("Maximum 10 players allowed")
+        if self.seed is not None and isinstance(player, RandomPlayer):
+            player.rng = self.rng_stream("player", player.id)
         self.players.append(player)
+        self._rebuild_seat_index()
+        # セッションをまたいで同じプレイヤーを集計できるよう、席とプレイヤー名の対応を記録
+        self.db.register_player(player.id, player.name)
 
     def get_player(self, player_id: int) -> Optional[Player]:
         """プレイヤーIDでプレイヤーを取得"""
-        for player in self.players:
-            if player.id == player_id:
-                return player
-        return None
+        if len(self._players) != self._indexed_count:
+            self._rebuild_seat_index()
+        return self._player_by_id.get(player_id)
+
+    def rng_stream(self, name: str, counter: int = 0) -> random.Random:
+        """
+        (seed, name, counter) だけで決まる独立した乱数ストリームを取得
+
+        並列ワーカーやハンドごとに異なる name / counter を使えば系列が重ならず、
+        同じ組み合わせからはプロセスをまたいでも同じ乱数列が得られる。
+        シード未指定のゲームではOSの乱数で初期化したストリームを返す。
+        """
+        if self.seed is None:
+            return random.Random()
+        return random.Random(f"{self.seed}/{name}/{counter}")
+
+    def deck_for_hand(self, hand_number: int) -> Deck:
+        """
+        指定したハンド開始時のデッキを再生成（シード指定時のみ）
+
+        返されるデッキから配る順序は、そのハンドで実際に配られた順序
+        （ホールカード2周 → バーン・フロップ3枚 → バーン・ターン → バーン・リバー）と一致する。
+        """
+        if self.seed is None:
+            raise ValueError("Hands can only be regenerated for seeded games")
+        return Deck(lazy=self.deck.lazy, rng=self.rng_stream("deck", hand_number))
 
     def setup_default_game(self):
         """デフォルトの4人ゲームをセットアップ"""
@@ -104,7 +329,7 @@ class PokerGame:
         self.add_player(RandomPlayer(3, "CPU3", self.initial_chips))
 
         # ディーラーボタンをランダムに決定
-        self.dealer_button = random.randint(0, 3)
+        self.dealer_button = self.rng.randint(0, 3)
 
     def setup_cpu_only_game(self):
         """全プレイヤーがCPU（ランダム）の4人ゲームをセットアップ"""
@@ -114,7 +339,7 @@ class PokerGame:
         self.add_player(RandomPlayer(3, "CPU3", self.initial_chips))
 
         # ディーラーボタンをランダムに決定
-        self.dealer_button = random.randint(0, 3)
+        self.dealer_button = self.rng.randint(0, 3)
 
     def setup_configurable_game(self, player_types: List[str]):
         """
@@ -139,7 +364,7 @@ class PokerGame:
                 raise ValueError(f"Unknown player type: {player_type}")
 
         # ディーラーボタンをランダムに決定
-        self.dealer_button = random.randint(0, len(self.players) - 1)
+        self.dealer_button = self.rng.randint(0, len(self.players) - 1)
 
     def setup_configurable_game_with_models(self, player_configs: List[Dict[str, Any]]):
         """
@@ -188,15 +413,25 @@ class PokerGame:
                 raise ValueError(f"Unknown player type: {player_type}")
 
         # ディーラーボタンをランダムに決定
-        self.dealer_button = random.randint(0, len(self.players) - 1)
+        self.dealer_button = self.rng.randint(0, len(self.players) - 1)
 
+    @_mutates_state
     def start_new_hand(self):
         """新しいハンドを開始"""
+        log_enabled = self._log_enabled
         self.hand_number += 1
-        game_logger.info(f"=== STARTING NEW HAND #{self.hand_number} ===")
+        if log_enabled:
+            game_logger.info(f"=== STARTING NEW HAND #{self.hand_number} ===")
 
+        if self.seed is not None:
+            self.deck.rng = self.rng_stream("deck", self.hand_number)
         self.deck.reset()
+        if self.sim_mode:
+            # シミュレーションでは過去のハンドの履歴を保持しない（メモリを一定に保つ）
+            self.action_history.clear()
+        self._hand_history_start = len(self.action_history)
         self.community_cards = []
+        self.board_hand = IncrementalHand()
         self.current_phase = GamePhase.PREFLOP
         self.pot = 0
         self.current_bet = 0
@@ -212,41 +447,48 @@ class PokerGame:
 
         # アクティブなプレイヤー数をチェック
         active_players = [p for p in self.players if p.status != PlayerStatus.BUSTED]
-        game_logger.info(f"Active players for new hand: {len(active_players)}")
+        if log_enabled:
+            game_logger.info(f"Active players for new hand: {len(active_players)}")
 
         if len(active_players) < 2:
-            game_logger.info("Not enough players - setting phase to FINISHED")
+            if log_enabled:
+                game_logger.info("Not enough players - setting phase to FINISHED")
             self.current_phase = GamePhase.FINISHED
             return
 
         # ディーラーボタンを移動
-        game_logger.info("Moving dealer button")
+        if log_enabled:
+            game_logger.info("Moving dealer button")
         self._move_dealer_button()
 
+        # データベースに新しいハンドを記録（player.idを使用）
+        # ブラインドのアクションをこのハンドに記録するため、ブラインドより先に行う
+        self.current_hand_id = self.db.start_new_hand(
+            small_blind=self.small_blind,
+            big_blind=self.big_blind,
+            dealer_button=self.players[self.dealer_button].id,
+            player_ids=[p.id for p in active_players],
+        )
+        if log_enabled:
+            game_logger.info(
+                f"Started new hand in database: hand_id={self.current_hand_id}"
+            )
+
         # ブラインドを設定
-        game_logger.info("Posting blinds")
+        if log_enabled:
+            game_logger.info("Posting blinds")
         self._post_blinds()
 
         # カードを配る
-        game_logger.info("Dealing hole cards")
+        if log_enabled:
+            game_logger.info("Dealing hole cards")
         self._deal_hole_cards()
 
         # 最初のアクションプレイヤーを設定
-        game_logger.info("Setting first actor for preflop")
+        if log_enabled:
+            game_logger.info("Setting first actor for preflop")
         self._set_first_actor_preflop()
 
-        # データベースに新しいハンドを記録（player.idを使用）
-        active_player_ids = [
-            p.id for p in self.players if p.status != PlayerStatus.BUSTED
-        ]
-        self.current_hand_id = self.db.start_new_hand(
-            small_blind=self.small_blind,
-            big_blind=self.big_blind,
-            dealer_button=self.players[self.dealer_button].id,
-            player_ids=active_player_ids,
-        )
-        game_logger.info(f"Started new hand in database: hand_id={self.current_hand_id}")
-
         self._log_game_state("HAND_STARTED")
 
     def _move_dealer_button(self):
@@ -295,7 +537,11 @@ class PokerGame:
         self.players[sb_pos].is_small_blind = True
         sb_amount = self.players[sb_pos].bet(self.small_blind)
         self.pot += sb_amount
-        self.action_history.append(f"Player {sb_pos} posted small blind {sb_amount}")
+        self.action_history.record(
+            ActionEvent(
+                self.hand_number, "preflop", sb_pos, "small_blind", sb_amount, self.pot
+            )
+        )
         
         # データベースにスモールブラインドを記録（player.idを使用）
         if self.current_hand_id is not None:
@@ -309,12 +555,17 @@ class PokerGame:
             )
 
         self.players[bb_pos].is_big_blind = True
+        self._big_blind_seat = bb_pos
         bb_amount = self.players[bb_pos].bet(self.big_blind)
         self.pot += bb_amount
         self.current_bet = bb_amount
         # ビッグブラインドを最後のレイザーとして設定（プリフロップのベッティング制御のため）
         self.last_raiser_index = bb_pos
-        self.action_history.append(f"Player {bb_pos} posted big blind {bb_amount}")
+        self.action_history.record(
+            ActionEvent(
+                self.hand_number, "preflop", bb_pos, "big_blind", bb_amount, self.pot
+            )
+        )
         
         # データベースにビッグブラインドを記録（player.idを使用）
         if self.current_hand_id is not None:
@@ -366,7 +617,14 @@ class PokerGame:
         """
         LLM用の簡潔なゲーム状態を生成（数値整合性を保証）
         game_state_format.mdの仕様に従う
+
+        状態が変わるまでは同じプレイヤーに対して同じ GameState を返す。
+        GameState は変更不可（リストの項目はタプル）なので、呼び出し元どうしで共有しても安全。
         """
+        cached = self._state_cache.get(player_id)
+        if cached is not None and cached[0] == self._state_version:
+            return cached[1]
+
         player = self.get_player(player_id)
         if player is None:
             raise ValueError(f"Invalid player_id: {player_id}")
@@ -375,45 +633,64 @@ class PokerGame:
         if player.status == PlayerStatus.BUSTED:
             raise ValueError(f"Player {player_id} is busted and cannot get game state")
 
-        # カードを視覚的な記号に変換
-        your_cards = [str(card) for card in player.hole_cards]
-        community = [str(card) for card in self.community_cards]
-
-        # 他プレイヤーの状態（自分以外、バストしたプレイヤーを除く）
-        players_info = []
-        for p in self.players:
-            if p.id != player_id and p.status != PlayerStatus.BUSTED:
-                players_info.append(
-                    PlayerInfo(
-                        id=p.id, chips=p.chips, bet=p.current_bet, status=p.status.value
-                    )
-                )
-
-        # 利用可能なアクション
-        actions = self._get_available_actions(player_id)
+        # 全プレイヤー共通の部分（ボード・公開情報・履歴）は状態ごとに1度だけ作る
+        community, public_players, recent_history = self._get_shared_state()
 
-        # コールに必要な額
-        to_call = max(0, self.current_bet - player.current_bet)
-
-        # 最近のアクション履歴（最新20件）
-        recent_history = self.action_history[-20:] if self.action_history else []
-
-        return GameState(
+        game_state = GameState(
             your_id=player_id,
             phase=self.current_phase.value,
-            your_cards=your_cards,
+            # カードを視覚的な記号に変換
+            your_cards=tuple(str(card) for card in player.hole_cards),
             community=community,
             your_chips=player.chips,
             your_bet_this_round=player.current_bet,
             your_total_bet_this_hand=player.total_bet_this_hand,
             pot=self.pot,
-            to_call=to_call,
+            # コールに必要な額
+            to_call=max(0, self.current_bet - player.current_bet),
             dealer_button=self.dealer_button,
             current_turn=self.current_player_index,
-            players=players_info,
-            actions=actions,
+            # 他プレイヤーの状態（自分以外、バストしたプレイヤーを除く）
+            players=tuple(info for info in public_players if info.id != player_id),
+            # 利用可能なアクション
+            actions=tuple(self._get_available_actions(player_id)),
             history=recent_history,
         )
+        self._state_cache[player_id] = (self._state_version, game_state)
+        return game_state
+
+    def get_llm_game_state_json(self, player_id: int) -> str:
+        """get_llm_game_state のJSON文字列（状態が変わるまでキャッシュされる）"""
+        return self.get_llm_game_state(player_id).to_json()
+
+    def invalidate_state_cache(self):
+        """
+        ゲーム状態のキャッシュを無効化
+
+        PokerGame のメソッドを経由せずにプレイヤーのチップなどを直接書き換えた場合に呼ぶ。
+        """
+        self._state_version += 1
+
+    def _get_shared_state(
+        self,
+    ) -> Tuple[Tuple[str, ...], Tuple[PlayerInfo, ...], Tuple[str, ...]]:
+        """ボードの文字列・バストしていないプレイヤーの公開情報・最近の履歴（最新20件）"""
+        shared = self._shared_state
+        if shared is None or shared[0] != self._state_version:
+            shared = (
+                self._state_version,
+                tuple(str(card) for card in self.community_cards),
+                tuple(
+                    PlayerInfo(
+                        id=p.id, chips=p.chips, bet=p.current_bet, status=p.status.value
+                    )
+                    for p in self.players
+                    if p.status != PlayerStatus.BUSTED
+                ),
+                tuple(self.action_history[-20:]),
+            )
+            self._shared_state = shared
+        return shared[1], shared[2], shared[3]
 
     def _get_available_actions(self, player_id: int) -> List[str]:
         """プレイヤーが利用可能なアクションリストを取得"""
@@ -452,11 +729,7 @@ class PokerGame:
             and to_call == 0
             and self.current_bet == self.big_blind
         ):
-            bb_index = None
-            for i, p in enumerate(self.players):
-                if p.is_big_blind:
-                    bb_index = i
-                    break
+            bb_index = self._get_big_blind_seat()
             is_big_blind_option = bb_index is not None and player_id == bb_index
 
         # 最低レイズ（総額）。オープンベット時はBB、既存ベットがある場合は current_bet + BB
@@ -481,6 +754,7 @@ class PokerGame:
 
         return actions
 
+    @_mutates_state
     def process_player_action(
         self, player_id: int, action: str, amount: int = 0
     ) -> bool:
@@ -490,65 +764,71 @@ class PokerGame:
         Returns:
             bool: アクションが正常に処理されたかどうか
         """
-        game_logger.info(
-            f">>> PROCESS_ACTION: Player {player_id} attempts '{action}' with amount {amount}"
-        )
-        self._log_game_state("BEFORE_ACTION")
+        if self._log_enabled:
+            game_logger.info(
+                f">>> PROCESS_ACTION: Player {player_id} attempts '{action}' with amount {amount}"
+            )
+            self._log_game_state("BEFORE_ACTION")
 
         if player_id != self.current_player_index:
-            game_logger.warning(
-                f"Player {player_id} tried to act but current player is {self.current_player_index}"
-            )
+            if self._log_enabled:
+                game_logger.warning(
+                    f"Player {player_id} tried to act but current player is {self.current_player_index}"
+                )
             return False
 
         player = self.get_player(player_id)
         if player is None:
-            game_logger.error(f"Player {player_id} not found")
+            if self._log_enabled:
+                game_logger.error(f"Player {player_id} not found")
             return False
         if player.status != PlayerStatus.ACTIVE:
-            game_logger.warning(
-                f"Player {player_id} is not active (status: {player.status})"
-            )
+            if self._log_enabled:
+                game_logger.warning(
+                    f"Player {player_id} is not active (status: {player.status})"
+                )
             return False
 
-        action_description = ""
+        # 記録するアクションの種類と額
+        recorded_action, recorded_amount = action, 0
 
         if action == "fold":
             player.fold()
-            action_description = f"Player {player_id} folded"
 
         elif action == "check":
             if self.current_bet > player.current_bet:
-                game_logger.warning(
-                    f"Player {player_id} cannot check - current bet {self.current_bet} > player bet {player.current_bet}"
-                )
+                if self._log_enabled:
+                    game_logger.warning(
+                        f"Player {player_id} cannot check - current bet {self.current_bet} > player bet {player.current_bet}"
+                    )
                 return False  # チェックできない状況
-            action_description = f"Player {player_id} checked"
 
         elif action == "call":
             to_call = self.current_bet - player.current_bet
             # テキサスホールデムでは to_call == 0 のとき、"call" は実質的に "check" と同義
             if to_call <= 0:
-                action_description = f"Player {player_id} checked"
+                recorded_action = "check"
             else:
                 if player.chips < to_call:
-                    game_logger.warning(
-                        f"Player {player_id} cannot call - to_call: {to_call}, chips: {player.chips}"
-                    )
+                    if self._log_enabled:
+                        game_logger.warning(
+                            f"Player {player_id} cannot call - to_call: {to_call}, chips: {player.chips}"
+                        )
                     return False
 
                 actual_call = player.bet(to_call)
                 self.pot += actual_call
-                action_description = f"Player {player_id} called {actual_call}"
+                recorded_amount = actual_call
 
         elif action == "raise":
             to_call = self.current_bet - player.current_bet
             total_needed = to_call + amount
 
             if player.chips < total_needed:
-                game_logger.warning(
-                    f"Player {player_id} cannot raise - needs {total_needed}, has {player.chips}"
-                )
+                if self._log_enabled:
+                    game_logger.warning(
+                        f"Player {player_id} cannot raise - needs {total_needed}, has {player.chips}"
+                    )
                 return False
 
             actual_bet = player.bet(total_needed)
@@ -556,13 +836,14 @@ class PokerGame:
             self.current_bet = player.current_bet
             self.last_raiser_index = player_id
             self.has_bet_or_raise_this_round = True
-            action_description = f"Player {player_id} raised to {self.current_bet}"
+            recorded_amount = self.current_bet
 
         elif action == "all_in":
             if player.chips <= 0:
-                game_logger.warning(
-                    f"Player {player_id} cannot go all-in - no chips left"
-                )
+                if self._log_enabled:
+                    game_logger.warning(
+                        f"Player {player_id} cannot go all-in - no chips left"
+                    )
                 return False
 
             actual_bet = player.bet(player.chips)
@@ -575,15 +856,26 @@ class PokerGame:
                 self.has_bet_or_raise_this_round = True
 
             player.status = PlayerStatus.ALL_IN
-            action_description = f"Player {player_id} went all-in with {actual_bet}"
+            recorded_amount = actual_bet
 
         else:
-            game_logger.error(f"Unknown action: {action}")
+            if self._log_enabled:
+                game_logger.error(f"Unknown action: {action}")
             return False
 
         # アクション履歴に追加
-        self.action_history.append(action_description)
-        game_logger.info(f"ACTION_EXECUTED: {action_description}")
+        event = self.action_history.record(
+            ActionEvent(
+                self.hand_number,
+                self.current_phase.value,
+                player_id,
+                recorded_action,
+                recorded_amount,
+                self.pot,
+            )
+        )
+        if self._log_enabled:
+            game_logger.info(f"ACTION_EXECUTED: {event.render()}")
 
         # データベースにアクションを記録
         if self.current_hand_id is not None:
@@ -598,105 +890,119 @@ class PokerGame:
                 pot_after=self.pot,
             )
 
-        self._log_game_state("AFTER_ACTION", f"Action: {action_description}")
+        if self._log_enabled:
+            self._log_game_state("AFTER_ACTION", f"Action: {event.render()}")
 
         # 次のプレイヤーに移動
-        game_logger.info(">>> ADVANCING to next player")
+        if self._log_enabled:
+            game_logger.info(">>> ADVANCING to next player")
         self._advance_to_next_player()
 
         # ベッティングラウンド完了チェック
-        game_logger.info(">>> CHECKING betting round completion")
+        if self._log_enabled:
+            game_logger.info(">>> CHECKING betting round completion")
         self._check_betting_round_complete()
 
-        self._log_game_state(
-            "AFTER_BETTING_CHECK", f"Betting complete: {self.betting_round_complete}"
-        )
+        if self._log_enabled:
+            self._log_game_state(
+                "AFTER_BETTING_CHECK", f"Betting complete: {self.betting_round_complete}"
+            )
 
         return True
 
+    @_mutates_state
     def _advance_to_next_player(self):
         """次のアクティブプレイヤーに移動（座席順序を維持）"""
-        game_logger.debug("_advance_to_next_player called")
+        if self._log_enabled:
+            game_logger.debug("_advance_to_next_player called")
 
-        # アクティブプレイヤー（アクションが必要なプレイヤー）を確認
-        active_players = [
-            i for i, p in enumerate(self.players) if p.status == PlayerStatus.ACTIVE
-        ]
+            # アクティブプレイヤー（アクションが必要なプレイヤー）を確認
+            active_players = list(self._iter_seats(self._seats_with(PlayerStatus.ACTIVE)))
 
-        game_logger.debug(f"Active players: {active_players}")
+            game_logger.debug(f"Active players: {active_players}")
 
-        # 座席順序を維持して次のアクティブプレイヤーを探す
+        # 座席順序を維持して次のアクティブプレイヤーを探す（一周したら自分自身）
         old_player = self.current_player_index
-        total_players = len(self.players)
-
-        # 現在のプレイヤーの次から順番に探す
-        for i in range(1, total_players + 1):
-            next_index = (self.current_player_index + i) % total_players
-            next_player = self.players[next_index]
-
-            # アクティブなプレイヤーが見つかった場合
-            if next_player.status == PlayerStatus.ACTIVE:
-                self.current_player_index = next_index
+        next_index = self._next_seat(
+            self._seats_with(PlayerStatus.ACTIVE), old_player, include_self=True
+        )
+        if next_index is not None:
+            self.current_player_index = next_index
+            if self._log_enabled:
                 game_logger.info(
                     f"Advanced from player {old_player} to player {self.current_player_index} (seat order)"
                 )
-                return
+            return
 
         # ここに到達した場合はアクティブプレイヤーが見つからなかった
-        game_logger.warning(
-            "No active player found in seat order - marking betting round complete"
-        )
+        if self._log_enabled:
+            game_logger.warning(
+                "No active player found in seat order - marking betting round complete"
+            )
         self.betting_round_complete = True
 
     def _check_betting_round_complete(self):
         """ベッティングラウンドが完了したかチェック（座席順序ベース）"""
-        game_logger.debug("_check_betting_round_complete called")
+        log_enabled = self._log_enabled
+        if log_enabled:
+            game_logger.debug("_check_betting_round_complete called")
 
-        active_players = [p for p in self.players if p.status == PlayerStatus.ACTIVE]
-        all_in_players = [p for p in self.players if p.status == PlayerStatus.ALL_IN]
+        active_seats = self._seats_with(PlayerStatus.ACTIVE)
+        active_count = active_seats.bit_count()
+        all_in_count = self._count_seats(PlayerStatus.ALL_IN)
 
-        game_logger.debug(
-            f"Active: {len(active_players)}, All-in: {len(all_in_players)}"
-        )
+        if log_enabled:
+            game_logger.debug(f"Active: {active_count}, All-in: {all_in_count}")
 
         # 1人しか残っていない場合
-        if len(active_players) + len(all_in_players) <= 1:
-            game_logger.info("Betting complete: Only 1 or fewer players remaining")
+        if active_count + all_in_count <= 1:
+            if log_enabled:
+                game_logger.info("Betting complete: Only 1 or fewer players remaining")
             self.betting_round_complete = True
             return
 
         # アクティブプレイヤーがいない場合（全員フォールドまたはオールイン）
-        if len(active_players) == 0:
-            game_logger.info("Betting complete: No active players")
+        if active_count == 0:
+            if log_enabled:
+                game_logger.info("Betting complete: No active players")
             self.betting_round_complete = True
             return
 
         # アクティブプレイヤーが1人の場合の特別処理
-        if len(active_players) == 1:
+        if active_count == 1:
             # その1人がまだベットをマッチしていない場合は継続
-            single_player = active_players[0]
+            single_player = self.players[active_seats.bit_length() - 1]
             if single_player.current_bet < self.current_bet:
-                game_logger.debug(
-                    f"Single active player {single_player.name} needs to match bet: {single_player.current_bet} < {self.current_bet}"
-                )
+                if log_enabled:
+                    game_logger.debug(
+                        f"Single active player {single_player.name} needs to match bet: {single_player.current_bet} < {self.current_bet}"
+                    )
                 return
             else:
                 # ベットをマッチしている場合は終了
-                game_logger.info(
-                    "Betting complete: Single active player has matched the bet"
-                )
+                if log_enabled:
+                    game_logger.info(
+                        "Betting complete: Single active player has matched the bet"
+                    )
                 self.betting_round_complete = True
                 return
 
         # アクティブなプレイヤーが全員同じベット額でない場合は継続
-        player_bets = [p.current_bet for p in active_players]
-        all_same_bet = all(p.current_bet == self.current_bet for p in active_players)
-        game_logger.debug(
-            f"Player bets: {player_bets}, Current bet: {self.current_bet}, All same: {all_same_bet}"
+        players = self.players
+        current_bet = self.current_bet
+        all_same_bet = all(
+            players[seat].current_bet == current_bet
+            for seat in self._iter_seats(active_seats)
         )
+        if log_enabled:
+            player_bets = [players[seat].current_bet for seat in self._iter_seats(active_seats)]
+            game_logger.debug(
+                f"Player bets: {player_bets}, Current bet: {self.current_bet}, All same: {all_same_bet}"
+            )
 
         if not all_same_bet:
-            game_logger.debug("Betting continues: Not all players have same bet")
+            if log_enabled:
+                game_logger.debug("Betting continues: Not all players have same bet")
             return
 
         # 全員が同じベット額の場合、ベッティングラウンド完了の条件をチェック
@@ -704,16 +1010,16 @@ class PokerGame:
         if self.last_raiser_index is not None and getattr(
             self, "has_bet_or_raise_this_round", False
         ):
-            game_logger.info("Betting complete: All players matched after a bet/raise")
+            if log_enabled:
+                game_logger.info("Betting complete: All players matched after a bet/raise")
             self.betting_round_complete = True
             return
-        active_players_indices = [
-            i for i, p in enumerate(self.players) if p.status == PlayerStatus.ACTIVE
-        ]
-
-        game_logger.debug(f"Active player indices: {active_players_indices}")
-        game_logger.debug(f"Last raiser index: {self.last_raiser_index}")
-        game_logger.debug(f"Current player index: {self.current_player_index}")
+        if log_enabled:
+            game_logger.debug(
+                f"Active player indices: {list(self._iter_seats(active_seats))}"
+            )
+            game_logger.debug(f"Last raiser index: {self.last_raiser_index}")
+            game_logger.debug(f"Current player index: {self.current_player_index}")
 
         if self.last_raiser_index is None:
             # 誰もレイズしていない場合（全員チェック）、全員が一度アクションしたら終了
@@ -722,23 +1028,26 @@ class PokerGame:
             # フロップ以降では、最初のアクター（ディーラーの次）から座席順序で一周した場合に終了
             first_actor_index = self._get_first_actor_for_phase()
 
-            game_logger.debug(f"First actor index: {first_actor_index}")
+            if log_enabled:
+                game_logger.debug(f"First actor index: {first_actor_index}")
 
             # 現在のプレイヤーが最初のアクターに戻ってきた場合、全員がアクションを完了
             if self.current_player_index == first_actor_index:
-                game_logger.info(
-                    f"Betting complete: Back to first actor {first_actor_index} (all players have acted)"
-                )
+                if log_enabled:
+                    game_logger.info(
+                        f"Betting complete: Back to first actor {first_actor_index} (all players have acted)"
+                    )
                 self.betting_round_complete = True
-            else:
+            elif log_enabled:
                 game_logger.debug(
                     f"Betting continues: Current player {self.current_player_index} != first actor {first_actor_index}"
                 )
-        elif self.last_raiser_index not in active_players_indices:
+        elif not active_seats >> self.last_raiser_index & 1:
             # 最後にレイズしたプレイヤーがもうアクティブでない場合（フォールドまたはオールイン）
-            game_logger.info(
-                f"Betting complete: Last raiser {self.last_raiser_index} is no longer active"
-            )
+            if log_enabled:
+                game_logger.info(
+                    f"Betting complete: Last raiser {self.last_raiser_index} is no longer active"
+                )
             self.betting_round_complete = True
         else:
             # 最後にレイズしたプレイヤーの次のプレイヤーが座席順序でアクションしようとしているかチェック
@@ -746,94 +1055,81 @@ class PokerGame:
                 self.last_raiser_index
             )
 
-            game_logger.debug(
-                f"Next after last raiser {self.last_raiser_index}: {next_after_raiser_index}"
-            )
+            if log_enabled:
+                game_logger.debug(
+                    f"Next after last raiser {self.last_raiser_index}: {next_after_raiser_index}"
+                )
 
             # 現在のプレイヤーが最後にレイズしたプレイヤーの次のプレイヤーの場合、
             # 最後にレイズしたプレイヤーは既にアクションを完了しているのでベッティング終了
             if self.current_player_index == next_after_raiser_index:
-                game_logger.info(
-                    f"Betting complete: Back to player {next_after_raiser_index} after last raiser {self.last_raiser_index}"
-                )
+                if log_enabled:
+                    game_logger.info(
+                        f"Betting complete: Back to player {next_after_raiser_index} after last raiser {self.last_raiser_index}"
+                    )
                 self.betting_round_complete = True
-            else:
+            elif log_enabled:
                 game_logger.debug(
                     f"Betting continues: Current player {self.current_player_index} != next after raiser {next_after_raiser_index}"
                 )
 
     def _get_first_actor_for_phase(self):
         """現在のフェーズでの最初のアクターを取得（座席順序ベース）"""
-        active_players_indices = [
-            i for i, p in enumerate(self.players) if p.status == PlayerStatus.ACTIVE
-        ]
+        active_seats = self._seats_with(PlayerStatus.ACTIVE)
 
         if self.current_phase == GamePhase.PREFLOP:
             # プリフロップでは、ビッグブラインドの次（UTG）が最初のアクター
-            # 座席順序で探す
-            bb_index = None
-            for i, player in enumerate(self.players):
-                if player.is_big_blind:
-                    bb_index = i
-                    break
-
+            bb_index = self._get_big_blind_seat()
             if bb_index is not None:
                 # ビッグブラインドの次のアクティブプレイヤーを座席順序で探す
-                for i in range(1, len(self.players)):
-                    next_index = (bb_index + i) % len(self.players)
-                    if next_index in active_players_indices:
-                        return next_index
+                next_index = self._next_seat(active_seats, bb_index)
+                if next_index is not None:
+                    return next_index
         else:
             # フロップ以降では、ディーラーの次が最初のアクター
-            # 座席順序で探す
-            for i in range(1, len(self.players)):
-                next_index = (self.dealer_button + i) % len(self.players)
-                if next_index in active_players_indices:
-                    return next_index
+            next_index = self._next_seat(active_seats, self.dealer_button)
+            if next_index is not None:
+                return next_index
 
         # 見つからない場合は最初のアクティブプレイヤー
-        return active_players_indices[0] if active_players_indices else None
+        if active_seats:
+            return (active_seats & -active_seats).bit_length() - 1
+        return None
 
     def _get_next_active_player_from(self, from_player_index):
         """指定されたプレイヤーの次のアクティブプレイヤーを座席順序で取得"""
-        active_players_indices = [
-            i for i, p in enumerate(self.players) if p.status == PlayerStatus.ACTIVE
-        ]
-
-        # 座席順序で次のアクティブプレイヤーを探す
-        for i in range(1, len(self.players)):
-            next_index = (from_player_index + i) % len(self.players)
-            if next_index in active_players_indices:
-                return next_index
-
-        return None
+        # 座席順序で次のアクティブプレイヤーを探す（自分自身は含めない）
+        return self._next_seat(self._seats_with(PlayerStatus.ACTIVE), from_player_index)
 
+    @_mutates_state
     def advance_to_next_phase(self):
         """次のフェーズに進む"""
-        game_logger.info(
-            f">>> ADVANCE_TO_NEXT_PHASE called - Current phase: {self.current_phase.value}"
-        )
-        game_logger.info(f"Betting round complete: {self.betting_round_complete}")
+        log_enabled = self._log_enabled
+        if log_enabled:
+            game_logger.info(
+                f">>> ADVANCE_TO_NEXT_PHASE called - Current phase: {self.current_phase.value}"
+            )
+            game_logger.info(f"Betting round complete: {self.betting_round_complete}")
 
         if not self.betting_round_complete:
-            game_logger.warning("Cannot advance phase - betting round not complete")
+            if log_enabled:
+                game_logger.warning("Cannot advance phase - betting round not complete")
             return False
 
         # 残りプレイヤーチェック
-        remaining_players = [
-            p
-            for p in self.players
-            if p.status in [PlayerStatus.ACTIVE, PlayerStatus.ALL_IN]
-        ]
+        remaining_seats = self._seats_with(PlayerStatus.ACTIVE, PlayerStatus.ALL_IN)
 
-        game_logger.info(f"Remaining players: {len(remaining_players)}")
-        for i, p in enumerate(remaining_players):
-            game_logger.debug(
-                f"  Remaining P{p.id}: {p.name}, status: {p.status.value}"
-            )
+        if log_enabled:
+            game_logger.info(f"Remaining players: {remaining_seats.bit_count()}")
+            for seat in self._iter_seats(remaining_seats):
+                p = self.players[seat]
+                game_logger.debug(
+                    f"  Remaining P{p.id}: {p.name}, status: {p.status.value}"
+                )
 
-        if len(remaining_players) <= 1:
-            game_logger.info("Going to SHOWDOWN - only 1 or fewer players remaining")
+        if remaining_seats.bit_count() <= 1:
+            if log_enabled:
+                game_logger.info("Going to SHOWDOWN - only 1 or fewer players remaining")
             self.current_phase = GamePhase.SHOWDOWN
             self._log_game_state("PHASE_CHANGED_TO_SHOWDOWN")
             return True
@@ -843,42 +1139,67 @@ class PokerGame:
         # フェーズを進める
         if self.current_phase == GamePhase.PREFLOP:
             self.current_phase = GamePhase.FLOP
-            game_logger.info("Phase changed: PREFLOP -> FLOP")
+            if log_enabled:
+                game_logger.info("Phase changed: PREFLOP -> FLOP")
             self._deal_flop()
         elif self.current_phase == GamePhase.FLOP:
             self.current_phase = GamePhase.TURN
-            game_logger.info("Phase changed: FLOP -> TURN")
+            if log_enabled:
+                game_logger.info("Phase changed: FLOP -> TURN")
             self._deal_turn()
         elif self.current_phase == GamePhase.TURN:
             self.current_phase = GamePhase.RIVER
-            game_logger.info("Phase changed: TURN -> RIVER")
+            if log_enabled:
+                game_logger.info("Phase changed: TURN -> RIVER")
             self._deal_river()
         elif self.current_phase == GamePhase.RIVER:
             self.current_phase = GamePhase.SHOWDOWN
-            game_logger.info("Phase changed: RIVER -> SHOWDOWN")
+            if log_enabled:
+                game_logger.info("Phase changed: RIVER -> SHOWDOWN")
             self._log_game_state("PHASE_CHANGED_TO_SHOWDOWN")
             return True
         else:
-            game_logger.error(f"Cannot advance from phase: {self.current_phase}")
+            if self._log_enabled:
+                game_logger.error(f"Cannot advance from phase: {self.current_phase}")
             return False
 
         # 新しいベッティングラウンドを開始
-        game_logger.info("Starting new betting round")
+        if log_enabled:
+            game_logger.info("Starting new betting round")
         self._start_new_betting_round()
-        self._log_game_state(
-            "NEW_BETTING_ROUND_STARTED",
-            f"Phase: {old_phase.value} -> {self.current_phase.value}",
-        )
+        if log_enabled:
+            self._log_game_state(
+                "NEW_BETTING_ROUND_STARTED",
+                f"Phase: {old_phase.value} -> {self.current_phase.value}",
+            )
         return True
 
+    def _record_deal(self, street: str, cards: List[Card]):
+        """コミュニティカードの公開をアクションログに記録"""
+        self.action_history.record(
+            ActionEvent(self.hand_number, street, None, "deal", 0, self.pot, tuple(cards))
+        )
+
+    def _note(self, text: str):
+        """ショーダウン結果などの自由形式の記録をアクションログに追記"""
+        self.action_history.record(
+            ActionEvent(
+                self.hand_number,
+                self.current_phase.value,
+                None,
+                "note",
+                pot_after=self.pot,
+                text=text,
+            )
+        )
+
+    @_mutates_state
     def _deal_flop(self):
         """フロップを配る（3枚）"""
         self.deck.deal_card()  # バーンカード
         for _ in range(3):
-            self.community_cards.append(self.deck.deal_card())
-        self.action_history.append(
-            f"Flop dealt: {', '.join(str(card) for card in self.community_cards)}"
-        )
+            self._add_community_card(self.deck.deal_card())
+        self._record_deal("flop", self.community_cards)
         
         # データベースにコミュニティカードを記録
         if self.current_hand_id is not None:
@@ -888,11 +1209,12 @@ class PokerGame:
                 cards=[str(card) for card in self.community_cards],
             )
 
+    @_mutates_state
     def _deal_turn(self):
         """ターンを配る（1枚）"""
         self.deck.deal_card()  # バーンカード
-        self.community_cards.append(self.deck.deal_card())
-        self.action_history.append(f"Turn dealt: {str(self.community_cards[-1])}")
+        self._add_community_card(self.deck.deal_card())
+        self._record_deal("turn", self.community_cards[-1:])
         
         # データベースにコミュニティカードを記録
         if self.current_hand_id is not None:
@@ -902,11 +1224,12 @@ class PokerGame:
                 cards=[str(card) for card in self.community_cards],
             )
 
+    @_mutates_state
     def _deal_river(self):
         """リバーを配る（1枚）"""
         self.deck.deal_card()  # バーンカード
-        self.community_cards.append(self.deck.deal_card())
-        self.action_history.append(f"River dealt: {str(self.community_cards[-1])}")
+        self._add_community_card(self.deck.deal_card())
+        self._record_deal("river", self.community_cards[-1:])
         
         # データベースにコミュニティカードを記録
         if self.current_hand_id is not None:
@@ -916,9 +1239,27 @@ class PokerGame:
                 cards=[str(card) for card in self.community_cards],
             )
 
+    def _add_community_card(self, card):
+        """コミュニティカードを1枚追加し、ボードの評価状態も更新"""
+        board_hand = self.get_board_hand()
+        self.community_cards.append(card)
+        board_hand.add(card)
+
+    def get_board_hand(self) -> IncrementalHand:
+        """
+        コミュニティカードの評価状態を取得
+
+        community_cards が直接書き換えられていた場合は作り直す。
+        """
+        if self.board_hand.cards != self.community_cards:
+            self.board_hand = IncrementalHand(self.community_cards)
+        return self.board_hand
+
     def _start_new_betting_round(self):
         """新しいベッティングラウンドを開始"""
-        game_logger.debug("_start_new_betting_round called")
+        log_enabled = self._log_enabled
+        if log_enabled:
+            game_logger.debug("_start_new_betting_round called")
 
         # プレイヤーのベットをリセット
         for player in self.players:
@@ -928,9 +1269,10 @@ class PokerGame:
         self.betting_round_complete = False
         self.last_raiser_index = None
 
-        game_logger.info(
-            "Reset: current_bet=0, betting_round_complete=False, last_raiser_index=None"
-        )
+        if log_enabled:
+            game_logger.info(
+                "Reset: current_bet=0, betting_round_complete=False, last_raiser_index=None"
+            )
 
         # 最初のアクションプレイヤーを設定（フェーズ規則に基づき計算）
         # ALL_INプレイヤーはアクションできないため除外
@@ -938,29 +1280,34 @@ class PokerGame:
             i for i, p in enumerate(self.players) if p.status == PlayerStatus.ACTIVE
         ]
 
-        game_logger.debug(f"Active players for new betting round: {active_players}")
-        game_logger.debug(f"Dealer button: {self.dealer_button}")
+        if log_enabled:
+            game_logger.debug(f"Active players for new betting round: {active_players}")
+            game_logger.debug(f"Dealer button: {self.dealer_button}")
 
         if len(active_players) > 0:
             first_actor_index = self._get_first_actor_for_phase()
             if first_actor_index is not None:
                 old_player = self.current_player_index
                 self.current_player_index = first_actor_index
-                game_logger.info(
-                    f"First actor: Player {self.current_player_index} (by phase rule), was {old_player}"
-                )
+                if log_enabled:
+                    game_logger.info(
+                        f"First actor: Player {self.current_player_index} (by phase rule), was {old_player}"
+                    )
             else:
                 # 念のためのフォールバック（通常は到達しない）
                 old_player = self.current_player_index
                 self.current_player_index = active_players[0]
-                game_logger.info(
-                    f"First actor: Player {self.current_player_index} (fallback first active), was {old_player}"
-                )
+                if log_enabled:
+                    game_logger.info(
+                        f"First actor: Player {self.current_player_index} (fallback first active), was {old_player}"
+                    )
         else:
             # アクティブプレイヤーがいない場合はベッティング終了
-            game_logger.warning("No active players - marking betting complete")
+            if log_enabled:
+                game_logger.warning("No active players - marking betting complete")
             self.betting_round_complete = True
 
+    @_mutates_state
     def conduct_showdown(self) -> Dict[str, Any]:
         """ショーダウンを実行して勝者を決定"""
         remaining_players = [
@@ -970,45 +1317,48 @@ class PokerGame:
         ]
 
         # ログ: ショーダウン開始情報
-        try:
-            game_logger.info("=== SHOWDOWN_STARTED ===")
-            game_logger.info(
-                "Pot: %d, Community cards: %s",
-                self.pot,
-                [str(card) for card in self.community_cards],
-            )
-            for p in remaining_players:
+        if self._log_enabled:
+            try:
+                game_logger.info("=== SHOWDOWN_STARTED ===")
                 game_logger.info(
-                    "  Player %d status=%s cards=%s",
-                    p.id,
-                    p.status.value,
-                    [str(card) for card in p.hole_cards],
+                    "Pot: %d, Community cards: %s",
+                    self.pot,
+                    [str(card) for card in self.community_cards],
                 )
-        except Exception as e:
-            # ログ出力はゲーム進行を止めない
-            game_logger.debug("Showdown logging (start) failed: %s", e)
+                for p in remaining_players:
+                    game_logger.info(
+                        "  Player %d status=%s cards=%s",
+                        p.id,
+                        p.status.value,
+                        [str(card) for card in p.hole_cards],
+                    )
+            except Exception as e:
+                # ログ出力はゲーム進行を止めない
+                game_logger.debug("Showdown logging (start) failed: %s", e)
 
         if len(remaining_players) == 0:
-            game_logger.warning("Showdown called with no remaining players")
+            if self._log_enabled:
+                game_logger.warning("Showdown called with no remaining players")
             result: Dict[str, Any] = {"winners": [], "results": []}
             self.last_showdown_results = result
             # 履歴にショーダウン結果を追記
-            self.action_history.append("Showdown: no remaining players")
+            self._note("Showdown: no remaining players")
             return result
 
         if len(remaining_players) == 1:
             # 1人だけ残った場合
             winner = remaining_players[0]
             winner.chips += self.pot
-            try:
-                game_logger.info(
-                    "Showdown winner by default: Player %d awarded %d",
-                    winner.id,
-                    self.pot,
-                )
-                game_logger.info("=== SHOWDOWN_RESULTS_RECORDED ===")
-            except Exception as e:
-                game_logger.debug("Showdown logging (single winner) failed: %s", e)
+            if self._log_enabled:
+                try:
+                    game_logger.info(
+                        "Showdown winner by default: Player %d awarded %d",
+                        winner.id,
+                        self.pot,
+                    )
+                    game_logger.info("=== SHOWDOWN_RESULTS_RECORDED ===")
+                except Exception as e:
+                    game_logger.debug("Showdown logging (single winner) failed: %s", e)
             result = {
                 "winners": [winner.id],
                 "results": [
@@ -1021,21 +1371,34 @@ class PokerGame:
             }
             self.last_showdown_results = result
             # 履歴にショーダウン結果を追記
-            self.action_history.append(f"Showdown: Player {winner.id} won {self.pot}")
+            self._note(f"Showdown: Player {winner.id} won {self.pot}")
+            # ハンドの終了を記録（カードは公開されないのでショーダウン結果は記録しない）
+            if self.current_hand_id is not None:
+                self.db.end_hand(self.current_hand_id)
             return result
 
         # 複数プレイヤーでのショーダウン
+        # ボードの評価状態は1度だけ使い、各プレイヤーはホールカード分だけを評価する
+        showdown = HandEvaluator.evaluate_showdown(
+            {p.id: p.hole_cards for p in remaining_players}, self.get_board_hand()
+        )
         player_hands = []
         for player in remaining_players:
-            hand_result = HandEvaluator.evaluate_hand(
-                player.hole_cards, self.community_cards
-            )
+            cards = list(player.hole_cards) + list(self.community_cards)
+            if len(cards) >= 5:
+                hand_result = HandEvaluator.result_from_strength(
+                    showdown.strengths[player.id], cards
+                )
+            else:
+                hand_result = HandEvaluator.evaluate_hand(
+                    player.hole_cards, self.community_cards
+                )
             player_hands.append({"player": player, "hand": hand_result})
 
         # 履歴: ショーダウン参加者のハンド情報を追記
         for ph in player_hands:
             try:
-                self.action_history.append(
+                self._note(
                     "Showdown: Player "
                     + str(ph["player"].id)
                     + " hand="
@@ -1048,16 +1411,17 @@ class PokerGame:
                 pass
 
         # 各プレイヤーの役をログ
-        try:
-            for ph in player_hands:
-                game_logger.info(
-                    "  Player %d hand=%s cards=%s",
-                    ph["player"].id,
-                    str(ph["hand"]),
-                    [str(card) for card in ph["player"].hole_cards],
-                )
-        except Exception as e:
-            game_logger.debug("Showdown logging (hands) failed: %s", e)
+        if self._log_enabled:
+            try:
+                for ph in player_hands:
+                    game_logger.info(
+                        "  Player %d hand=%s cards=%s",
+                        ph["player"].id,
+                        str(ph["hand"]),
+                        [str(card) for card in ph["player"].hole_cards],
+                    )
+            except Exception as e:
+                game_logger.debug("Showdown logging (hands) failed: %s", e)
 
         # ID -> HandResult のマップ
         hands_by_id = {ph["player"].id: ph["hand"] for ph in player_hands}
@@ -1097,44 +1461,26 @@ class PokerGame:
         pot_layers = build_pot_layers(contributions)
 
         # レイヤー情報をログ
-        try:
-            for idx, layer in enumerate(pot_layers):
-                game_logger.info(
-                    "Pot layer %d: amount=%d, contributors=%s",
-                    idx,
-                    layer["amount"],
-                    layer["contributors"],
-                )
-        except Exception:
-            pass
+        if self._log_enabled:
+            try:
+                for idx, layer in enumerate(pot_layers):
+                    game_logger.info(
+                        "Pot layer %d: amount=%d, contributors=%s",
+                        idx,
+                        layer["amount"],
+                        layer["contributors"],
+                    )
+            except Exception:
+                pass
 
         # 勝者決定の補助関数（対象ID集合の中で最強ハンドを持つ者を返す）
         def determine_winner_ids(
             eligible_ids: List[int],
         ) -> Tuple[List[int], Optional[HandResult]]:
-            best: Optional[HandResult] = None
-            winners_local: List[int] = []
-            for pid in eligible_ids:
-                hand = hands_by_id.get(pid)
-                if hand is None:
-                    continue
-                if best is None:
-                    best = hand
-                    winners_local = [pid]
-                else:
-                    # hand が best より強い場合
-                    if hand.rank.value > best.rank.value or (
-                        hand.rank.value == best.rank.value
-                        and hand.kickers > best.kickers
-                    ):
-                        best = hand
-                        winners_local = [pid]
-                    elif (
-                        hand.rank.value == best.rank.value
-                        and hand.kickers == best.kickers
-                    ):
-                        winners_local.append(pid)
-            return winners_local, best
+            winners_local = showdown.winners(eligible_ids)
+            if not winners_local:
+                return [], None
+            return winners_local, hands_by_id[winners_local[0]]
 
         # 各レイヤーごとに分配
         winnings_map: Dict[int, int] = {}
@@ -1143,22 +1489,39 @@ class PokerGame:
         # ショーダウンに参加している（フォールドしていない）プレイヤーID
         showdown_ids = {p.id for p in remaining_players}
 
+        winner_ids: List[int] = []
+        best_hand_in_layer: Optional[HandResult] = None
         for layer_idx, layer in enumerate(pot_layers):
             amount = layer["amount"]
             # このレイヤーでの受給資格者（コントリビュータかつショーダウン参加）
             eligible_ids = [pid for pid in layer["contributors"] if pid in showdown_ids]
 
             if not eligible_ids:
-                # 受給資格者がいない場合はスキップ（通常は発生しない想定）
-                game_logger.warning(
-                    "No eligible players for pot layer %d; amount=%d is unclaimed",
-                    layer_idx,
-                    amount,
-                )
+                # 上位レイヤーの拠出者が全員フォールドしている場合
+                if len(layer["contributors"]) == 1:
+                    # コールされなかったベットは本人に返却する
+                    refund_player = self.get_player(layer["contributors"][0])
+                    refund_player.chips += amount
+                    total_awarded += amount
+                    if self._log_enabled:
+                        game_logger.info(
+                            "Uncalled %d returned to player %d",
+                            amount,
+                            refund_player.id,
+                        )
+                    continue
+                # 複数人のデッドマネーは直前のレイヤーの勝者に加える
+                if self._log_enabled:
+                    game_logger.warning(
+                        "No eligible players for pot layer %d; amount=%d goes to previous winners",
+                        layer_idx,
+                        amount,
+                    )
+            else:
+                winner_ids, best_hand_in_layer = determine_winner_ids(eligible_ids)
+            if not winner_ids:
                 continue
 
-            winner_ids, best_hand_in_layer = determine_winner_ids(eligible_ids)
-
             # 分配
             base_share = amount // len(winner_ids)
             remainder = amount % len(winner_ids)
@@ -1172,7 +1535,7 @@ class PokerGame:
 
             # 履歴用のサマリ
             try:
-                self.action_history.append(
+                self._note(
                     "Side pot layer "
                     + str(layer_idx)
                     + ": amount="
@@ -1208,24 +1571,25 @@ class PokerGame:
         overall_winner_ids, overall_best_hand = determine_winner_ids(all_ids)
 
         # ログ
-        try:
-            game_logger.info(
-                "Showdown total awarded: %d (game.pot=%d)", total_awarded, self.pot
-            )
-            game_logger.info(
-                "Showdown winners (aggregated): %s",
-                [pid for pid in sorted(winnings_map.keys())],
-            )
-            for r in results:
+        if self._log_enabled:
+            try:
+                game_logger.info(
+                    "Showdown total awarded: %d (game.pot=%d)", total_awarded, self.pot
+                )
                 game_logger.info(
-                    "  Awarded %d to Player %d (hand=%s)",
-                    r["winnings"],
-                    r["player_id"],
-                    r["hand"],
+                    "Showdown winners (aggregated): %s",
+                    [pid for pid in sorted(winnings_map.keys())],
                 )
-            game_logger.info("=== SHOWDOWN_RESULTS_RECORDED ===")
-        except Exception as e:
-            game_logger.debug("Showdown logging (results) failed: %s", e)
+                for r in results:
+                    game_logger.info(
+                        "  Awarded %d to Player %d (hand=%s)",
+                        r["winnings"],
+                        r["player_id"],
+                        r["hand"],
+                    )
+                game_logger.info("=== SHOWDOWN_RESULTS_RECORDED ===")
+            except Exception as e:
+                game_logger.debug("Showdown logging (results) failed: %s", e)
 
         # all_hands 情報
         all_hands_payload = [
@@ -1247,6 +1611,7 @@ class PokerGame:
             "winners": overall_winner_ids,
             "results": results,
             "all_hands": all_hands_payload,
+            "ranking": showdown.ranking,
         }
         self.last_showdown_results = result
         
@@ -1271,6 +1636,60 @@ class PokerGame:
         
         return result
 
+    def play_hand(self) -> Optional[Dict[str, Any]]:
+        """
+        人間以外のプレイヤーだけで1ハンドを最後まで自動進行
+
+        各プレイヤーの make_decision で行動を決め、無効な行動はフォールド扱いにする。
+
+        Returns:
+            ショーダウン結果（プレイヤー不足でハンドを開始できない場合は None）
+        """
+        steps = self.hand_steps()
+        try:
+            player, game_state = next(steps)
+            while True:
+                player, game_state = steps.send(player.make_decision(game_state))
+        except StopIteration as finished:
+            return finished.value
+
+    def hand_steps(
+        self,
+    ) -> Generator[Tuple[Player, GameState], Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        1ハンドを進行するジェネレーター
+
+        意思決定が必要になるたびに (プレイヤー, ゲーム状態) を yield し、send された
+        decision（{"action": ..., "amount": ...}）を適用する。無効な行動はフォールド扱い。
+        意思決定を呼び出し側で行うため、非同期・別スレッドでのエージェント呼び出しにも使える。
+
+        Returns:
+            ショーダウン結果（StopIteration.value。ハンドを開始できない場合は None）
+        """
+        self.start_new_hand()
+        if self.current_phase == GamePhase.FINISHED:
+            return None
+
+        while self.current_phase not in (GamePhase.SHOWDOWN, GamePhase.FINISHED):
+            while not self.betting_round_complete:
+                player = self.players[self.current_player_index]
+                if player.status != PlayerStatus.ACTIVE:
+                    self._advance_to_next_player()
+                    continue
+
+                decision = yield player, self.get_llm_game_state(player.id)
+                if not self.process_player_action(
+                    player.id, decision["action"], decision.get("amount", 0)
+                ):
+                    self.process_player_action(player.id, "fold", 0)
+
+            if not self.advance_to_next_phase():
+                break
+
+        if self.current_phase != GamePhase.SHOWDOWN:
+            return None
+        return self.conduct_showdown()
+
     def is_game_over(self) -> bool:
         """ゲーム終了条件をチェック"""
         active_players = [p for p in self.players if p.chips > 0]
@@ -1306,15 +1725,198 @@ class PokerGame:
                 }
                 for p in self.players
             ],
-            "action_history": self.action_history,
+            "action_history": list(self.action_history),
             "game_stats": self.game_stats,
         }
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(game_data, f, ensure_ascii=False, indent=2)
 
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        ハンドの合間のゲーム状態をチェックポイント用の辞書（JSONに変換可能）で取得
+
+        デッキの並びは保存しない。シード付きのゲームでは各ハンドのデッキが
+        (seed, hand_number) から決まるため、シードとハンド番号だけで続きを再現できる。
+        状態を持つ乱数ストリーム（ゲーム・ランダムプレイヤー）はその状態を保存する。
+        """
+        return {
+            "hand_number": self.hand_number,
+            "dealer_button": self.dealer_button,
+            "small_blind": self.small_blind,
+            "big_blind": self.big_blind,
+            "seed": self.seed,
+            "rng_state": _rng_state(self.rng),
+            "players": [
+                {
+                    "id": p.id,
+                    "name": p.name,
+                    "chips": p.chips,
+                    "rng_state": _rng_state(getattr(p, "rng", None)),
+                }
+                for p in self.players
+            ],
+            "game_stats": self.game_stats,
+        }
+
+    @_mutates_state
+    def restore_checkpoint_state(self, state: Dict[str, Any]):
+        """
+        checkpoint_state で保存した状態を復元（プレイヤーは同じ構成で追加済みであること）
+
+        Raises:
+            ValueError: プレイヤー構成がチェックポイントと一致しない場合
+        """
+        saved_players = state["players"]
+        if [p.id for p in self.players] != [p["id"] for p in saved_players]:
+            raise ValueError("Checkpoint players do not match the game")
+
+        self.hand_number = state["hand_number"]
+        self.dealer_button = state["dealer_button"]
+        self.small_blind = state["small_blind"]
+        self.big_blind = state["big_blind"]
+        self.seed = state["seed"]
+        if state["rng_state"] is not None:
+            self.rng = random.Random()
+            self.rng.setstate(_rng_state_from_json(state["rng_state"]))
+        for player, saved in zip(self.players, saved_players):
+            player.chips = saved["chips"]
+            player.reset_for_new_hand()  # チップがなければバスト扱いになる
+            if saved["rng_state"] is not None:
+                player.rng = random.Random()
+                player.rng.setstate(_rng_state_from_json(saved["rng_state"]))
+        self.game_stats = {
+            "hands_played": state["game_stats"]["hands_played"],
+            "players_eliminated": list(state["game_stats"]["players_eliminated"]),
+        }
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        ハンド途中のゲーム状態を軽量なスナップショットとして取得
+
+        プレイヤー・ポット・ベット・デッキの並びと乱数の状態・フェーズなどを不変のタプルに写す。
+        ロガー・履歴DB・プレイヤーのエージェントはコピーしない。
+        """
+        deck = self.deck
+        if deck.lazy and deck.rng is None:
+            # 共有の random から配る遅延デッキは状態を保存できないので、共有の random から
+            # 種を取った専用の乱数ストリームに切り替える（配られるカードの分布は変わらない）
+            deck.rng = random.Random(random.getrandbits(64))
+        return GameSnapshot(
+            players=tuple(
+                PlayerSnapshot(
+                    p.chips,
+                    tuple(p.hole_cards),
+                    p.current_bet,
+                    p.total_bet_this_hand,
+                    p.status,
+                    p.is_dealer,
+                    p.is_small_blind,
+                    p.is_big_blind,
+                )
+                for p in self.players
+            ),
+            deck=tuple(deck.cards),
+            deck_lazy=deck.lazy,
+            deck_rng_state=deck.rng.getstate() if deck.rng is not None else None,
+            community_cards=tuple(self.community_cards),
+            phase=self.current_phase,
+            pot=self.pot,
+            current_bet=self.current_bet,
+            hand_number=self.hand_number,
+            dealer_button=self.dealer_button,
+            current_player_index=self.current_player_index,
+            betting_round_complete=self.betting_round_complete,
+            last_raiser_index=self.last_raiser_index,
+            has_bet_or_raise_this_round=self.has_bet_or_raise_this_round,
+            current_hand_id=self.current_hand_id,
+            history_start=self._hand_history_start,
+            hand_history=tuple(self.action_history.events[self._hand_history_start :]),
+        )
+
+    @_mutates_state
+    def restore(self, snapshot: GameSnapshot):
+        """
+        snapshot() で取得した状態に戻す
+
+        プレイヤーは座席順に対応付けて状態だけを書き戻す（オブジェクトは作り直さない）。
+        action_history はスナップショットのハンドより前の部分がそのまま残っている前提で、
+        ハンド内の履歴だけを置き換える。
+        """
+        if len(snapshot.players) != len(self.players):
+            raise ValueError(
+                f"Snapshot has {len(snapshot.players)} players, game has {len(self.players)}"
+            )
+
+        for player, state in zip(self.players, snapshot.players):
+            player.chips = state.chips
+            player.hole_cards = list(state.hole_cards)
+            player.current_bet = state.current_bet
+            player.total_bet_this_hand = state.total_bet_this_hand
+            player.status = state.status
+            player.is_dealer = state.is_dealer
+            player.is_small_blind = state.is_small_blind
+            player.is_big_blind = state.is_big_blind
+
+        self.deck.cards = list(snapshot.deck)
+        self.deck.lazy = snapshot.deck_lazy
+        if snapshot.deck_rng_state is not None:
+            # 遅延デッキはこの状態から同じ順にカードを選ぶ（復元後のランアウトが元と同じになる）
+            if self.deck.rng is None:
+                self.deck.rng = random.Random()
+            self.deck.rng.setstate(snapshot.deck_rng_state)
+        self.community_cards = list(snapshot.community_cards)
+        self.board_hand = IncrementalHand(self.community_cards)
+        self.current_phase = snapshot.phase
+        self.pot = snapshot.pot
+        self.current_bet = snapshot.current_bet
+        self.hand_number = snapshot.hand_number
+        self.dealer_button = snapshot.dealer_button
+        self.current_player_index = snapshot.current_player_index
+        self.betting_round_complete = snapshot.betting_round_complete
+        self.last_raiser_index = snapshot.last_raiser_index
+        self.has_bet_or_raise_this_round = snapshot.has_bet_or_raise_this_round
+        self.current_hand_id = snapshot.current_hand_id
+
+        self._hand_history_start = snapshot.history_start
+        self.action_history.truncate(snapshot.history_start)
+        self.action_history.extend(snapshot.hand_history)
+        self.last_showdown_results = None
+
+    def clone(self) -> "PokerGame":
+        """
+        探索・ロールアウト用の複製を作成
+
+        複製はシミュレーションモード（ログ出力・DB書き込みなし）で、
+        プレイヤーは浅いコピー（エージェントや接続は元と共有）になる。
+        デッキは残りのカードと乱数の状態ごと写すので、複製からも元と同じカードが配られる。
+        """
+        game = PokerGame(
+            small_blind=self.small_blind,
+            big_blind=self.big_blind,
+            initial_chips=self.initial_chips,
+            sim_mode=True,
+            event_buffer_size=0,
+            seed=self.seed,
+        )
+        game.players = [copy.copy(player) for player in self.players]
+        for player in game.players:
+            # 専用の乱数ストリームは複製側で進めても元のゲームに影響しないよう分ける
+            if isinstance(getattr(player, "rng", None), random.Random):
+                player.rng = copy.copy(player.rng)
+        game.action_history = ActionLog(self.action_history.events)
+        game.game_stats = {
+            "hands_played": self.game_stats["hands_played"],
+            "players_eliminated": list(self.game_stats["players_eliminated"]),
+        }
+        game.restore(self.snapshot())
+        return game
+
     def _log_game_state(self, context: str, extra_info: str = ""):
-        """現在のゲーム状態を詳細にログに記録"""
+        """現在のゲーム状態を詳細にログに記録（シミュレーションモードでは何もしない）"""
+        if not self._log_enabled:
+            return
+
         active_players = [p for p in self.players if p.status == PlayerStatus.ACTIVE]
         all_in_players = [p for p in self.players if p.status == PlayerStatus.ALL_IN]
         folded_players = [p for p in self.players if p.status == PlayerStatus.FOLDED]
@@ -5,56 +5,880 @@ Poker Game History Database Module
 公開情報のみを記録し、プライバシーを保護します。
 """
 
+import atexit
 import sqlite3
 import json
+import operator
 import os
+import queue
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 
 
-class GameHistoryDB:
-    """ゲーム履歴を管理するデータベースクラス"""
+# すべてのセッションの履歴を記録する長期保存用のデータベース
+DEFAULT_DB_PATH = os.path.join("db", "game_history.sqlite3")
+
+# 記録の種類ごとの書き込みSQL（コミット時に種類ごとの executemany でまとめて流す。
+# 辞書の順序がそのまま実行順になるので、hands の INSERT が end_hand の UPDATE より先に来る）
+_WRITE_SQL = {
+    "session": """
+        INSERT INTO sessions (session_id, started_at, last_hand_at, hands)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (session_id) DO UPDATE SET
+        last_hand_at = COALESCE(excluded.last_hand_at, last_hand_at),
+        hands = hands + excluded.hands
+    """,
+    "session_player": """
+        INSERT OR REPLACE INTO session_players (session_id, player_id, name)
+        VALUES (?, ?, ?)
+    """,
+    "hand": """
+        INSERT INTO hands
+        (hand_id, session_id, timestamp, small_blind, big_blind, dealer_button, player_ids)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    "action": """
+        INSERT INTO actions
+        (hand_id, session_id, phase, player_id, action_type, amount, pot_after, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "community_cards": """
+        INSERT OR REPLACE INTO community_cards (hand_id, phase, cards, timestamp)
+        VALUES (?, ?, ?, ?)
+    """,
+    "showdown": """
+        INSERT OR REPLACE INTO showdown_results
+        (hand_id, player_id, hole_cards, hand_rank, winnings, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "end_hand": """
+        UPDATE hands SET ended_at = ? WHERE hand_id = ?
+    """,
+}
+
+# グループコミットでまとめる行数の上限
+_GROUP_COMMIT_ROWS = 10_000
+
+# まとめて書き込む場合に1回の予約で確保する hand_id の個数（同じDBに書き込む接続同士で
+# hand_id が重ならないように、sqlite_sequence をまとめて進めてから手元で採番する）。
+# 最初は小さく予約し、使い切るたびに上限まで倍にする（短いセッションで番号を大きく飛ばさない）
+_HAND_ID_BLOCK_MIN = 16
+_HAND_ID_BLOCK = 256
+
+# get_hands で1回のクエリに渡すハンドIDの上限（SQLite のパラメータ数の上限より小さくする）
+_FETCH_CHUNK_SIZE = 500
+
+# player_stats テーブルの集計列（記録のたびに増分を足し込むので、すべて回数か額の合計）
+_PLAYER_STAT_COLUMNS = (
+    "hands_dealt",  # 配られたハンド数
+    "hands_played",  # アクション（ブラインドを含む）を記録したハンド数
+    "vpip_hands",  # プリフロップで自発的にチップを入れたハンド数
+    "pfr_hands",  # プリフロップでレイズしたハンド数
+    "saw_flop",  # フロップの時点でフォールドしていなかったハンド数
+    "showdowns",  # ショーダウンに参加した回数
+    "showdown_wins",  # ショーダウンでチップを獲得した回数
+    "total_winnings",  # ショーダウンでの獲得チップ合計
+    "postflop_aggressive",  # フロップ以降のレイズ・オールインの回数
+    "postflop_calls",  # フロップ以降のコールの回数
+)
+
+_WRITE_SQL["player_stats"] = f"""
+    INSERT INTO player_stats (session_id, player_id, {", ".join(_PLAYER_STAT_COLUMNS)})
+    VALUES (?, ?, {", ".join("?" * len(_PLAYER_STAT_COLUMNS))})
+    ON CONFLICT (session_id, player_id) DO UPDATE SET
+    {", ".join(f"{column} = {column} + excluded.{column}" for column in _PLAYER_STAT_COLUMNS)}
+"""
+_WRITE_SQL["player_action_counts"] = """
+    INSERT INTO player_action_counts (session_id, player_id, phase, action_type, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (session_id, player_id, phase, action_type) DO UPDATE SET
+    count = count + excluded.count
+"""
+
+# 増分の Counter から集計列の順に値を取り出す（存在しない列は0）
+_stat_values = operator.itemgetter(*_PLAYER_STAT_COLUMNS)
+
+# VPIP に数えるプリフロップのアクション（ブラインドは自発的ではないので含めない）
+_VOLUNTARY_ACTIONS = frozenset(("call", "raise", "all_in"))
+# PFR・アグレッションファクターに数えるアクション（オールインはコール額以下でもレイズ扱い）
+_AGGRESSIVE_ACTIONS = frozenset(("raise", "all_in"))
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    """割合を計算（分母が0の場合はNone）"""
+    return numerator / denominator if denominator else None
+
+
+def _release_hand_ids_at_exit(ref: "weakref.ref[GameHistoryDB]"):
+    """プロセス終了時に、閉じられなかった GameHistoryDB の予約済み hand_id を返す"""
+    db = ref()
+    if db is None:
+        return
+    try:
+        db._release_hand_ids()
+    except sqlite3.Error:
+        pass
+
+
+@dataclass
+class _HandStats:
+    """集計中の1ハンド分の状態（同じハンドで二重に数えないためのプレイヤー集合）"""
+
+    session_id: Optional[str] = None
+    players: Set[int] = field(default_factory=set)
+    acted: Set[int] = field(default_factory=set)
+    folded: Set[int] = field(default_factory=set)
+    vpip: Set[int] = field(default_factory=set)
+    pfr: Set[int] = field(default_factory=set)
+    showdown: Set[int] = field(default_factory=set)
+    saw_flop: bool = False
+
+
+class _PlayerStatsTracker:
+    """
+    記録から player_stats / player_action_counts に足し込む増分を計算する
+
+    増分はセッションとプレイヤーの組ごとに溜め、コミットのたびに take_deltas で取り出して
+    記録した行と同じトランザクションで UPSERT する。集計中のハンドの状態は end_hand で破棄する。
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.hands: Dict[int, _HandStats] = {}
+        self.stat_deltas: Dict[Tuple[Optional[str], int], Counter] = defaultdict(Counter)
+        self.action_deltas: Counter = Counter()
+
+    def _hand(self, hand_id: int) -> _HandStats:
+        hand = self.hands.get(hand_id)
+        if hand is None:
+            # 開始を記録していないハンド（既存のDBに追記する場合など）
+            hand = self.hands[hand_id] = _HandStats(session_id=self.session_id)
+        return hand
+
+    def start_hand(
+        self, hand_id: int, player_ids: List[int], session_id: Optional[str] = None
+    ):
+        if session_id is None:
+            session_id = self.session_id
+        self.hands[hand_id] = _HandStats(session_id=session_id, players=set(player_ids))
+        for player_id in player_ids:
+            self.stat_deltas[(session_id, player_id)]["hands_dealt"] += 1
+
+    def action(self, hand_id: int, phase: str, player_id: int, action_type: str):
+        hand = self.hands.get(hand_id) or self._hand(hand_id)
+        key = (hand.session_id, player_id)
+        self.action_deltas[(*key, phase, action_type)] += 1
+        if player_id not in hand.acted:
+            hand.acted.add(player_id)
+            hand.players.add(player_id)
+            self.stat_deltas[key]["hands_played"] += 1
+        if action_type == "check":
+            return
+
+        deltas = self.stat_deltas[key]
+        if action_type == "fold":
+            hand.folded.add(player_id)
+        elif phase == "preflop":
+            if action_type in _VOLUNTARY_ACTIONS and player_id not in hand.vpip:
+                hand.vpip.add(player_id)
+                deltas["vpip_hands"] += 1
+            if action_type in _AGGRESSIVE_ACTIONS and player_id not in hand.pfr:
+                hand.pfr.add(player_id)
+                deltas["pfr_hands"] += 1
+        elif action_type in _AGGRESSIVE_ACTIONS:
+            deltas["postflop_aggressive"] += 1
+        elif action_type == "call":
+            deltas["postflop_calls"] += 1
+
+    def community_cards(self, hand_id: int, phase: str):
+        if phase != "flop":
+            return
+        hand = self._hand(hand_id)
+        if hand.saw_flop:
+            return
+        hand.saw_flop = True
+        for player_id in hand.players - hand.folded:
+            self.stat_deltas[(hand.session_id, player_id)]["saw_flop"] += 1
+
+    def showdown(self, hand_id: int, player_id: int, winnings: int):
+        hand = self._hand(hand_id)
+        if player_id in hand.showdown:
+            return  # 同じ結果の再記録は数えない
+        hand.showdown.add(player_id)
+        deltas = self.stat_deltas[(hand.session_id, player_id)]
+        deltas["showdowns"] += 1
+        if winnings > 0:
+            deltas["showdown_wins"] += 1
+        deltas["total_winnings"] += winnings
+
+    def end_hand(self, hand_id: int):
+        self.hands.pop(hand_id, None)
+
+    def take_deltas(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """溜まっている増分を UPSERT 用の行として取り出す"""
+        stat_rows = [(*key, *_stat_values(deltas)) for key, deltas in self.stat_deltas.items()]
+        action_rows = [(*key, count) for key, count in self.action_deltas.items()]
+        self.stat_deltas.clear()
+        self.action_deltas.clear()
+        return stat_rows, action_rows
+
+
+class GameHistoryReader:
+    """
+    履歴データベースを読み込み専用で開くクラス
+
+    エージェントの履歴ツールなど、記録を読むだけの呼び出し元で使う。読み込み専用の接続を
+    1つ開くだけで、テーブルの作成や旧形式の移行、集計の作り直し、hand_id の予約、
+    書き込みスレッドの起動は行わない（記録側の機能は GameHistoryDB が加える）。
+    """
+
+    def __init__(self, db_path: str = None, session_id: Optional[str] = None):
+        """
+        読み込み専用の接続を開く
+
+        Args:
+            db_path: データベースファイルのパス（Noneの場合は DEFAULT_DB_PATH）
+            session_id: 参照するセッションのID（Noneの場合は最後に開始したセッション）
+
+        Raises:
+            sqlite3.OperationalError: データベースファイルが存在しない場合
+        """
+        if db_path is None:
+            db_path = DEFAULT_DB_PATH
+        self.db_path = db_path
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # session_id 列のない旧形式（実行ごとに1ファイル）は、ファイル全体を1つのセッションとして読む
+        self._legacy = "session_id" not in self._columns("hands")
+        self.session_id = session_id or self.get_latest_session_id()
+
+    def _table_exists(self, name: str) -> bool:
+        """テーブルが存在するかを確認"""
+        cursor = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        )
+        return cursor.fetchone() is not None
+
+    def _columns(self, table: str) -> Set[str]:
+        """テーブルの列名を取得（テーブルがない場合は空）"""
+        return {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+
+    def get_hand_history(self, hand_id: int) -> Optional[Dict[str, Any]]:
+        """
+        特定ハンドの完全な履歴を取得
+
+        Args:
+            hand_id: ハンドID
+
+        Returns:
+            ハンド情報の辞書、存在しない場合はNone
+        """
+        cursor = self.conn.cursor()
+
+        # ハンド基本情報
+        cursor.execute("SELECT * FROM hands WHERE hand_id = ?", (hand_id,))
+        hand_row = cursor.fetchone()
+
+        if not hand_row:
+            return None
+
+        hand_data = dict(hand_row)
+        hand_data["player_ids"] = json.loads(hand_data["player_ids"])
+
+        # アクション履歴
+        cursor.execute(
+            """
+            SELECT * FROM actions 
+            WHERE hand_id = ? 
+            ORDER BY action_id
+        """,
+            (hand_id,),
+        )
+        hand_data["actions"] = [dict(row) for row in cursor.fetchall()]
+
+        # コミュニティカード
+        cursor.execute(
+            """
+            SELECT phase, cards FROM community_cards 
+            WHERE hand_id = ?
+        """,
+            (hand_id,),
+        )
+        community_cards = {}
+        for row in cursor.fetchall():
+            community_cards[row["phase"]] = json.loads(row["cards"])
+        hand_data["community_cards"] = community_cards
+
+        # ショーダウン結果
+        cursor.execute(
+            """
+            SELECT * FROM showdown_results 
+            WHERE hand_id = ?
+        """,
+            (hand_id,),
+        )
+        showdown_results = []
+        for row in cursor.fetchall():
+            result = dict(row)
+            if result["hole_cards"]:
+                result["hole_cards"] = json.loads(result["hole_cards"])
+            showdown_results.append(result)
+        hand_data["showdown_results"] = showdown_results
 
-    def __init__(self, db_path: str = None, uuid_suffix: str = None):
+        return hand_data
+
+    def get_hands(self, hand_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        複数ハンドの完全な履歴を一括で取得
+
+        テーブルごとに1回のクエリでまとめて読み込み、メモリ上でハンドごとに振り分ける
+        （ハンドごとに get_hand_history を呼ぶ場合のクエリ数の増加を避ける）。
+
+        Args:
+            hand_ids: ハンドIDのリスト
+
+        Returns:
+            hand_ids の順に並べたハンド情報のリスト（存在しないハンドは含まない）
+        """
+        hands: Dict[int, Dict[str, Any]] = {}
+        # 行はタプルのまま受け取り、列名との zip で辞書にする（sqlite3.Row を経由しない）
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        loads = json.loads
+        unique_ids = list(dict.fromkeys(hand_ids))
+
+        # SQLite のパラメータ数の上限を超えないように分割して読み込む
+        for start in range(0, len(unique_ids), _FETCH_CHUNK_SIZE):
+            chunk = unique_ids[start : start + _FETCH_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+
+            cursor.execute(f"SELECT * FROM hands WHERE hand_id IN ({placeholders})", chunk)
+            columns = [column[0] for column in cursor.description]
+            for row in cursor.fetchall():
+                hand_data = dict(zip(columns, row))
+                hand_data["player_ids"] = loads(hand_data["player_ids"])
+                hand_data["actions"] = []
+                hand_data["community_cards"] = {}
+                hand_data["showdown_results"] = []
+                hands[hand_data["hand_id"]] = hand_data
+
+            # アクション履歴
+            cursor.execute(
+                f"""
+                SELECT * FROM actions
+                WHERE hand_id IN ({placeholders})
+                ORDER BY action_id
+            """,
+                chunk,
+            )
+            columns = [column[0] for column in cursor.description]
+            hand_index = columns.index("hand_id")
+            for row in cursor.fetchall():
+                hand_data = hands.get(row[hand_index])
+                if hand_data is not None:
+                    hand_data["actions"].append(dict(zip(columns, row)))
+
+            # コミュニティカード
+            cursor.execute(
+                f"""
+                SELECT hand_id, phase, cards FROM community_cards
+                WHERE hand_id IN ({placeholders})
+            """,
+                chunk,
+            )
+            for hand_id, phase, cards in cursor.fetchall():
+                hand_data = hands.get(hand_id)
+                if hand_data is not None:
+                    hand_data["community_cards"][phase] = loads(cards)
+
+            # ショーダウン結果
+            cursor.execute(
+                f"""
+                SELECT * FROM showdown_results
+                WHERE hand_id IN ({placeholders})
+                ORDER BY hand_id, player_id
+            """,
+                chunk,
+            )
+            columns = [column[0] for column in cursor.description]
+            hand_index = columns.index("hand_id")
+            for row in cursor.fetchall():
+                hand_data = hands.get(row[hand_index])
+                if hand_data is None:
+                    continue
+                result = dict(zip(columns, row))
+                if result["hole_cards"]:
+                    result["hole_cards"] = loads(result["hole_cards"])
+                hand_data["showdown_results"].append(result)
+
+        return [hands[hand_id] for hand_id in hand_ids if hand_id in hands]
+
+    def get_recent_hands(
+        self, limit: int = 10, session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        直近のハンド履歴を取得
+
+        Args:
+            limit: 取得する件数
+            session_id: 対象のセッション（Noneの場合はこのインスタンスのセッション）
+
+        Returns:
+            ハンド情報のリスト（新しい順）
+        """
+        cursor = self.conn.cursor()
+        if self._legacy:
+            cursor.execute("SELECT hand_id FROM hands ORDER BY hand_id DESC LIMIT ?", (limit,))
+        else:
+            cursor.execute(
+                """
+                SELECT hand_id FROM hands
+                WHERE session_id = ?
+                ORDER BY hand_id DESC
+                LIMIT ?
+            """,
+                (session_id or self.session_id, limit),
+            )
+
+        hand_ids = [row["hand_id"] for row in cursor.fetchall()]
+        return self.get_hands(hand_ids)
+
+    def get_sessions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        記録されたセッションの一覧を取得
+
+        Args:
+            limit: 取得する件数
+
+        Returns:
+            セッション情報（session_id, started_at, last_hand_at, hands と、
+            プレイヤーIDから名前への対応 players）のリスト（新しい順）
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM sessions
+            ORDER BY started_at DESC, rowid DESC
+            LIMIT ?
+        """,
+            (limit,),
+        )
+        sessions = [dict(row) for row in cursor.fetchall()]
+        if not sessions:
+            return sessions
+
+        by_id = {session["session_id"]: session for session in sessions}
+        for session in sessions:
+            session["players"] = {}
+        placeholders = ",".join("?" * len(by_id))
+        cursor.execute(
+            f"""
+            SELECT session_id, player_id, name FROM session_players
+            WHERE session_id IN ({placeholders})
+            ORDER BY session_id, player_id
+        """,
+            list(by_id),
+        )
+        for row in cursor.fetchall():
+            by_id[row["session_id"]]["players"][row["player_id"]] = row["name"]
+        return sessions
+
+    def get_latest_session_id(self) -> Optional[str]:
+        """
+        最後に開始したセッションのIDを取得
+
+        Returns:
+            セッションID、記録がない場合（旧形式のファイルを含む）はNone
+        """
+        if self._legacy:
+            return None
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT session_id FROM sessions
+            ORDER BY started_at DESC, rowid DESC
+            LIMIT 1
+        """
+        )
+        row = cursor.fetchone()
+        return row["session_id"] if row else None
+
+    def _build_player_stats(
+        self, stats: Dict[str, Any], row: Optional[sqlite3.Row], count_rows: List[sqlite3.Row]
+    ) -> Dict[str, Any]:
+        """集計テーブルの行から get_player_stats の形式の辞書を作る"""
+        for column in _PLAYER_STAT_COLUMNS:
+            stats[column] = (row[column] or 0) if row else 0
+
+        by_street: Dict[str, Dict[str, int]] = {}
+        for count_row in count_rows:
+            by_street.setdefault(count_row["phase"], {})[count_row["action_type"]] = (
+                count_row["count"]
+            )
+        stats["action_counts_by_street"] = by_street
+
+        stats["vpip"] = _ratio(stats["vpip_hands"], stats["hands_dealt"])
+        stats["pfr"] = _ratio(stats["pfr_hands"], stats["hands_dealt"])
+        stats["aggression_factor"] = _ratio(
+            stats["postflop_aggressive"], stats["postflop_calls"]
+        )
+        stats["wtsd"] = _ratio(stats["showdowns"], stats["saw_flop"])
+        stats["wsd"] = _ratio(stats["showdown_wins"], stats["showdowns"])
+        return stats
+
+    def get_player_stats(
+        self, player_id: int, session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        プレイヤーのHUD統計を取得
+
+        記録のたびに更新される集計テーブルを1行読むだけなので、履歴の長さによらず一定時間で返る。
+        コミット済みの記録だけを数える。
+
+        Args:
+            player_id: プレイヤーID
+            session_id: 対象のセッション（Noneの場合はこのインスタンスのセッション）
+
+        Returns:
+            集計値（_PLAYER_STAT_COLUMNS の各列）、ストリート別のアクション回数
+            （action_counts_by_street）と、次の割合の辞書（分母が0の場合はNone）:
+            vpip（自発的にチップを入れたハンドの割合）、pfr（プリフロップでレイズしたハンドの割合）、
+            aggression_factor（フロップ以降の レイズ・オールイン / コール）、
+            wtsd（フロップを見たハンドのうちショーダウンまで行った割合）、
+            wsd（ショーダウンでチップを獲得した割合）
+        """
+        key = (session_id or self.session_id, player_id)
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT * FROM player_stats WHERE session_id = ? AND player_id = ?", key
+        )
+        row = cursor.fetchone()
+        cursor.execute(
+            """
+            SELECT phase, action_type, count FROM player_action_counts
+            WHERE session_id = ? AND player_id = ?
+            ORDER BY phase, action_type
+        """,
+            key,
+        )
+        return self._build_player_stats({"player_id": player_id}, row, cursor.fetchall())
+
+    def get_player_stats_by_name(self, name: str) -> Dict[str, Any]:
+        """
+        プレイヤー名でセッションをまたいだHUD統計を取得
+
+        register_player で記録した名前の席を全セッションから探し、セッション別の集計を合計する
+        （プレイヤーIDは席番号なので、セッションをまたぐ場合は名前で同じプレイヤーとみなす）。
+
+        Args:
+            name: プレイヤー名
+
+        Returns:
+            get_player_stats と同じ集計値・割合と、集計したセッション数（sessions）の辞書
+        """
+        sums = ", ".join(f"SUM(ps.{column}) AS {column}" for column in _PLAYER_STAT_COLUMNS)
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT COUNT(*) AS sessions, {sums}
+            FROM session_players sp
+            JOIN player_stats ps
+            ON ps.session_id = sp.session_id AND ps.player_id = sp.player_id
+            WHERE sp.name = ?
+        """,
+            (name,),
+        )
+        row = cursor.fetchone()
+        cursor.execute(
+            """
+            SELECT pac.phase, pac.action_type, SUM(pac.count) AS count
+            FROM session_players sp
+            JOIN player_action_counts pac
+            ON pac.session_id = sp.session_id AND pac.player_id = sp.player_id
+            WHERE sp.name = ?
+            GROUP BY pac.phase, pac.action_type
+            ORDER BY pac.phase, pac.action_type
+        """,
+            (name,),
+        )
+        stats = {"name": name, "sessions": row["sessions"]}
+        return self._build_player_stats(stats, row, cursor.fetchall())
+
+    def get_player_action_stats(
+        self, player_id: int, session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        プレイヤーのアクション統計を取得（集計テーブルから読む）
+
+        Args:
+            player_id: プレイヤーID
+            session_id: 対象のセッション（Noneの場合はこのインスタンスのセッション）
+
+        Returns:
+            統計情報の辞書（get_player_stats の割合も含む）
+        """
+        stats = self.get_player_stats(player_id, session_id)
+
+        action_counts: Counter = Counter()
+        for counts in stats["action_counts_by_street"].values():
+            action_counts.update(counts)
+
+        return {
+            "player_id": player_id,
+            "hands_played": stats["hands_played"],
+            "action_counts": dict(sorted(action_counts.items())),
+            "showdowns": stats["showdowns"],
+            "showdown_wins": stats["showdown_wins"],
+            "total_winnings": stats["total_winnings"],
+            "vpip": stats["vpip"],
+            "pfr": stats["pfr"],
+            "aggression_factor": stats["aggression_factor"],
+            "wtsd": stats["wtsd"],
+            "wsd": stats["wsd"],
+        }
+
+    def get_player_recent_actions(
+        self, player_id: int, limit: int = 20, session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        プレイヤーの最近のアクションを取得
+
+        Args:
+            player_id: プレイヤーID
+            limit: 取得する件数
+            session_id: 対象のセッション（Noneの場合はこのインスタンスのセッション）
+
+        Returns:
+            アクション履歴のリスト
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM actions
+            WHERE session_id = ? AND player_id = ?
+            ORDER BY action_id DESC
+            LIMIT ?
+        """,
+            (session_id or self.session_id, player_id, limit),
+        )
+
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_league_matches(self, league_id: str) -> List[Dict[str, Any]]:
+        """
+        リーグ戦の試合結果を記録順に取得
+
+        Args:
+            league_id: リーグID
+
+        Returns:
+            試合結果のリスト
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM league_matches
+            WHERE league_id = ?
+            ORDER BY match_id
+        """,
+            (league_id,),
+        )
+
+        return [dict(row) for row in cursor.fetchall()]
+
+    def close(self):
+        """データベース接続を閉じる"""
+        self.conn.close()
+
+
+class GameHistoryDB(GameHistoryReader):
+    """
+    ゲーム履歴を管理するデータベースクラス
+
+    すべての実行の履歴を1つのデータベース（既定は db/game_history.sqlite3）に記録する。
+    インスタンスごとに1つのセッションとして記録し、ハンドやプレイヤー別の集計は
+    session_id で区別する（sessions テーブルがセッションの一覧になる）。
+    読み込み用のメソッドは GameHistoryReader から引き継ぐ。
+    """
+
+    def __init__(
+        self,
+        db_path: str = None,
+        uuid_suffix: str = None,
+        batch_hands: Optional[int] = None,
+        synchronous: str = "NORMAL",
+        async_writes: bool = False,
+        queue_size: int = 1000,
+        session_id: Optional[str] = None,
+    ):
         """
         データベース接続を初期化
 
         Args:
-            db_path: データベースファイルのパス（Noneの場合はタイムスタンプ+UUID付きで自動作成）
-            uuid_suffix: 統一UUID（Noneの場合は新規生成）
+            db_path: データベースファイルのパス（Noneの場合は DEFAULT_DB_PATH）
+            uuid_suffix: 統一UUID（Noneの場合は新規生成）。セッションIDの末尾に付ける
+            batch_hands: 書き込みをまとめてコミットするハンド数。None の場合は書き込みごとに
+                コミットする。1 ならハンドの終了ごと、N なら N ハンドごとに1回だけコミットする。
+                その間の記録はメモリ上に溜め、コミット時に1つの短いトランザクションで書き込む
+                （同じDBに書き込む他の接続を長く待たせない。記録はコミット後に見える）
+            synchronous: SQLite の synchronous プラグマ（OFF / NORMAL / FULL / EXTRA）。
+                WAL モードでの NORMAL はコミットごとの fsync を省く（電源断で直近のコミットが
+                失われることはあるが、データベースは壊れない）
+            async_writes: True の場合は記録をコミット単位の束にしてキューに積むだけで返し、
+                専用の書き込みスレッドが自分の接続から executemany でまとめて書き込む
+                （呼び出し側はディスクI/Oを待たない）。直前の記録を読むときは先に flush() を呼ぶ
+            queue_size: 書き込みキューに積めるコミット単位の束の上限。満杯の場合は空きが出るまで
+                記録側が待つ（背圧）
+            session_id: 記録・参照するセッションのID（Noneの場合はタイムスタンプ+UUIDで新規生成）
         """
+        if batch_hands is not None and batch_hands <= 0:
+            raise ValueError("batch_hands must be positive")
+        synchronous = synchronous.upper()
+        if synchronous not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+        if queue_size <= 0:
+            raise ValueError("queue_size must be positive")
+
         if db_path is None:
-            db_path = self._generate_unique_db_path(uuid_suffix)
-        
+            db_path = DEFAULT_DB_PATH
+        if session_id is None:
+            session_id = self._generate_session_id(uuid_suffix)
+
         # ディレクトリが存在しない場合は作成
         db_dir = os.path.dirname(db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
 
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.session_id = session_id
+        self._legacy = False  # 旧形式のファイルは開くときに移行する
+        self._session_started_at = datetime.now().isoformat()
+        self._session_hands = 0  # 次のコミットで sessions に足し込むハンド数
+        self.batch_hands = batch_hands
+        self._hands_since_commit = 0
+        # 予約済みの hand_id の範囲（まとめて書き込む場合のみ。使い切ったら次の範囲を予約する）
+        self._next_hand_id = 1
+        self._hand_id_limit = 0
+        self._hand_id_block = _HAND_ID_BLOCK_MIN
+        self._closed = False
+        # 複数の実行が同じDBに書き込むので、ロック待ちは長めに取る
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        # WAL: 書き込み中も他の接続（エージェントの履歴ツールなど）から読み込める
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        # プレイヤー別の集計（記録のたびに増分を計算し、コミット時に集計テーブルへ足し込む）
+        self._stats = _PlayerStatsTracker(session_id)
+
+        legacy_session = self._migrate_legacy_tables()
+        # 集計テーブルがない（またはセッション別でない）既存のDBは、記録済みの履歴から作り直す
+        rebuild_stats = "session_id" not in self._columns("player_stats")
+        if rebuild_stats:
+            self.conn.execute("DROP TABLE IF EXISTS player_stats")
+            self.conn.execute("DROP TABLE IF EXISTS player_action_counts")
         self._create_tables()
+        if legacy_session is not None:
+            self.conn.execute(
+                """
+                INSERT OR IGNORE INTO sessions (session_id, started_at, last_hand_at, hands)
+                SELECT ?, COALESCE(MIN(timestamp), ?), MAX(ended_at), COUNT(*)
+                FROM hands WHERE session_id = ?
+            """,
+                (legacy_session, self._session_started_at, legacy_session),
+            )
+            self.conn.commit()
+
+        # バックグラウンド書き込み（キューと書き込みスレッド、背圧の計測値）
+        self.queue_size = queue_size
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_error: Optional[BaseException] = None
+        self._batch: List[Tuple[str, Tuple]] = []  # 次のコミットで書き込む記録
+        self._batches_sent = 0
+        self._peak_queue_depth = 0
+        self._blocked_puts = 0
+        self._blocked_seconds = 0.0
+        self._rows_written = 0
+        self._commits = 0
+
+        if rebuild_stats:
+            self.rebuild_player_stats()
+
+        if async_writes:
+            writer_conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            writer_conn.execute(f"PRAGMA synchronous={synchronous}")
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                args=(writer_conn,),
+                name="history-writer",
+                daemon=True,
+            )
+            self._writer.start()
 
-    def _generate_unique_db_path(self, uuid_suffix: str = None) -> str:
-        """タイムスタンプとUUID付きのユニークなデータベースファイルパスを生成"""
+    def _generate_session_id(self, uuid_suffix: str = None) -> str:
+        """タイムスタンプとUUID付きのユニークなセッションIDを生成"""
         import uuid
-        from datetime import datetime
-        
+
         # タイムスタンプとUUIDを生成
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         if uuid_suffix is None:
             uuid_suffix = str(uuid.uuid4())[:4]  # 4桁のUUID
-        
-        # ファイル名を生成
-        filename = f"game_history_{timestamp}_{uuid_suffix}.sqlite3"
-        return os.path.join("db", filename)
+        return f"{timestamp}_{uuid_suffix}"
+
+    def _migrate_legacy_tables(self) -> Optional[str]:
+        """
+        session_id 列のない旧形式（実行ごとに1ファイル）のDBを現在の形式に移行
+
+        記録済みのハンドとアクションは、ファイル名をIDとする1つのセッションにまとめる。
+
+        Returns:
+            移行したセッションのID（移行が不要な場合はNone）
+        """
+        hand_columns = self._columns("hands")
+        if not hand_columns or "session_id" in hand_columns:
+            return None
+
+        legacy_session = os.path.splitext(os.path.basename(self.db_path))[0]
+        for table in ("hands", "actions"):
+            if table == "actions" and not self._table_exists("actions"):
+                continue
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN session_id TEXT")
+            self.conn.execute(f"UPDATE {table} SET session_id = ?", (legacy_session,))
+        self.conn.commit()
+        return legacy_session
 
     def _create_tables(self):
         """必要なテーブルを作成"""
         cursor = self.conn.cursor()
 
+        # セッション一覧（GameHistoryDB のインスタンス = 1回の実行ごとに1行）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                last_hand_at TEXT,
+                hands INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        # セッションごとの席（プレイヤーID）とプレイヤー名の対応
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_players (
+                session_id TEXT NOT NULL,
+                player_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (session_id, player_id)
+            )
+        """)
+
         # ハンド情報テーブル
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS hands (
@@ -64,7 +888,8 @@ class GameHistoryDB:
                 big_blind INTEGER NOT NULL,
                 dealer_button INTEGER NOT NULL,
                 player_ids TEXT NOT NULL,
-                ended_at TEXT
+                ended_at TEXT,
+                session_id TEXT
             )
         """)
 
@@ -79,6 +904,7 @@ class GameHistoryDB:
                 amount INTEGER NOT NULL DEFAULT 0,
                 pot_after INTEGER NOT NULL DEFAULT 0,
                 timestamp TEXT NOT NULL,
+                session_id TEXT,
                 FOREIGN KEY (hand_id) REFERENCES hands (hand_id)
             )
         """)
@@ -109,6 +935,47 @@ class GameHistoryDB:
             )
         """)
 
+        # リーグ戦の対戦結果テーブル（poker.league が記録する）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS league_matches (
+                match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                league_id TEXT NOT NULL,
+                round INTEGER NOT NULL,
+                agent_a TEXT NOT NULL,
+                agent_b TEXT NOT NULL,
+                seed INTEGER NOT NULL,
+                hands INTEGER NOT NULL,
+                net_a INTEGER NOT NULL,
+                net_b INTEGER NOT NULL,
+                winner TEXT,
+                timestamp TEXT NOT NULL
+            )
+        """)
+
+        # プレイヤー別の集計テーブル（記録のたびに増分を足し込む）
+        stat_columns = ",\n".join(
+            f"                {column} INTEGER NOT NULL DEFAULT 0"
+            for column in _PLAYER_STAT_COLUMNS
+        )
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS player_stats (
+                session_id TEXT NOT NULL,
+                player_id INTEGER NOT NULL,
+{stat_columns},
+                PRIMARY KEY (session_id, player_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS player_action_counts (
+                session_id TEXT NOT NULL,
+                player_id INTEGER NOT NULL,
+                phase TEXT NOT NULL,
+                action_type TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (session_id, player_id, phase, action_type)
+            )
+        """)
+
         # インデックスの作成
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_actions_hand_id 
@@ -122,6 +989,26 @@ class GameHistoryDB:
             CREATE INDEX IF NOT EXISTS idx_showdown_player_id 
             ON showdown_results(player_id)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_league_matches_league_id
+            ON league_matches(league_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_started_at
+            ON sessions(started_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_players_name
+            ON session_players(name)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_hands_session_id
+            ON hands(session_id, hand_id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_actions_session_player
+            ON actions(session_id, player_id, action_id)
+        """)
 
         self.conn.commit()
 
@@ -144,20 +1031,98 @@ class GameHistoryDB:
         Returns:
             新しく作成されたhand_id
         """
-        cursor = self.conn.cursor()
         timestamp = datetime.now().isoformat()
-        player_ids_json = json.dumps(player_ids, ensure_ascii=False)
-
-        cursor.execute(
-            """
-            INSERT INTO hands (timestamp, small_blind, big_blind, dealer_button, player_ids)
-            VALUES (?, ?, ?, ?, ?)
-        """,
-            (timestamp, small_blind, big_blind, dealer_button, player_ids_json),
+        params = (
+            self.session_id,
+            timestamp,
+            small_blind,
+            big_blind,
+            dealer_button,
+            json.dumps(player_ids, ensure_ascii=False),
         )
 
+        if self.batch_hands is None and self._queue is None:
+            # 書き込みごとにコミットする場合は INSERT 時に SQLite に採番させる（hand_id が飛ばない）
+            try:
+                hand_id = self.conn.execute(_WRITE_SQL["hand"], (None,) + params).lastrowid
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self._rows_written += 1
+            self._stats.start_hand(hand_id, player_ids, self.session_id)
+            self._commit()
+            self.conn.commit()
+            return hand_id
+
+        if self._next_hand_id > self._hand_id_limit:
+            self._reserve_hand_ids()
+        hand_id = self._next_hand_id
+        self._next_hand_id += 1
+
+        self._stats.start_hand(hand_id, player_ids, self.session_id)
+        self._write("hand", (hand_id,) + params)
+        return hand_id
+
+    def _reserve_hand_ids(self):
+        """
+        hand_id をまとめて予約する（まとめて書き込む場合）
+
+        hands の AUTOINCREMENT の値（sqlite_sequence）を1回のトランザクションで進め、
+        予約した範囲から手元で採番する。同じDBに書き込む他の接続とは範囲が重ならないので、
+        hand_id を書き込みを待たずに返せる。予約する個数は _HAND_ID_BLOCK_MIN から始めて
+        予約のたびに _HAND_ID_BLOCK まで倍にし、使わなかった分は close かプロセス終了時に返す。
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'hands'")
+            row = cursor.fetchone()
+            cursor.execute("SELECT COALESCE(MAX(hand_id), 0) FROM hands")
+            last = max(row[0] if row else 0, cursor.fetchone()[0])
+            limit = last + self._hand_id_block
+            if row:
+                cursor.execute(
+                    "UPDATE sqlite_sequence SET seq = ? WHERE name = 'hands'", (limit,)
+                )
+            else:
+                cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES ('hands', ?)", (limit,)
+                )
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        if self._hand_id_limit == 0:
+            # close を呼ばずに終了した場合も、使わなかった分を返せるようにする
+            atexit.register(_release_hand_ids_at_exit, weakref.ref(self))
+        self._next_hand_id = last + 1
+        self._hand_id_limit = limit
+        self._hand_id_block = min(self._hand_id_block * 2, _HAND_ID_BLOCK)
+
+    def _release_hand_ids(self):
+        """予約して使わなかった hand_id を返す（後から他の接続が予約していない場合のみ）"""
+        if self._closed or self._next_hand_id > self._hand_id_limit:
+            return
+        self.conn.execute(
+            "UPDATE sqlite_sequence SET seq = ? WHERE name = 'hands' AND seq = ?",
+            (self._next_hand_id - 1, self._hand_id_limit),
+        )
         self.conn.commit()
-        return cursor.lastrowid
+        self._hand_id_limit = self._next_hand_id - 1
+
+    def register_player(self, player_id: int, name: str):
+        """
+        セッションの席（プレイヤーID）にプレイヤー名を記録
+
+        プレイヤーIDは席番号なのでセッションをまたぐと別人を指す。セッションをまたいだ集計
+        （get_player_stats_by_name）はこの対応を使う。セッションが一覧に載るよう、すぐにコミットする。
+
+        Args:
+            player_id: プレイヤーID
+            name: プレイヤー名
+        """
+        self._write("session_player", (self.session_id, player_id, name), commit=False)
+        self._commit()
 
     def record_action(
         self,
@@ -179,19 +1144,13 @@ class GameHistoryDB:
             amount: ベット額
             pot_after: アクション後のポット額
         """
-        cursor = self.conn.cursor()
         timestamp = datetime.now().isoformat()
-
-        cursor.execute(
-            """
-            INSERT INTO actions (hand_id, phase, player_id, action_type, amount, pot_after, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-            (hand_id, phase, player_id, action_type, amount, pot_after, timestamp),
+        self._stats.action(hand_id, phase, player_id, action_type)
+        self._write(
+            "action",
+            (hand_id, self.session_id, phase, player_id, action_type, amount, pot_after, timestamp),
         )
 
-        self.conn.commit()
-
     def record_community_cards(self, hand_id: int, phase: str, cards: List[str]):
         """
         コミュニティカードを記録
@@ -201,19 +1160,10 @@ class GameHistoryDB:
             phase: フェーズ（flop, turn, river）
             cards: カードのリスト（例: ["A♠", "K♥", "Q♣"]）
         """
-        cursor = self.conn.cursor()
         timestamp = datetime.now().isoformat()
         cards_json = json.dumps(cards, ensure_ascii=False)
-
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO community_cards (hand_id, phase, cards, timestamp)
-            VALUES (?, ?, ?, ?)
-        """,
-            (hand_id, phase, cards_json, timestamp),
-        )
-
-        self.conn.commit()
+        self._stats.community_cards(hand_id, phase)
+        self._write("community_cards", (hand_id, phase, cards_json, timestamp))
 
     def record_showdown(
         self,
@@ -233,21 +1183,13 @@ class GameHistoryDB:
             hand_rank: 役の強さ（例: "Pair of Aces"）
             winnings: 獲得チップ数
         """
-        cursor = self.conn.cursor()
         timestamp = datetime.now().isoformat()
         hole_cards_json = json.dumps(hole_cards, ensure_ascii=False) if hole_cards else None
-
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO showdown_results 
-            (hand_id, player_id, hole_cards, hand_rank, winnings, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (hand_id, player_id, hole_cards_json, hand_rank, winnings, timestamp),
+        self._stats.showdown(hand_id, player_id, winnings)
+        self._write(
+            "showdown", (hand_id, player_id, hole_cards_json, hand_rank, winnings, timestamp)
         )
 
-        self.conn.commit()
-
     def end_hand(self, hand_id: int):
         """
         ハンドの終了を記録
@@ -255,210 +1197,456 @@ class GameHistoryDB:
         Args:
             hand_id: ハンドID
         """
-        cursor = self.conn.cursor()
         ended_at = datetime.now().isoformat()
+        self._stats.end_hand(hand_id)
+        self._write("end_hand", (ended_at, hand_id), commit=False)
 
-        cursor.execute(
-            """
-            UPDATE hands SET ended_at = ? WHERE hand_id = ?
-        """,
-            (ended_at, hand_id),
-        )
-
-        self.conn.commit()
+        self._session_hands += 1
+        self._hands_since_commit += 1
+        if self.batch_hands is None or self._hands_since_commit >= self.batch_hands:
+            self._hands_since_commit = 0
+            self._commit()
 
-    def get_hand_history(self, hand_id: int) -> Optional[Dict[str, Any]]:
+    def _write(self, kind: str, params: Tuple, commit: bool = True):
         """
-        特定ハンドの完全な履歴を取得
+        1件の記録を次のコミットで書き込む束に積む
 
         Args:
-            hand_id: ハンドID
+            kind: 記録の種類（_WRITE_SQL のキー）
+            params: SQLのパラメータ
+            commit: バッチ化しない場合に書き込みごとにコミットするか
+        """
+        self._batch.append((kind, params))
+        if commit and self.batch_hands is None:
+            self._commit()
+
+    def _commit(self):
+        """
+        溜めた記録をコミット
+
+        直接書き込む場合はその場で1つのトランザクションで書き込み、バックグラウンド書き込みでは
+        書き込みスレッドに渡すだけ。
+        """
+        self._stage_stats()
+        if self._queue is not None:
+            self._send("commit")
+        elif self._batch:
+            rows = self._batch
+            self._batch = []
+            self._write_rows(self.conn, rows)
+
+    def _stage_stats(self):
+        """集計テーブルとセッション一覧への増分を、コミットする記録と同じトランザクションに加える"""
+        stat_rows, action_rows = self._stats.take_deltas()
+        self._batch.extend(("player_stats", row) for row in stat_rows)
+        self._batch.extend(("player_action_counts", row) for row in action_rows)
+        if self._batch:
+            last_hand_at = datetime.now().isoformat() if self._session_hands else None
+            self._batch.append(
+                (
+                    "session",
+                    (self.session_id, self._session_started_at, last_hand_at, self._session_hands),
+                )
+            )
+            self._session_hands = 0
+
+    def _write_rows(self, conn: sqlite3.Connection, rows: List[Tuple[str, Tuple]]):
+        """
+        記録の束を1つのトランザクションで書き込んでコミット
+
+        種類ごとに executemany でまとめて流す（_WRITE_SQL の順）。失敗した場合はロールバックして
+        例外を送出する。
+        """
+        grouped: Dict[str, List[Tuple]] = {kind: [] for kind in _WRITE_SQL}
+        for kind, params in rows:
+            grouped[kind].append(params)
+        try:
+            for kind, params_list in grouped.items():
+                if params_list:
+                    conn.executemany(_WRITE_SQL[kind], params_list)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        self._rows_written += len(rows)
+        self._commits += 1
+
+    def _send(self, kind: str, done: Optional[threading.Event] = None):
+        """
+        溜めた記録の束を書き込みキューに積む
+
+        キューが満杯の場合は空きが出るまで待ち、待った回数と時間を記録する（背圧）。
+        """
+        if self._writer_error is not None:
+            raise self._writer_error
+        item = (kind, self._batch, done)
+        self._batch = []
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(item)
+            self._blocked_puts += 1
+            self._blocked_seconds += time.perf_counter() - started
+        self._batches_sent += 1
+        depth = self._queue.qsize()
+        if depth > self._peak_queue_depth:
+            self._peak_queue_depth = depth
+
+    def _writer_loop(self, conn: sqlite3.Connection):
+        """
+        書き込みスレッドの本体
+
+        受け取った記録の束を溜め、_write_rows でまとめて書き込んでコミットする。
+        コミット指示の時点で後続の束が既にキューにある場合は、それも合わせて
+        1回でコミットする（グループコミット。flush / close の指示は必ずその場でコミットする）。
+        書き込みに失敗した場合はエラーを保存し、以降の記録は捨てながらキューを空け続ける
+        （記録側が満杯のキューで待ち続けないようにするため。エラーは次の記録や flush で送出される）。
+        """
+        pending: List[Tuple[str, Tuple]] = []
+        while True:
+            kind, rows, done = self._queue.get()
+            pending.extend(rows)
+            if (
+                kind == "commit"
+                and len(pending) < _GROUP_COMMIT_ROWS
+                and not self._queue.empty()
+            ):
+                continue
+
+            if self._writer_error is None and pending:
+                try:
+                    self._write_rows(conn, pending)
+                except Exception as e:
+                    self._writer_error = e
+            pending = []
+
+            if done is not None:
+                done.set()
+            if kind == "close":
+                break
+        conn.close()
+
+    def flush(self):
+        """
+        まとめている書き込みをコミット
+
+        バックグラウンド書き込みでは、それまでの記録がすべてコミットされるまで待つ。
+        """
+        self._hands_since_commit = 0
+        if self._queue is None:
+            self._commit()
+            return
+
+        self._stage_stats()
+        done = threading.Event()
+        self._send("flush", done)
+        done.wait()
+        if self._writer_error is not None:
+            raise self._writer_error
+
+    def writer_stats(self) -> Dict[str, Any]:
+        """
+        書き込みの統計を取得（直接書き込む場合はキュー関連の値が0）
 
         Returns:
-            ハンド情報の辞書、存在しない場合はNone
+            キューの深さ・最大深さ、キューに積んだ束の数、書き込んだ行数、コミット回数と、
+            キューが満杯で記録側が待った回数・合計秒数（背圧）の辞書
         """
-        cursor = self.conn.cursor()
+        return {
+            "async_writes": self._queue is not None,
+            "queue_size": self.queue_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "peak_queue_depth": self._peak_queue_depth,
+            "batches_sent": self._batches_sent,
+            "rows_written": self._rows_written,
+            "commits": self._commits,
+            "blocked_puts": self._blocked_puts,
+            "blocked_seconds": self._blocked_seconds,
+        }
 
-        # ハンド基本情報
-        cursor.execute("SELECT * FROM hands WHERE hand_id = ?", (hand_id,))
-        hand_row = cursor.fetchone()
+    def rebuild_player_stats(self, session_id: Optional[str] = None):
+        """
+        記録済みの履歴から集計テーブルを作り直す
 
-        if not hand_row:
-            return None
+        集計テーブルがない（またはセッション別でない）既存のDBを開いたときに呼ばれる。
+        全セッションの履歴を1回ずつ走査し、セッションとプレイヤーの組ごとに集計する。
 
-        hand_data = dict(hand_row)
-        hand_data["player_ids"] = json.loads(hand_data["player_ids"])
+        Args:
+            session_id: 指定した場合はそのセッションの集計だけを作り直す
+        """
+        self.flush()
 
-        # アクション履歴
+        cursor = self.conn.cursor()
+        if session_id is None:
+            where, params = "", ()
+            cursor.execute("DELETE FROM player_stats")
+            cursor.execute("DELETE FROM player_action_counts")
+        else:
+            where, params = " WHERE session_id = ?", (session_id,)
+            cursor.execute("DELETE FROM player_stats" + where, params)
+            cursor.execute("DELETE FROM player_action_counts" + where, params)
+        hands_query = "SELECT hand_id FROM hands" + where
+
+        tracker = _PlayerStatsTracker()
         cursor.execute(
-            """
-            SELECT * FROM actions 
-            WHERE hand_id = ? 
-            ORDER BY action_id
-        """,
-            (hand_id,),
+            "SELECT hand_id, session_id, player_ids FROM hands" + where + " ORDER BY hand_id",
+            params,
         )
-        hand_data["actions"] = [dict(row) for row in cursor.fetchall()]
+        for row in cursor.fetchall():
+            tracker.start_hand(row["hand_id"], json.loads(row["player_ids"]), row["session_id"])
 
-        # コミュニティカード
+        # フロップを見たかどうかはフロップ前のフォールドで決まるので、
+        # プリフロップのアクション → フロップ → それ以降のアクションの順に流す
+        # （ハンドの記録がないアクションはセッションが分からないので数えない）
         cursor.execute(
-            """
-            SELECT phase, cards FROM community_cards 
-            WHERE hand_id = ?
+            f"SELECT hand_id FROM community_cards WHERE phase = 'flop' AND hand_id IN ({hands_query})",
+            params,
+        )
+        flop_hands = {row["hand_id"] for row in cursor.fetchall()} & tracker.hands.keys()
+        cursor.execute(
+            f"""
+            SELECT hand_id, phase, player_id, action_type FROM actions
+            WHERE hand_id IN ({hands_query})
+            ORDER BY hand_id, phase != 'preflop', action_id
         """,
-            (hand_id,),
+            params,
         )
-        community_cards = {}
         for row in cursor.fetchall():
-            community_cards[row["phase"]] = json.loads(row["cards"])
-        hand_data["community_cards"] = community_cards
+            hand_id = row["hand_id"]
+            if row["phase"] != "preflop" and hand_id in flop_hands:
+                tracker.community_cards(hand_id, "flop")  # 2回目以降は何もしない
+            tracker.action(hand_id, row["phase"], row["player_id"], row["action_type"])
+        for hand_id in flop_hands:
+            tracker.community_cards(hand_id, "flop")  # フロップ以降のアクションがないハンド
 
-        # ショーダウン結果
         cursor.execute(
-            """
-            SELECT * FROM showdown_results 
-            WHERE hand_id = ?
-        """,
-            (hand_id,),
+            f"SELECT hand_id, player_id, winnings FROM showdown_results WHERE hand_id IN ({hands_query})",
+            params,
         )
-        showdown_results = []
         for row in cursor.fetchall():
-            result = dict(row)
-            if result["hole_cards"]:
-                result["hole_cards"] = json.loads(result["hole_cards"])
-            showdown_results.append(result)
-        hand_data["showdown_results"] = showdown_results
+            if row["hand_id"] in tracker.hands:
+                tracker.showdown(row["hand_id"], row["player_id"], row["winnings"])
 
-        return hand_data
+        stat_rows, action_rows = tracker.take_deltas()
+        cursor.executemany(_WRITE_SQL["player_stats"], stat_rows)
+        cursor.executemany(_WRITE_SQL["player_action_counts"], action_rows)
+        self.conn.commit()
 
-    def get_recent_hands(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def truncate_session(self, after_hand_id: Optional[int] = None):
         """
-        直近のハンド履歴を取得
+        このセッションの after_hand_id より後のハンドの記録を削除する
 
-        Args:
-            limit: 取得する件数
+        チェックポイントから再開する際、チェックポイントの後に記録されて再実行されるハンドを
+        消しておき、同じハンドを二重に記録・集計しないようにする。集計テーブルとセッション一覧の
+        ハンド数もこのセッションの分だけ作り直す。
 
-        Returns:
-            ハンド情報のリスト
+        Args:
+            after_hand_id: 残す最後のハンドID（None の場合はセッションの全ハンドを削除）
         """
+        self.flush()
+        after_hand_id = after_hand_id or 0
+        hands_query = "SELECT hand_id FROM hands WHERE session_id = ? AND hand_id > ?"
+        params = (self.session_id, after_hand_id)
+
         cursor = self.conn.cursor()
+        for table in ("actions", "community_cards", "showdown_results"):
+            cursor.execute(f"DELETE FROM {table} WHERE hand_id IN ({hands_query})", params)
+        cursor.execute("DELETE FROM hands WHERE session_id = ? AND hand_id > ?", params)
         cursor.execute(
             """
-            SELECT hand_id FROM hands 
-            ORDER BY hand_id DESC 
-            LIMIT ?
+            UPDATE sessions SET
+            hands = (SELECT COUNT(*) FROM hands WHERE session_id = ?),
+            last_hand_at = (SELECT MAX(ended_at) FROM hands WHERE session_id = ?)
+            WHERE session_id = ?
         """,
-            (limit,),
+            (self.session_id,) * 3,
         )
+        self.conn.commit()
+        self.rebuild_player_stats(self.session_id)
 
-        hand_ids = [row["hand_id"] for row in cursor.fetchall()]
-        return [self.get_hand_history(hand_id) for hand_id in hand_ids]
-
-    def get_player_action_stats(self, player_id: int) -> Dict[str, Any]:
+    def record_league_match(
+        self,
+        league_id: str,
+        round: int,
+        agent_a: str,
+        agent_b: str,
+        seed: int,
+        hands: int,
+        net_a: int,
+        net_b: int,
+        winner: Optional[str],
+    ) -> int:
         """
-        プレイヤーのアクション統計を取得
+        リーグ戦の1試合の結果を記録
 
         Args:
-            player_id: プレイヤーID
+            league_id: リーグID
+            round: ラウンド番号
+            agent_a: エージェントA
+            agent_b: エージェントB
+            seed: 試合の乱数シード（同じシードで試合を再現できる）
+            hands: 試合のハンド数
+            net_a: エージェントAの収支
+            net_b: エージェントBの収支
+            winner: 勝者のエージェント名（引き分けの場合はNone）
 
         Returns:
-            統計情報の辞書
+            新しく作成されたmatch_id
         """
         cursor = self.conn.cursor()
+        timestamp = datetime.now().isoformat()
 
-        # 総アクション数
         cursor.execute(
             """
-            SELECT action_type, COUNT(*) as count
-            FROM actions
-            WHERE player_id = ?
-            GROUP BY action_type
+            INSERT INTO league_matches
+            (league_id, round, agent_a, agent_b, seed, hands, net_a, net_b, winner, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-            (player_id,),
+            (league_id, round, agent_a, agent_b, seed, hands, net_a, net_b, winner, timestamp),
         )
-        action_counts = {row["action_type"]: row["count"] for row in cursor.fetchall()}
 
-        # 参加ハンド数
-        cursor.execute(
-            """
-            SELECT COUNT(DISTINCT hand_id) as hand_count
-            FROM actions
-            WHERE player_id = ?
-        """,
-            (player_id,),
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def close(self):
+        """まとめている書き込みをコミットしてデータベース接続を閉じる"""
+        if self._writer is None:
+            self.flush()
+            self._release_hand_ids()
+            self.conn.close()
+            self._closed = True
+            return
+
+        # 書き込みスレッドは残りを書き出してから自分の接続を閉じて終了する
+        self._stage_stats()
+        self._queue.put(("close", self._batch, None))
+        self._batch = []
+        self._writer.join()
+        self._writer = None
+        if self._writer_error is None:
+            self._release_hand_ids()
+        self.conn.close()
+        self._closed = True
+        if self._writer_error is not None:
+            raise self._writer_error
+
+
+class EventBuffer:
+    """
+    GameHistoryDB と同じ記録インターフェースを持つメモリ上のイベントバッファ
+
+    シミュレーションモードで使用する。SQLite への書き込みや JSON 変換は行わず、
+    イベントをタプルのまま上限付きの deque に積む（古いものから破棄）。
+    """
+
+    def __init__(self, maxlen: Optional[int] = 100_000):
+        self.db_path = None
+        self.events = deque(maxlen=maxlen)
+        self._next_hand_id = 1
+
+    def start_new_hand(
+        self,
+        small_blind: int,
+        big_blind: int,
+        dealer_button: int,
+        player_ids: List[int],
+    ) -> int:
+        """新しいハンドを開始し、hand_idを返す"""
+        hand_id = self._next_hand_id
+        self._next_hand_id += 1
+        self.events.append(
+            ("hand", hand_id, small_blind, big_blind, dealer_button, player_ids)
         )
-        hand_count = cursor.fetchone()["hand_count"]
+        return hand_id
 
-        # ショーダウン統計
-        cursor.execute(
-            """
-            SELECT 
-                COUNT(*) as showdowns,
-                SUM(CASE WHEN winnings > 0 THEN 1 ELSE 0 END) as wins,
-                SUM(winnings) as total_winnings
-            FROM showdown_results
-            WHERE player_id = ?
-        """,
-            (player_id,),
+    def record_action(
+        self,
+        hand_id: int,
+        phase: str,
+        player_id: int,
+        action_type: str,
+        amount: int = 0,
+        pot_after: int = 0,
+    ):
+        """プレイヤーのアクションを記録"""
+        self.events.append(
+            ("action", hand_id, phase, player_id, action_type, amount, pot_after)
         )
-        showdown_row = cursor.fetchone()
 
-        return {
-            "player_id": player_id,
-            "hands_played": hand_count,
-            "action_counts": action_counts,
-            "showdowns": showdown_row["showdowns"] or 0,
-            "showdown_wins": showdown_row["wins"] or 0,
-            "total_winnings": showdown_row["total_winnings"] or 0,
-        }
+    def record_community_cards(self, hand_id: int, phase: str, cards: List[str]):
+        """コミュニティカードを記録"""
+        self.events.append(("community_cards", hand_id, phase, cards))
 
-    def get_player_recent_actions(
-        self, player_id: int, limit: int = 20
-    ) -> List[Dict[str, Any]]:
-        """
-        プレイヤーの最近のアクションを取得
+    def record_showdown(
+        self,
+        hand_id: int,
+        player_id: int,
+        hole_cards: Optional[List[str]],
+        hand_rank: Optional[str],
+        winnings: int,
+    ):
+        """ショーダウン結果を記録"""
+        self.events.append(
+            ("showdown", hand_id, player_id, hole_cards, hand_rank, winnings)
+        )
 
-        Args:
-            player_id: プレイヤーID
-            limit: 取得する件数
+    def end_hand(self, hand_id: int):
+        """ハンドの終了を記録"""
+        self.events.append(("end_hand", hand_id))
 
-        Returns:
-            アクション履歴のリスト
-        """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT * FROM actions
-            WHERE player_id = ?
-            ORDER BY action_id DESC
-            LIMIT ?
-        """,
-            (player_id, limit),
-        )
+    def register_player(self, player_id: int, name: str):
+        """GameHistoryDB との互換用（何もしない）"""
 
-        return [dict(row) for row in cursor.fetchall()]
+    def drain(self) -> List[Tuple]:
+        """溜まっているイベントをすべて取り出す"""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def flush(self):
+        """GameHistoryDB との互換用（何もしない）"""
 
     def close(self):
-        """データベース接続を閉じる"""
-        self.conn.close()
+        """GameHistoryDB との互換用（何もしない）"""
 
 
 # エージェント向けグローバルAPI関数
-_db_instance: Optional[GameHistoryDB] = None
+_db_instance: Optional[GameHistoryReader] = None
 
 
-def _get_db() -> GameHistoryDB:
-    """データベースインスタンスを取得（シングルトン）"""
+def _get_db() -> GameHistoryReader:
+    """
+    読み込み専用の接続を取得（シングルトン）
+
+    ゲーム側が記録中のDBを読むだけなので、テーブルの作成や移行、セッションの追加は行わない。
+
+    Raises:
+        sqlite3.OperationalError: まだ履歴が記録されていない（DBファイルがない）場合
+    """
     global _db_instance
     if _db_instance is None:
-        _db_instance = GameHistoryDB()
+        _db_instance = GameHistoryReader()
     return _db_instance
 
 
+def _resolve_session(db: GameHistoryReader, session_id: Optional[str]) -> str:
+    """
+    参照するセッションを決める
+
+    未指定の場合は呼び出しのたびに最後に開始したセッション（ゲーム側が記録中のセッション）を
+    調べ直す（長く動くエージェントが次のゲームの開始後も古いセッションを読み続けないように）。
+    """
+    if session_id is not None:
+        return session_id
+    return db.get_latest_session_id() or db.session_id
+
+
 def get_game_history(
     hand_id: Optional[int] = None,
     player_id: Optional[int] = None,
     limit: int = 10,
+    session_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     ゲーム履歴を取得するエージェント向けAPI
@@ -467,11 +1655,13 @@ def get_game_history(
         hand_id: 特定のハンドIDを指定（指定した場合はそのハンドの詳細を返す）
         player_id: プレイヤーID（指定した場合はそのプレイヤーの統計を含む）
         limit: 取得する件数（hand_idが未指定の場合）
+        session_id: 対象のセッション（Noneの場合は最後に開始したセッション）
 
     Returns:
         履歴情報の辞書
     """
     db = _get_db()
+    session_id = _resolve_session(db, session_id)
 
     result = {}
 
@@ -480,42 +1670,57 @@ def get_game_history(
         result["hand"] = db.get_hand_history(hand_id)
     else:
         # 直近のハンドを取得
-        result["recent_hands"] = db.get_recent_hands(limit)
+        result["recent_hands"] = db.get_recent_hands(limit, session_id=session_id)
 
     if player_id is not None:
         # プレイヤー統計を取得
-        result["player_stats"] = db.get_player_action_stats(player_id)
-        result["recent_actions"] = db.get_player_recent_actions(player_id, limit)
+        result["player_stats"] = db.get_player_action_stats(player_id, session_id)
+        result["recent_actions"] = db.get_player_recent_actions(
+            player_id, limit, session_id=session_id
+        )
 
     return result
 
 
-def get_opponent_stats(opponent_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+def get_opponent_stats(
+    opponent_ids: List[int], session_id: Optional[str] = None
+) -> Dict[int, Dict[str, Any]]:
     """
     複数の相手プレイヤーの統計を一括取得
 
     Args:
         opponent_ids: 相手プレイヤーIDのリスト
+        session_id: 対象のセッション（Noneの場合は最後に開始したセッション）
 
     Returns:
         プレイヤーIDをキーとした統計情報の辞書
     """
     db = _get_db()
+    session_id = _resolve_session(db, session_id)
     return {
-        player_id: db.get_player_action_stats(player_id) for player_id in opponent_ids
+        player_id: db.get_player_action_stats(player_id, session_id)
+        for player_id in opponent_ids
     }
 
 
-def get_last_hand_id() -> Optional[int]:
+def get_last_hand_id(session_id: Optional[str] = None) -> Optional[int]:
     """
-    最新のハンドIDを取得
+    セッションの最新のハンドIDを取得
+
+    Args:
+        session_id: 対象のセッション（Noneの場合は最後に開始したセッション）
 
     Returns:
         最新のハンドID、存在しない場合はNone
     """
     db = _get_db()
     cursor = db.conn.cursor()
-    cursor.execute("SELECT MAX(hand_id) as max_id FROM hands")
+    if db._legacy:
+        cursor.execute("SELECT MAX(hand_id) as max_id FROM hands")
+    else:
+        cursor.execute(
+            "SELECT MAX(hand_id) as max_id FROM hands WHERE session_id = ?",
+            (_resolve_session(db, session_id),),
+        )
     row = cursor.fetchone()
     return row["max_id"] if row["max_id"] else None
-
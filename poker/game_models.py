@@ -2,10 +2,11 @@
 Poker game models: Card, Deck, Suit classes and game state types
 """
 
+import json
 import random
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 class Suit(Enum):
@@ -17,8 +18,15 @@ class Suit(Enum):
     SPADES = "spades"
 
 
-class Card:
-    """トランプカードクラス"""
+class Card(int):
+    """トランプカードクラス
+
+    カードは 0〜51 の整数 ``(rank - 2) * 4 + スート番号`` そのものとして表現される。
+    52枚のインスタンスはモジュール読み込み時に1度だけ生成され、``Card(rank, suit)``
+    は常に同じインスタンスを返す。デッキ・手札・評価器は整数としてそのまま扱える。
+    """
+
+    __slots__ = ()
 
     # スートの記号マップ
     SUIT_SYMBOLS = {
@@ -45,7 +53,7 @@ class Card:
         14: "A",
     }
 
-    def __init__(self, rank: int, suit: Suit):
+    def __new__(cls, rank: int, suit: Suit):
         """
         Args:
             rank: カードのランク（2-14, 11=J, 12=Q, 13=K, 14=A）
@@ -53,8 +61,39 @@ class Card:
         """
         if rank < 2 or rank > 14:
             raise ValueError("Rank must be between 2 and 14")
-        self.rank = rank
-        self.suit = suit
+        if suit not in SUIT_INDEX:
+            raise ValueError(f"Invalid suit: {suit}")
+        return ALL_CARDS[(rank - 2) * 4 + SUIT_INDEX[suit]]
+
+    @classmethod
+    def from_index(cls, index: int) -> "Card":
+        """整数表現（0〜51）から共有インスタンスを取得"""
+        return ALL_CARDS[index]
+
+    @classmethod
+    def from_str(cls, text: str) -> "Card":
+        """
+        文字列からカードを取得（例: "A♠", "As", "10♥", "Th"）
+
+        Raises:
+            ValueError: 解釈できない文字列の場合
+        """
+        text = text.strip()
+        rank = RANK_FROM_STR.get(text[:-1].upper())
+        suit = SUIT_FROM_STR.get(text[-1:].lower())
+        if rank is None or suit is None:
+            raise ValueError(f"Invalid card string: {text!r}")
+        return cls(rank, suit)
+
+    @property
+    def rank(self) -> int:
+        """カードのランク（2-14）"""
+        return (self >> 2) + 2
+
+    @property
+    def suit(self) -> Suit:
+        """カードのスート"""
+        return SUITS[self & 3]
 
     @property
     def rank_name(self) -> str:
@@ -68,45 +107,91 @@ class Card:
 
     def __str__(self) -> str:
         """カードの文字列表現（例: A♠）"""
-        return f"{self.rank_name}{self.suit_symbol}"
+        return CARD_STRINGS[self]
 
-    def __eq__(self, other) -> bool:
-        if not isinstance(other, Card):
-            return False
-        return self.rank == other.rank and self.suit == other.suit
-
-    def __hash__(self) -> int:
-        return hash((self.rank, self.suit))
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
 
     def __repr__(self) -> str:
         return f"Card({self.rank_name}, {self.suit.value})"
 
+    def __bool__(self) -> bool:
+        # 0番のカード（2♥）も真として扱う
+        return True
+
+    def __reduce__(self):
+        return (Card.from_index, (int(self),))
+
+    def __copy__(self) -> "Card":
+        return self
+
+    def __deepcopy__(self, memo) -> "Card":
+        return self
+
+
+# スート番号（整数表現の下位2bit）とスートの対応
+SUITS = tuple(Suit)
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+
+# 文字列表記（記号・英字どちらも可）からランク/スートへの対応
+RANK_FROM_STR = {name: rank for rank, name in Card.RANK_NAMES.items()}
+RANK_FROM_STR["T"] = 10
+SUIT_FROM_STR = {symbol: suit for suit, symbol in Card.SUIT_SYMBOLS.items()}
+SUIT_FROM_STR.update(
+    {"h": Suit.HEARTS, "d": Suit.DIAMONDS, "c": Suit.CLUBS, "s": Suit.SPADES}
+)
+
+# 52枚の共有カードインスタンス（インデックス = 整数表現）
+ALL_CARDS = tuple(int.__new__(Card, index) for index in range(52))
+
+# 52枚の文字列表現（str(card) はゲーム状態の生成で頻繁に呼ばれるため事前計算）
+CARD_STRINGS = tuple(f"{card.rank_name}{card.suit_symbol}" for card in ALL_CARDS)
+
 
 class Deck:
     """トランプデッキクラス"""
 
-    def __init__(self):
-        """標準的な52枚のデッキを作成"""
+    def __init__(self, lazy: bool = False, rng: Optional[random.Random] = None):
+        """
+        標準的な52枚のデッキを作成
+
+        Args:
+            lazy: True の場合、リセット時に52枚をシャッフルせず、配るたびに
+                残りのカードから一様に1枚を選ぶ（配られるカードの分布は同じで、
+                1ハンドで使う十数枚分の乱数しか消費しない）
+            rng: シャッフル・配布に使う乱数生成器（None の場合は共有の random モジュール）
+        """
+        self.lazy = lazy
+        self.rng = rng
         self.cards: List[Card] = []
         self.reset()
 
     def reset(self):
         """デッキをリセットして全カードを追加"""
-        self.cards = []
-        for suit in Suit:
-            for rank in range(2, 15):  # 2-14 (A)
-                self.cards.append(Card(rank, suit))
-        self.shuffle()
+        self.cards = list(ALL_CARDS)
+        if not self.lazy:
+            self.shuffle()
 
     def shuffle(self):
-        """デッキをシャッフル"""
-        random.shuffle(self.cards)
+        """
+        デッキをシャッフル
+
+        カードは整数なので、乱数キーでのソートで置換を作る
+        （random.shuffle より乱数生成の呼び出しが軽い）
+        """
+        draw = (self.rng or random).random
+        self.cards.sort(key=lambda _card: draw())
 
     def deal_card(self) -> Card:
         """カードを1枚配る"""
-        if not self.cards:
+        cards = self.cards
+        if not cards:
             raise ValueError("Cannot deal from empty deck")
-        return self.cards.pop()
+        if self.lazy:
+            # 残りからランダムに選んだカードを末尾と入れ替えて取り出す
+            index = (self.rng or random).randrange(len(cards))
+            cards[index], cards[-1] = cards[-1], cards[index]
+        return cards.pop()
 
     def cards_remaining(self) -> int:
         """残りカード数を取得"""
@@ -124,9 +209,48 @@ class GamePhase(Enum):
     FINISHED = "finished"
 
 
-@dataclass
+class PlayerSnapshot(NamedTuple):
+    """スナップショット内の1プレイヤー分の状態（エージェント自体は含まない）"""
+
+    chips: int
+    hole_cards: Tuple[Card, ...]
+    current_bet: int
+    total_bet_this_hand: int
+    status: Enum  # PlayerStatus
+    is_dealer: bool
+    is_small_blind: bool
+    is_big_blind: bool
+
+
+class GameSnapshot(NamedTuple):
+    """
+    PokerGame.snapshot() が返すハンド途中のゲーム状態
+
+    不変のタプルのみで構成されるため、同じスナップショットから何度でも復元できる。
+    """
+
+    players: Tuple[PlayerSnapshot, ...]
+    deck: Tuple[Card, ...]  # 残りのカード（配る順）
+    deck_lazy: bool  # 配るたびに残りから乱数で選ぶデッキか
+    deck_rng_state: Optional[Tuple]  # デッキの乱数生成器の状態（getstate()、ないときはNone）
+    community_cards: Tuple[Card, ...]
+    phase: GamePhase
+    pot: int
+    current_bet: int
+    hand_number: int
+    dealer_button: int
+    current_player_index: int
+    betting_round_complete: bool
+    last_raiser_index: Optional[int]
+    has_bet_or_raise_this_round: bool
+    current_hand_id: Optional[int]
+    history_start: int  # このハンドの履歴が始まる action_history 上の位置
+    hand_history: Tuple[Any, ...]  # このハンドの ActionEvent
+
+
+@dataclass(frozen=True)
 class PlayerInfo:
-    """ゲーム状態用のプレイヤー情報（簡略版）"""
+    """ゲーム状態用のプレイヤー情報（簡略版、変更不可）"""
 
     id: int
     chips: int
@@ -134,14 +258,19 @@ class PlayerInfo:
     status: str
 
 
-@dataclass
+@dataclass(frozen=True)
 class GameState:
-    """LLMプレイヤー用のゲーム状態"""
+    """
+    LLMプレイヤー用のゲーム状態
+
+    PokerGame がキャッシュして複数の呼び出し元で共有するため、変更不可にしている
+    （リストの項目はタプルで持ち、to_dict() では新しいリストを返す）。
+    """
 
     your_id: int
     phase: str
-    your_cards: List[str]
-    community: List[str]
+    your_cards: Tuple[str, ...]
+    community: Tuple[str, ...]
     your_chips: int
     your_bet_this_round: int
     your_total_bet_this_hand: int
@@ -149,17 +278,19 @@ class GameState:
     to_call: int
     dealer_button: int
     current_turn: int
-    players: List[PlayerInfo]
-    actions: List[str]
-    history: List[str]
+    players: Tuple[PlayerInfo, ...]
+    actions: Tuple[str, ...]
+    history: Tuple[str, ...]
+    # to_json() の結果のキャッシュ
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """辞書形式に変換"""
         return {
             "your_id": self.your_id,
             "phase": self.phase,
-            "your_cards": self.your_cards,
-            "community": self.community,
+            "your_cards": list(self.your_cards),
+            "community": list(self.community),
             "your_chips": self.your_chips,
             "your_bet_this_round": self.your_bet_this_round,
             "your_total_bet_this_hand": self.your_total_bet_this_hand,
@@ -176,23 +307,31 @@ class GameState:
                 }
                 for player in self.players
             ],
-            "actions": self.actions,
-            "history": self.history,
+            "actions": list(self.actions),
+            "history": list(self.history),
         }
 
+    def to_json(self) -> str:
+        """JSON文字列に変換（LLMへの入力形式。初回変換時に保持する）"""
+        if self._json is None:
+            object.__setattr__(
+                self, "_json", json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+            )
+        return self._json
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "GameState":
         """辞書から作成"""
-        players = [
+        players = tuple(
             PlayerInfo(id=p["id"], chips=p["chips"], bet=p["bet"], status=p["status"])
             for p in data.get("players", [])
-        ]
+        )
 
         return cls(
             your_id=int(data.get("your_id", 0)),
             phase=data.get("phase", ""),
-            your_cards=data.get("your_cards", []),
-            community=data.get("community", []),
+            your_cards=tuple(data.get("your_cards", [])),
+            community=tuple(data.get("community", [])),
             your_chips=data.get("your_chips", 0),
             your_bet_this_round=data.get("your_bet_this_round", 0),
             your_total_bet_this_hand=data.get("your_total_bet_this_hand", 0),
@@ -201,6 +340,6 @@ class GameState:
             dealer_button=data.get("dealer_button", 0),
             current_turn=data.get("current_turn", 0),
             players=players,
-            actions=data.get("actions", []),
-            history=data.get("history", []),
+            actions=tuple(data.get("actions", [])),
+            history=tuple(data.get("history", [])),
         )
@@ -0,0 +1,446 @@
+"""
+Round-robin league runner
+
+登録したエージェント同士の総当たり戦をワーカープロセスに分散して実行し、
+レーティング（Elo と TrueSkill 方式の平均・不確かさ）を試合ごとに更新する。
+
+- 1試合はヘッズアップのデュプリケートマッチ（同じ配牌で座席を入れ替えて2回）で、
+  収支の大きいほうを勝者とする
+- 試合結果は履歴DB（league_matches テーブル）に記録する
+- 2人のレーティングの信頼区間が重ならなくなった組み合わせ（順位が確定した組）は
+  それ以上の試合を組まない
+
+使用例:
+    python -m poker.league --agents random,api:team1_agent,api:team2_agent --hands 200 --seed 0
+"""
+
+import argparse
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .game_history import GameHistoryDB
+from .simulation import TableConfig, create_player, rotate_seats, run_table
+
+# TrueSkill の既定パラメーター
+DEFAULT_MU = 25.0
+DEFAULT_SIGMA = DEFAULT_MU / 3
+DEFAULT_BETA = DEFAULT_SIGMA / 2  # 実力差のうち1試合の結果に現れるばらつき
+DEFAULT_TAU = DEFAULT_SIGMA / 100  # 試合ごとに加える不確かさ（実力の変化）
+
+DEFAULT_ELO = 1500.0
+ELO_K = 24.0
+
+
+def _normal_pdf(x: float) -> float:
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def _normal_cdf(x: float) -> float:
+    return (1 + math.erf(x / math.sqrt(2))) / 2
+
+
+@dataclass
+class Rating:
+    """エージェントのレーティング"""
+
+    mu: float = DEFAULT_MU  # TrueSkill の平均
+    sigma: float = DEFAULT_SIGMA  # TrueSkill の標準偏差（不確かさ）
+    elo: float = DEFAULT_ELO
+    matches: int = 0
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    net_chips: int = 0
+
+    def interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """実力の信頼区間（mu ± z * sigma）"""
+        return self.mu - z * self.sigma, self.mu + z * self.sigma
+
+    @property
+    def conservative(self) -> float:
+        """保守的な実力推定（mu - 3 * sigma）。順位付けに使う"""
+        return self.mu - 3 * self.sigma
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "mu": self.mu,
+            "sigma": self.sigma,
+            "conservative": self.conservative,
+            "elo": self.elo,
+            "matches": self.matches,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "net_chips": self.net_chips,
+        }
+
+
+def update_trueskill(
+    winner: Rating,
+    loser: Rating,
+    beta: float = DEFAULT_BETA,
+    tau: float = DEFAULT_TAU,
+):
+    """勝敗が決まった1試合で TrueSkill（2人・引き分けなし）の平均と不確かさを更新"""
+    winner_var = winner.sigma**2 + tau**2
+    loser_var = loser.sigma**2 + tau**2
+    c = math.sqrt(2 * beta**2 + winner_var + loser_var)
+    t = (winner.mu - loser.mu) / c
+    # 大きく番狂わせた場合に cdf が 0 に潰れないよう下限を設ける
+    v = _normal_pdf(t) / max(_normal_cdf(t), 1e-12)
+    w = v * (v + t)
+
+    winner.mu += winner_var / c * v
+    loser.mu -= loser_var / c * v
+    winner.sigma = math.sqrt(winner_var * max(1 - winner_var / c**2 * w, 1e-6))
+    loser.sigma = math.sqrt(loser_var * max(1 - loser_var / c**2 * w, 1e-6))
+
+
+def update_elo(a: Rating, b: Rating, score_a: float, k: float = ELO_K):
+    """Elo レーティングを更新（score_a は A の得点: 勝ち1・引き分け0.5・負け0）"""
+    expected_a = 1 / (1 + 10 ** ((b.elo - a.elo) / 400))
+    delta = k * (score_a - expected_a)
+    a.elo += delta
+    b.elo -= delta
+
+
+@dataclass
+class MatchSpec:
+    """1試合分の設定（ワーカープロセスに渡す）"""
+
+    round: int
+    agent_a: str
+    agent_b: str
+    seed: int
+    hands: int
+    small_blind: int = 10
+    big_blind: int = 20
+    initial_chips: int = 2000
+
+
+@dataclass
+class MatchResult:
+    """1試合の結果"""
+
+    round: int
+    agent_a: str
+    agent_b: str
+    seed: int
+    hands: int
+    net_a: int
+
+    @property
+    def net_b(self) -> int:
+        """エージェントBの収支"""
+        return -self.net_a
+
+    @property
+    def winner(self) -> Optional[str]:
+        """勝者（引き分けの場合は None）"""
+        if self.net_a > 0:
+            return self.agent_a
+        if self.net_a < 0:
+            return self.agent_b
+        return None
+
+
+def play_match(spec: MatchSpec) -> MatchResult:
+    """
+    ヘッズアップのデュプリケートマッチを1試合実行（ワーカープロセスで実行される）
+
+    同じシードで座席を入れ替えて2回プレイし、毎ハンド初期チップで開始するため、
+    両者が同じカードを1回ずつ担当する。
+    """
+    players = [spec.agent_a, spec.agent_b]
+    net_a = 0
+    hands = 0
+    for rotation in range(2):
+        seats = rotate_seats(players, rotation)
+        result = run_table(
+            TableConfig(
+                table_id=rotation,
+                agents=seats,
+                hands=spec.hands,
+                seed=spec.seed,
+                small_blind=spec.small_blind,
+                big_blind=spec.big_blind,
+                initial_chips=spec.initial_chips,
+                reset_stacks=True,
+            )
+        )
+        hands += result.hands
+        net_a += result.agents[spec.agent_a].net_chips
+    return MatchResult(
+        round=spec.round,
+        agent_a=spec.agent_a,
+        agent_b=spec.agent_b,
+        seed=spec.seed,
+        hands=hands,
+        net_a=net_a,
+    )
+
+
+@dataclass
+class LeagueResult:
+    """リーグ戦の結果"""
+
+    league_id: str
+    ratings: Dict[str, Rating]
+    matches: List[MatchResult]
+    rounds: int
+    settled_pairs: int  # 試合数の上限より前に順位が確定した組み合わせ数
+    matches_saved: int  # 早期終了で省略できた試合数
+    elapsed: float
+    # 試合結果を記録した履歴DB（既定では全セッション共通のファイルで、league_id で引く）
+    db_path: Optional[str] = None
+
+    def ranking(self) -> List[Tuple[str, Rating]]:
+        """保守的な実力推定の高い順に並べたレーティング"""
+        return sorted(
+            self.ratings.items(), key=lambda item: item[1].conservative, reverse=True
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "league_id": self.league_id,
+            "ranking": [
+                dict(rating.to_dict(), agent=agent) for agent, rating in self.ranking()
+            ],
+            "matches": len(self.matches),
+            "rounds": self.rounds,
+            "settled_pairs": self.settled_pairs,
+            "matches_saved": self.matches_saved,
+            "elapsed": self.elapsed,
+            "db_path": self.db_path,
+        }
+
+
+class League:
+    """
+    総当たりリーグ戦
+
+    ラウンドごとに未確定の全組み合わせの試合を1つずつワーカーに投げ、
+    結果を組み合わせ順に記録・レーティングに反映する（同じシードなら結果も同じ）。
+    """
+
+    def __init__(
+        self,
+        agents: List[str],
+        hands_per_match: int = 200,
+        min_matches: int = 2,
+        max_matches: int = 20,
+        z: float = 1.96,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        db: Optional[GameHistoryDB] = None,
+        league_id: Optional[str] = None,
+        small_blind: int = 10,
+        big_blind: int = 20,
+        initial_chips: int = 2000,
+    ):
+        """
+        Args:
+            agents: 参加エージェント名（simulation.create_player で生成できる名前、重複不可）
+            hands_per_match: 1試合で座席ごとにプレイするハンド数（1試合は2倍のハンド数）
+            min_matches: 早期終了を判定する前に行う組み合わせごとの最少試合数
+            max_matches: 組み合わせごとの最大試合数
+            z: 信頼区間の幅（標準偏差の倍数）。区間が重ならなければ順位確定とみなす
+            workers: プロセス数（None の場合はCPU数、1以下なら同一プロセスで順に実行）
+            seed: 乱数シード（各試合のシードはここから導出する）
+            db: 試合結果を記録する履歴DB（None の場合は全セッション共通の履歴DBに
+                league_id 付きのセッションを追加して記録する）
+            league_id: DBに記録するリーグID（None の場合はシードから生成）
+            small_blind: スモールブラインド額
+            big_blind: ビッグブラインド額
+            initial_chips: 初期チップ（毎ハンドこの額から開始する）
+        """
+        if len(agents) < 2:
+            raise ValueError("A league needs at least 2 agents")
+        if len(set(agents)) != len(agents):
+            raise ValueError("Agent names must be unique")
+        if not 1 <= min_matches <= max_matches:
+            raise ValueError("Need 1 <= min_matches <= max_matches")
+        for agent in agents:
+            create_player(agent, 0, initial_chips)  # ワーカーに送る前に名前を検証
+
+        self.agents = list(agents)
+        self.hands_per_match = hands_per_match
+        self.min_matches = min_matches
+        self.max_matches = max_matches
+        self.z = z
+        self.workers = workers
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.initial_chips = initial_chips
+
+        self._seed_source = random.Random(seed)
+        self.league_id = league_id or f"league_{self._seed_source.getrandbits(32):08x}"
+        self.db = db if db is not None else GameHistoryDB(uuid_suffix=self.league_id)
+
+        self.ratings: Dict[str, Rating] = {agent: Rating() for agent in self.agents}
+        self.pairs: List[Tuple[str, str]] = list(itertools.combinations(self.agents, 2))
+        self.pair_matches: Dict[Tuple[str, str], int] = {pair: 0 for pair in self.pairs}
+        self.matches: List[MatchResult] = []
+
+    def pairing_settled(self, agent_a: str, agent_b: str) -> bool:
+        """2人の実力の信頼区間が重ならない（順位が確定した）か"""
+        a, b = self.ratings[agent_a], self.ratings[agent_b]
+        return abs(a.mu - b.mu) > self.z * math.hypot(a.sigma, b.sigma)
+
+    def pending_pairs(self) -> List[Tuple[str, str]]:
+        """次のラウンドで試合を組む組み合わせ"""
+        pending = []
+        for pair in self.pairs:
+            played = self.pair_matches[pair]
+            if played >= self.max_matches:
+                continue
+            if played >= self.min_matches and self.pairing_settled(*pair):
+                continue
+            pending.append(pair)
+        return pending
+
+    def record(self, match: MatchResult):
+        """試合結果をDBに記録し、レーティングを更新"""
+        self.db.record_league_match(
+            league_id=self.league_id,
+            round=match.round,
+            agent_a=match.agent_a,
+            agent_b=match.agent_b,
+            seed=match.seed,
+            hands=match.hands,
+            net_a=match.net_a,
+            net_b=match.net_b,
+            winner=match.winner,
+        )
+        self.matches.append(match)
+        self.pair_matches[(match.agent_a, match.agent_b)] += 1
+
+        a, b = self.ratings[match.agent_a], self.ratings[match.agent_b]
+        a.matches += 1
+        b.matches += 1
+        a.net_chips += match.net_a
+        b.net_chips += match.net_b
+        if match.winner is None:
+            a.draws += 1
+            b.draws += 1
+            update_elo(a, b, 0.5)
+        elif match.winner == match.agent_a:
+            a.wins += 1
+            b.losses += 1
+            update_trueskill(a, b)
+            update_elo(a, b, 1.0)
+        else:
+            b.wins += 1
+            a.losses += 1
+            update_trueskill(b, a)
+            update_elo(a, b, 0.0)
+
+    def run(self) -> LeagueResult:
+        """全組み合わせの順位が確定するか試合数の上限に達するまでラウンドを繰り返す"""
+        started = time.monotonic()
+        workers = self.workers if self.workers is not None else (os.cpu_count() or 1)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        rounds = 0
+        try:
+            while True:
+                pending = self.pending_pairs()
+                if not pending:
+                    break
+                rounds += 1
+                specs = [
+                    MatchSpec(
+                        round=rounds,
+                        agent_a=agent_a,
+                        agent_b=agent_b,
+                        seed=self._seed_source.getrandbits(63),  # SQLite の INTEGER に収める
+                        hands=self.hands_per_match,
+                        small_blind=self.small_blind,
+                        big_blind=self.big_blind,
+                        initial_chips=self.initial_chips,
+                    )
+                    for agent_a, agent_b in pending
+                ]
+                if executor is None:
+                    results = [play_match(spec) for spec in specs]
+                else:
+                    results = list(executor.map(play_match, specs))
+                for match in results:
+                    self.record(match)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        settled = sum(
+            1 for pair in self.pairs if self.pair_matches[pair] < self.max_matches
+        )
+        return LeagueResult(
+            league_id=self.league_id,
+            ratings=self.ratings,
+            matches=self.matches,
+            rounds=rounds,
+            settled_pairs=settled,
+            matches_saved=len(self.pairs) * self.max_matches - len(self.matches),
+            elapsed=time.monotonic() - started,
+            db_path=self.db.db_path,
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    """リーグ戦のコマンドラインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="Run a round-robin poker league")
+    parser.add_argument(
+        "--agents",
+        required=True,
+        help="参加エージェント（カンマ区切り。例: random,api:team1_agent,mypkg.bots.TightPlayer）",
+    )
+    parser.add_argument("--hands", type=int, default=200, help="1試合で座席ごとにプレイするハンド数")
+    parser.add_argument("--min-matches", type=int, default=2, help="組み合わせごとの最少試合数")
+    parser.add_argument("--max-matches", type=int, default=20, help="組み合わせごとの最大試合数")
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数（省略時はCPU数）")
+    parser.add_argument("--seed", type=int, default=None, help="乱数シード")
+    parser.add_argument(
+        "--db", default=None, help="試合結果を記録する履歴DBのパス（省略時は全セッション共通のDB）"
+    )
+    args = parser.parse_args(argv)
+
+    agents = [agent.strip() for agent in args.agents.split(",") if agent.strip()]
+    db = GameHistoryDB(db_path=args.db) if args.db else None
+    league = League(
+        agents,
+        hands_per_match=args.hands,
+        min_matches=args.min_matches,
+        max_matches=args.max_matches,
+        workers=args.workers,
+        seed=args.seed,
+        db=db,
+    )
+    try:
+        result = league.run()
+    finally:
+        league.db.close()
+
+    print(
+        f"{len(result.matches)} matches in {result.rounds} rounds ({result.elapsed:.1f}s), "
+        f"{result.matches_saved} matches saved by early stopping"
+    )
+    for place, (agent, rating) in enumerate(result.ranking(), 1):
+        low, high = rating.interval(league.z)
+        print(
+            f"{place:2d}. {agent:>24s}: mu {rating.mu:6.2f} [{low:6.2f}, {high:6.2f}] "
+            f"| elo {rating.elo:7.1f} | {rating.wins}-{rating.losses}-{rating.draws} "
+            f"| net {rating.net_chips:+d}"
+        )
+    print(f"results: league_id={result.league_id} in {result.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _game_state_json(game_state: GameState) -> str:
+    """ゲーム状態のJSON文字列（GameState.to_json のキャッシュがあれば使う）"""
+    to_json = getattr(game_state, "to_json", None)
+    if to_json is not None:
+        return to_json()
+    return json.dumps(game_state.to_dict(), ensure_ascii=False, indent=2)
+
+
 class PlayerStatus(Enum):
     """プレイヤーの状態"""
 
@@ -37,11 +45,17 @@ class PlayerStatus(Enum):
     ALL_IN = "all_in"
     BUSTED = "busted"
 
+    # メンバーは単一インスタンスなので同一性でハッシュする
+    # （Enum 既定の __hash__ は Python レベルで、状態別の座席インデックス更新で多用されるため）
+    __hash__ = object.__hash__
+
 
 class Player(ABC):
     """プレイヤー抽象基底クラス"""
 
     def __init__(self, player_id: int, name: str, initial_chips: int = 1000):
+        # 状態変化の通知先（PokerGame が座席インデックスの更新に使う）
+        self._status_listener = None
         self.id = player_id
         self.name = name
         self.chips = initial_chips
@@ -53,6 +67,18 @@ class Player(ABC):
         self.is_small_blind = False
         self.is_big_blind = False
 
+    @property
+    def status(self) -> "PlayerStatus":
+        """プレイヤーの状態"""
+        return self._status
+
+    @status.setter
+    def status(self, status: "PlayerStatus"):
+        old_status = getattr(self, "_status", None)
+        self._status = status
+        if self._status_listener is not None and old_status is not status:
+            self._status_listener(self, old_status, status)
+
     def reset_for_new_hand(self):
         """新しいハンド用にリセット"""
         self.hole_cards = []
@@ -308,6 +334,8 @@ class RandomPlayer(Player):
         super().__init__(player_id, name, initial_chips)
         # 要件定義書に従った確率重み
         self.action_weights = {"fold": 30, "check_call": 50, "raise": 15, "all_in": 5}
+        # 行動選択に使う乱数生成器（シード付きのゲームに追加されると専用ストリームになる）
+        self.rng = random
 
     def make_decision(self, game_state: GameState) -> Dict[str, Any]:
         """
@@ -344,7 +372,7 @@ class RandomPlayer(Player):
                 # "raise (min 40)" のような形式から最低レイズ額を抽出
                 amount = int(action.split("min ")[1].split(")")[0])
                 # ランダムにレイズ額を決定（最低額の1-3倍）
-                raise_amount = amount * random.randint(1, 3)
+                raise_amount = amount * self.rng.randint(1, 3)
                 raise_amount = min(raise_amount, self.chips)
                 action_options.append({"action": "raise", "amount": raise_amount})
                 weights.append(self.action_weights["raise"])
@@ -353,7 +381,7 @@ class RandomPlayer(Player):
                 weights.append(self.action_weights["all_in"])
 
         # 重み付きランダム選択
-        selected_action = random.choices(action_options, weights=weights)[0]
+        selected_action = self.rng.choices(action_options, weights=weights)[0]
         return selected_action
 
 
@@ -497,7 +525,7 @@ Be strategic and analytical. Provide clear reasoning for every decision.""",
         return f"""
 現在のポーカー状況を分析して、最適な行動を決定してください：
 
-{json.dumps(game_state.to_dict(), ensure_ascii=False, indent=2)}
+{_game_state_json(game_state)}
 
 あなたのチップ数: {self.chips}
 現在のベット額: {self.current_bet}
@@ -574,7 +602,7 @@ class LLMApiPlayer(Player):
             session_id = str(uuid.uuid4())
 
             # ゲーム状態をJSON文字列に変換
-            input_json = json.dumps(game_state.to_dict(), ensure_ascii=False, indent=2)
+            input_json = _game_state_json(game_state)
             logger.debug(f"LLM Prompt for {self.name}: {input_json}")
 
             # セッションの作成（短いタイムアウト）
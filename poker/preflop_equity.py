@@ -0,0 +1,295 @@
+"""
+Preflop equity table
+
+169種類の正規化スターティングハンド同士のオールイン・エクイティ（169x169）を
+事前計算したバイナリ資産から O(1) で参照する。
+テーブルはメモリマップで読み込むため、起動時の再計算は発生しない。
+
+テーブルの再生成（NumPyが必要）:
+    python -m poker.preflop_equity --samples 10000
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .equity import CardLike, to_card
+
+RANK_CHARS = "AKQJT98765432"
+NUM_HANDS = 169
+
+DEFAULT_TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "preflop_equity.bin"
+)
+
+# ヘッダ: マジック, バージョン, ハンド数, 1マッチアップあたりのサンプル数
+_HEADER = struct.Struct("<4sHHI")
+_MAGIC = b"PFEQ"
+_VERSION = 1
+_SCALE = 65535  # エクイティを uint16 に量子化する際のスケール
+
+HandLike = Union[str, Sequence[CardLike]]
+
+_table: Optional[mmap.mmap] = None
+_table_path: Optional[str] = None
+
+
+def hand_label(index: int) -> str:
+    """
+    インデックスから正規化ハンド表記を取得
+
+    13x13 のハンドチャートと同じ並び（行=1枚目、列=2枚目、対角=ペア、
+    右上=スーテッド、左下=オフスート）で 0..168 を割り当てる。
+    """
+    if not 0 <= index < NUM_HANDS:
+        raise ValueError(f"Hand index out of range: {index}")
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANK_CHARS[row] * 2
+    if row < col:
+        return f"{RANK_CHARS[row]}{RANK_CHARS[col]}s"
+    return f"{RANK_CHARS[col]}{RANK_CHARS[row]}o"
+
+
+def canonical_hand(hand: HandLike) -> str:
+    """
+    ハンド表記またはホールカード2枚を正規化ハンド表記に変換
+
+    Args:
+        hand: "AKs" / "T9o" / "QQ" 形式の表記、または2枚のカード（Card・整数・文字列）
+
+    Returns:
+        正規化ハンド表記（例: "AKs"）
+    """
+    if isinstance(hand, str):
+        label = hand.strip()
+        if len(label) == 2 and label[0].upper() == label[1].upper():
+            label = label.upper()
+        elif len(label) == 3:
+            label = label[:2].upper() + label[2].lower()
+        hand_index(label)
+        return label
+
+    if len(hand) != 2:
+        raise ValueError("Hole cards must contain exactly 2 cards")
+    first, second = (to_card(card) for card in hand)
+    if first == second:
+        raise ValueError(f"Duplicate card: {first}")
+    high, low = (first, second) if first.rank >= second.rank else (second, first)
+    high_char = RANK_CHARS[14 - high.rank]
+    low_char = RANK_CHARS[14 - low.rank]
+    if high.rank == low.rank:
+        return high_char + low_char
+    return f"{high_char}{low_char}{'s' if high.suit == low.suit else 'o'}"
+
+
+def hand_index(hand: HandLike) -> int:
+    """正規化ハンド（表記またはカード2枚）の 0..168 のインデックスを取得"""
+    if not isinstance(hand, str):
+        hand = canonical_hand(hand)
+    label = hand.strip()
+    try:
+        if len(label) == 2 and label[0].upper() == label[1].upper():
+            rank = RANK_CHARS.index(label[0].upper())
+            return rank * 13 + rank
+        if len(label) == 3 and label[2].lower() in ("s", "o"):
+            high = RANK_CHARS.index(label[0].upper())
+            low = RANK_CHARS.index(label[1].upper())
+            if high < low:
+                if label[2].lower() == "s":
+                    return high * 13 + low
+                return low * 13 + high
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid hand notation: {hand}")
+
+
+def lookup(hand_a: HandLike, hand_b: HandLike) -> float:
+    """
+    hand_a の hand_b に対するプリフロップ・オールイン・エクイティ
+
+    Args:
+        hand_a: ヒーローのハンド（"AKs" 形式またはカード2枚）
+        hand_b: 相手のハンド（同上）
+
+    Returns:
+        エクイティ（0.0〜1.0、引き分けは等分）
+    """
+    table = _get_table()
+    offset = _HEADER.size + 2 * (hand_index(hand_a) * NUM_HANDS + hand_index(hand_b))
+    return struct.unpack_from("<H", table, offset)[0] / _SCALE
+
+
+def equity_vs_random(hand: HandLike) -> float:
+    """ランダムな1ハンドに対するプリフロップ・エクイティ"""
+    table = _get_table()
+    offset = _HEADER.size + 2 * (NUM_HANDS * NUM_HANDS + hand_index(hand))
+    return struct.unpack_from("<H", table, offset)[0] / _SCALE
+
+
+def load_table(path: Optional[str] = None) -> None:
+    """
+    テーブルファイルをメモリマップで読み込む（通常は初回参照時に自動で読み込まれる）
+
+    Args:
+        path: テーブルファイルのパス（省略時は同梱のテーブル）
+    """
+    global _table, _table_path
+
+    path = path or DEFAULT_TABLE_PATH
+    with open(path, "rb") as f:
+        table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    expected_size = _HEADER.size + 2 * (NUM_HANDS * NUM_HANDS + NUM_HANDS)
+    if len(table) != expected_size or _HEADER.unpack_from(table, 0)[:3] != (
+        _MAGIC,
+        _VERSION,
+        NUM_HANDS,
+    ):
+        table.close()
+        raise ValueError(f"Invalid preflop equity table: {path}")
+
+    if _table is not None:
+        _table.close()
+    _table = table
+    _table_path = path
+
+
+def _get_table() -> mmap.mmap:
+    """読み込み済みのテーブルを取得（未読み込みなら同梱テーブルを読み込む）"""
+    if _table is None:
+        load_table()
+    return _table
+
+
+def _hand_combos(index: int) -> List[Tuple[int, int]]:
+    """正規化ハンドに属する具体的なホールカードの組み合わせ（カードの整数表現）"""
+    row, col = divmod(index, 13)
+    high_rank = 14 - min(row, col)
+    low_rank = 14 - max(row, col)
+    high_base = (high_rank - 2) * 4
+    low_base = (low_rank - 2) * 4
+    if row == col:
+        return [
+            (high_base + s1, high_base + s2)
+            for s1 in range(4)
+            for s2 in range(s1 + 1, 4)
+        ]
+    if row < col:
+        return [(high_base + s, low_base + s) for s in range(4)]
+    return [
+        (high_base + s1, low_base + s2)
+        for s1 in range(4)
+        for s2 in range(4)
+        if s1 != s2
+    ]
+
+
+def build_table(samples: int = 10000, seed: Optional[int] = None, verbose: bool = False):
+    """
+    169x169 のエクイティ行列とランダムハンドに対するエクイティを計算（NumPyが必要）
+
+    各マッチアップについて、両者の具体的なカードの組み合わせ（重複なし）と
+    ボード5枚を一様にサンプリングし、HandEvaluator.evaluate_batch で一括評価する。
+
+    Args:
+        samples: 1マッチアップあたりのサンプル数
+        seed: 乱数シード
+        verbose: 進捗を表示するかどうか
+
+    Returns:
+        (matrix, vs_random): 形状 (169, 169) と (169,) の float64 配列
+    """
+    import numpy as np
+    from .evaluator import HandEvaluator
+
+    if samples <= 0:
+        raise ValueError("samples must be positive")
+
+    rng = np.random.default_rng(seed)
+    combos = [np.array(_hand_combos(i), dtype=np.intp) for i in range(NUM_HANDS)]
+    matrix = np.full((NUM_HANDS, NUM_HANDS), 0.5)
+    # ランダムハンド相手のエクイティ計算用: 重複しない組み合わせ数で重み付けする
+    weights = np.zeros((NUM_HANDS, NUM_HANDS))
+    started = time.monotonic()
+
+    for a in range(NUM_HANDS):
+        for b in range(a, NUM_HANDS):
+            # 互いにカードが重複しない具体的な組み合わせのペア
+            pairs_a, pairs_b = [], []
+            for combo_a in combos[a]:
+                for combo_b in combos[b]:
+                    if len({*combo_a, *combo_b}) == 4:
+                        pairs_a.append(combo_a)
+                        pairs_b.append(combo_b)
+            weights[a, b] = weights[b, a] = len(pairs_a)
+            if a == b:
+                continue  # 同じ正規化ハンド同士は対称なので 0.5
+
+            pick = rng.integers(0, len(pairs_a), size=samples)
+            hole_a = np.asarray(pairs_a)[pick]
+            hole_b = np.asarray(pairs_b)[pick]
+
+            # 使用済みカードを除いた52枚から5枚を一様に選ぶ（乱数キーの小さい順）
+            keys = rng.random((samples, 52))
+            rows = np.arange(samples)[:, None]
+            keys[rows, hole_a] = 2.0
+            keys[rows, hole_b] = 2.0
+            board = np.argpartition(keys, 5, axis=1)[:, :5]
+
+            strength_a = HandEvaluator.evaluate_batch(hole_a, board)
+            strength_b = HandEvaluator.evaluate_batch(hole_b, board)
+            equity = (
+                np.count_nonzero(strength_a > strength_b)
+                + 0.5 * np.count_nonzero(strength_a == strength_b)
+            ) / samples
+            matrix[a, b] = equity
+            matrix[b, a] = 1.0 - equity
+
+        if verbose:
+            print(f"{hand_label(a):>4} done ({time.monotonic() - started:.1f}s)")
+
+    vs_random = (matrix * weights).sum(axis=1) / weights.sum(axis=1)
+    return matrix, vs_random
+
+
+def write_table(matrix, vs_random, path: Optional[str] = None, samples: int = 0) -> str:
+    """
+    エクイティ行列をバイナリ資産として書き出す
+
+    形式: ヘッダ（マジック, バージョン, ハンド数, サンプル数）に続いて、
+    169x169 の行列と169要素のランダムハンド相手のエクイティを
+    リトルエンディアン uint16（エクイティ x 65535）で格納する。
+    """
+    import numpy as np
+
+    path = path or DEFAULT_TABLE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    values = np.concatenate([np.ravel(matrix), np.ravel(vs_random)])
+    quantized = np.rint(np.clip(values, 0.0, 1.0) * _SCALE).astype("<u2")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, NUM_HANDS, samples))
+        f.write(quantized.tobytes())
+    return path
+
+
+def main(argv: Optional[List[str]] = None):
+    """テーブル生成のコマンドラインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="Generate the preflop equity table")
+    parser.add_argument(
+        "--samples", type=int, default=10000, help="1マッチアップあたりのサンプル数"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH, help="出力先のパス")
+    args = parser.parse_args(argv)
+
+    matrix, vs_random = build_table(args.samples, args.seed, verbose=True)
+    path = write_table(matrix, vs_random, args.output, args.samples)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Multi-table simulation runner
+
+独立したテーブル（PokerGame）を複数用意し、プロセスプールに分散して
+ヘッドレスのシミュレーションモードで大量のハンドを実行する。
+各テーブルは固有の乱数シードとイベントバッファ（または履歴DB）を持ち、
+結果はエージェント種別ごとの統計に集約される。
+
+デュプリケートモードでは、各テーブルの同じシード（同じ配牌の乱数ストリーム）を
+座席ローテーションごとに全エージェントへ配り直し、カード運の影響を打ち消して集計する。
+
+使用例:
+    python -m poker.simulation --agents random:4 --tables 8 --hands 10000 --seed 0
+    python -m poker.simulation --agents random:2,mypkg.bots.TightPlayer:2 --duplicate
+"""
+
+import argparse
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .game import PokerGame
+from .game_history import EventBuffer
+from .player_models import LLMApiPlayer, Player, RandomPlayer
+
+# エージェント名からプレイヤークラスへの対応（"module.path.ClassName" 形式でも指定可能）
+PLAYER_TYPES = {"random": RandomPlayer}
+
+
+@dataclass
+class AgentStats:
+    """エージェント種別ごとの集計統計"""
+
+    seats: int = 0  # 着席したプレイヤー数（全テーブル合計）
+    hands_played: int = 0  # 配られたハンド数（プレイヤー単位）
+    hands_won: int = 0  # ポットの一部以上を獲得したハンド数
+    net_chips: int = 0  # 収支（チップ）
+    rebuys: int = 0  # バスト後の再購入回数
+
+    def merge(self, other: "AgentStats"):
+        """別の統計を加算"""
+        self.seats += other.seats
+        self.hands_played += other.hands_played
+        self.hands_won += other.hands_won
+        self.net_chips += other.net_chips
+        self.rebuys += other.rebuys
+
+    def bb_per_100(self, big_blind: int) -> float:
+        """100ハンドあたりの収支（ビッグブラインド単位）"""
+        if self.hands_played == 0:
+            return 0.0
+        return self.net_chips / big_blind / self.hands_played * 100
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "seats": self.seats,
+            "hands_played": self.hands_played,
+            "hands_won": self.hands_won,
+            "net_chips": self.net_chips,
+            "rebuys": self.rebuys,
+        }
+
+
+@dataclass
+class TableConfig:
+    """1テーブル分のシミュレーション設定（ワーカープロセスに渡す）"""
+
+    table_id: int
+    agents: List[str]  # 座席順のエージェント名
+    hands: int
+    seed: int
+    small_blind: int = 10
+    big_blind: int = 20
+    initial_chips: int = 2000
+    rebuy: bool = True  # バストしたプレイヤーを初期チップで復帰させるか
+    history_suffix: Optional[str] = None  # 指定時は履歴DBに記録する（ログ出力も有効になる）
+    history_batch_hands: int = 100  # 履歴DBへの書き込みをまとめてコミットするハンド数
+    history_async_writes: bool = True  # 履歴DBへの書き込みを専用スレッドで行う
+    reset_stacks: bool = False  # 毎ハンド全員を初期チップで開始する（デュプリケート用）
+
+
+@dataclass
+class TableResult:
+    """1テーブル分のシミュレーション結果"""
+
+    table_id: int
+    hands: int
+    agents: Dict[str, AgentStats]
+    elapsed: float
+
+
+@dataclass
+class SimulationResult:
+    """全テーブルを集約したシミュレーション結果"""
+
+    tables: int
+    hands: int
+    elapsed: float
+    big_blind: int
+    agents: Dict[str, AgentStats] = field(default_factory=dict)
+    rotations: int = 1  # デュプリケートモードで各テーブルを配り直した座席ローテーション数
+
+    @property
+    def hands_per_second(self) -> float:
+        """1秒あたりの処理ハンド数"""
+        return self.hands / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "tables": self.tables,
+            "hands": self.hands,
+            "elapsed": self.elapsed,
+            "hands_per_second": self.hands_per_second,
+            "rotations": self.rotations,
+            "agents": {
+                name: dict(
+                    stats.to_dict(), bb_per_100=stats.bb_per_100(self.big_blind)
+                )
+                for name, stats in self.agents.items()
+            },
+        }
+
+
+def parse_agents(spec: str, min_players: int = 2, max_players: int = 10) -> List[str]:
+    """
+    "random:2,mypkg.bots.TightPlayer:2" 形式の指定を座席順のエージェント名リストに展開
+
+    Args:
+        spec: エージェント指定
+        min_players: 最少人数
+        max_players: 最大人数（1テーブルの上限は10人）
+
+    Raises:
+        ValueError: 形式が不正な場合、または人数が範囲外の場合
+    """
+    agents: List[str] = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, count_str = entry.rpartition(":")
+        if not name:
+            name, count_str = count_str, "1"
+        try:
+            count = int(count_str)
+        except ValueError:
+            raise ValueError(f"Invalid player count: {entry}")
+        if count <= 0:
+            raise ValueError(f"Invalid player count: {entry}")
+        agents.extend([name.strip()] * count)
+
+    if not min_players <= len(agents) <= max_players:
+        raise ValueError(f"Need {min_players} to {max_players} players")
+    return agents
+
+
+def rotate_seats(agents: List[Any], rotation: int) -> List[Any]:
+    """
+    座席ローテーションを適用したエージェント並びを取得
+
+    rotation 番目のローテーションでは、元の座席 i のエージェントが座席 i + rotation に座る。
+    全ローテーションを通すと、各エージェントがすべての座席（＝すべての配牌）を1回ずつ担当する。
+    """
+    count = len(agents)
+    return [agents[(seat - rotation) % count] for seat in range(count)]
+
+
+def create_player(agent: str, player_id: int, initial_chips: int) -> Player:
+    """
+    エージェント名からプレイヤーを生成
+
+    Args:
+        agent: PLAYER_TYPES のキー、"api:<agents内のフォルダ名>"（adk api_server 上の
+            エージェント）、または Player サブクラスのドット区切りパス
+            （コンストラクタは (player_id, name, initial_chips) を受け取ること）
+        player_id: プレイヤーID（座席番号）
+        initial_chips: 初期チップ
+    """
+    if agent.startswith("api:"):
+        app_name = agent[len("api:"):]
+        if not app_name:
+            raise ValueError(f"Unknown agent: {agent}")
+        return LLMApiPlayer(
+            player_id,
+            f"{app_name}#{player_id}",
+            app_name=app_name,
+            user_id=f"player_{player_id}",
+            initial_chips=initial_chips,
+        )
+
+    player_class = PLAYER_TYPES.get(agent)
+    if player_class is None:
+        module_name, _, class_name = agent.rpartition(".")
+        if not module_name:
+            raise ValueError(f"Unknown agent: {agent}")
+        player_class = getattr(importlib.import_module(module_name), class_name)
+        if not (isinstance(player_class, type) and issubclass(player_class, Player)):
+            raise ValueError(f"Not a Player class: {agent}")
+    return player_class(player_id, f"{agent}#{player_id}", initial_chips)
+
+
+def run_table(config: TableConfig) -> TableResult:
+    """
+    1テーブル分のハンドを実行して集計する（ワーカープロセスで実行される）
+
+    ボタン位置・デッキ・ランダムプレイヤーの行動はテーブルのシードから導出した
+    ゲーム専用の乱数ストリームで決まるため、ワーカー間で系列が重ならない。
+    """
+    started = time.monotonic()
+
+    game = PokerGame(
+        small_blind=config.small_blind,
+        big_blind=config.big_blind,
+        initial_chips=config.initial_chips,
+        uuid_suffix=config.history_suffix,
+        sim_mode=config.history_suffix is None,
+        seed=config.seed,
+        history_batch_hands=config.history_batch_hands,
+        history_async_writes=config.history_async_writes,
+    )
+    for seat, agent in enumerate(config.agents):
+        game.add_player(create_player(agent, seat, config.initial_chips))
+    game.dealer_button = game.rng.randrange(len(game.players))
+
+    stats = {agent: AgentStats() for agent in config.agents}
+    for agent in config.agents:
+        stats[agent].seats += 1
+
+    hands = 0
+    while hands < config.hands:
+        if config.reset_stacks:
+            # 全員が同じ条件で毎ハンドを始めるので、配牌は (seed, hand_number) だけで決まる
+            for player in game.players:
+                player.chips = config.initial_chips
+        elif config.rebuy:
+            for player in game.players:
+                if player.chips <= 0:
+                    player.chips = config.initial_chips
+                    stats[config.agents[player.id]].rebuys += 1
+        elif game.is_game_over():
+            break
+
+        chips_before = [player.chips for player in game.players]
+        result = game.play_hand()
+        hands += 1
+
+        for player in game.players:
+            if chips_before[player.id] <= 0:
+                continue  # バスト済みでハンドに参加していない
+            agent_stats = stats[config.agents[player.id]]
+            agent_stats.hands_played += 1
+            agent_stats.net_chips += player.chips - chips_before[player.id]
+
+        if result:
+            for winner_id in {info["player_id"] for info in result["results"]}:
+                stats[config.agents[winner_id]].hands_won += 1
+
+        if isinstance(game.db, EventBuffer):
+            game.db.drain()  # 統計は集計済みなのでイベントは保持しない
+
+    game.db.close()
+    return TableResult(
+        table_id=config.table_id,
+        hands=hands,
+        agents=stats,
+        elapsed=time.monotonic() - started,
+    )
+
+
+def run_simulation(
+    agents: List[str],
+    tables: int = 1,
+    hands_per_table: int = 1000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    small_blind: int = 10,
+    big_blind: int = 20,
+    initial_chips: int = 2000,
+    rebuy: bool = True,
+    record_history: bool = False,
+    duplicate: bool = False,
+) -> SimulationResult:
+    """
+    複数の独立したテーブルをプロセスプールで並列に実行し、エージェント別に集計
+
+    Args:
+        agents: 座席順のエージェント名（parse_agents の結果など）。全テーブル共通
+        tables: テーブル数
+        hands_per_table: 1テーブルあたりのハンド数
+        workers: プロセス数（None の場合はCPU数、1以下なら同一プロセスで順に実行）
+        seed: 乱数シード（各テーブルのシードはここから導出する）
+        small_blind: スモールブラインド額
+        big_blind: ビッグブラインド額
+        initial_chips: 初期チップ
+        rebuy: バストしたプレイヤーを初期チップで復帰させるか
+        record_history: 各テーブルの履歴を個別の履歴DBに記録するか
+            （ログ出力も有効になるため大幅に遅くなる）
+        duplicate: デュプリケートモード。各テーブルを座席ローテーションの数だけ
+            同じシードで実行し（毎ハンド初期チップで開始）、結果を合算する。
+            同じカードを全エージェントが同じ回数ずつ担当するため、カード運による
+            分散が打ち消され、少ないハンド数で実力差を判定できる
+
+    Returns:
+        SimulationResult: 集約結果
+    """
+    if tables <= 0:
+        raise ValueError("tables must be positive")
+    if hands_per_table < 0:
+        raise ValueError("hands_per_table must not be negative")
+    for agent in set(agents):
+        create_player(agent, 0, initial_chips)  # ワーカーに送る前に名前を検証
+
+    started = time.monotonic()
+    seed_source = random.Random(seed)
+    run_id = f"{seed_source.getrandbits(16):04x}"
+    rotations = len(agents) if duplicate else 1
+    configs = []
+    for table_id in range(tables):
+        table_seed = seed_source.getrandbits(64)
+        for rotation in range(rotations):
+            suffix = f"sim{run_id}_t{table_id}"
+            if duplicate:
+                suffix += f"_r{rotation}"
+            configs.append(
+                TableConfig(
+                    table_id=table_id,
+                    agents=rotate_seats(agents, rotation),
+                    hands=hands_per_table,
+                    seed=table_seed,  # ローテーション間で同じ配牌を使う
+                    small_blind=small_blind,
+                    big_blind=big_blind,
+                    initial_chips=initial_chips,
+                    rebuy=rebuy,
+                    history_suffix=suffix if record_history else None,
+                    reset_stacks=duplicate,
+                )
+            )
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(configs)))
+
+    if workers == 1:
+        table_results = [run_table(config) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            table_results = list(executor.map(run_table, configs))
+
+    result = SimulationResult(
+        tables=tables,
+        hands=sum(table.hands for table in table_results),
+        elapsed=time.monotonic() - started,
+        big_blind=big_blind,
+        rotations=rotations,
+    )
+    for table in table_results:
+        for name, stats in table.agents.items():
+            result.agents.setdefault(name, AgentStats()).merge(stats)
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    """シミュレーションのコマンドラインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="Run multi-table poker simulations")
+    parser.add_argument(
+        "--agents",
+        default="random:4",
+        help="座席順のエージェントと人数（例: random:2,mypkg.bots.TightPlayer:2）",
+    )
+    parser.add_argument("--tables", type=int, default=os.cpu_count() or 1, help="テーブル数")
+    parser.add_argument("--hands", type=int, default=10000, help="1テーブルあたりのハンド数")
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数（省略時はCPU数）")
+    parser.add_argument("--seed", type=int, default=None, help="乱数シード")
+    parser.add_argument("--no-rebuy", action="store_true", help="バストしたプレイヤーを復帰させない")
+    parser.add_argument("--record-history", action="store_true", help="各テーブルの履歴をDBに記録")
+    parser.add_argument(
+        "--duplicate",
+        action="store_true",
+        help="デュプリケートモード（同じ配牌を座席ローテーションごとに配り直して集計）",
+    )
+    args = parser.parse_args(argv)
+
+    result = run_simulation(
+        parse_agents(args.agents),
+        tables=args.tables,
+        hands_per_table=args.hands,
+        workers=args.workers,
+        seed=args.seed,
+        rebuy=not args.no_rebuy,
+        record_history=args.record_history,
+        duplicate=args.duplicate,
+    )
+
+    print(
+        f"{result.hands} hands on {result.tables} tables in {result.elapsed:.1f}s "
+        f"({result.hands_per_second:.0f} hands/sec)"
+    )
+    if result.rotations > 1:
+        print(f"duplicate: {result.rotations} seat rotations per table")
+    for name, stats in sorted(
+        result.agents.items(), key=lambda item: item[1].net_chips, reverse=True
+    ):
+        print(
+            f"{name:>24s}: {stats.bb_per_100(result.big_blind):+8.2f} bb/100 "
+            f"| won {stats.hands_won}/{stats.hands_played} "
+            f"| net {stats.net_chips:+d} | rebuys {stats.rebuys}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -47,37 +47,14 @@ def _build_viewer_state() -> Dict[str, Any]:
         return getattr(p, "name", "Player")
 
     def _latest_action_for_player(player_id: int) -> Tuple[str, int]:
-        """Parse the game's action_history to find the latest action by player.
+        """Look up the latest betting action by player in the game's action log.
 
         Returns (action_label, amount). action_label examples: 'fold', 'check', 'call', 'raise', 'all_in', ''.
         """
-        history: List[str] = list(getattr(game, "action_history", []))
-        for entry in reversed(history):
-            # Expected formats
-            # 'Player {id} folded'
-            # 'Player {id} checked'
-            # 'Player {id} called {amt}'
-            # 'Player {id} raised to {amt}'
-            # 'Player {id} went all-in with {amt}'
-            try:
-                if entry.startswith(f"Player {player_id} "):
-                    rest = entry.split(" ", 2)[2]
-                    if rest.startswith("folded"):
-                        return ("fold", 0)
-                    if rest.startswith("checked"):
-                        return ("check", 0)
-                    if rest.startswith("called"):
-                        amt = int(rest.split(" ")[1])
-                        return ("call", amt)
-                    if rest.startswith("raised to"):
-                        amt = int(rest.split(" ")[-1])
-                        return ("raise", amt)
-                    if rest.startswith("went all-in with"):
-                        amt = int(rest.split(" ")[-1])
-                        return ("all_in", amt)
-            except Exception:
-                continue
-        return ("", 0)
+        event = game.action_history.latest_for(player_id)
+        if event is None:
+            return ("", 0)
+        return (event.action, event.amount)
 
     players: List[Dict[str, Any]] = []
     llm_api_agents: List[Dict[str, Any]] = []
@@ -0,0 +1,519 @@
+"""
+Multi-table tournament scheduler
+
+多数のエージェントを複数テーブルに分けてフリーズアウト形式のトーナメントを実行する。
+各テーブルは asyncio のタスクとして並行にハンドを進め、エージェントの意思決定
+（LLM 呼び出しなど）はスレッドプールで実行する。同時に処理中の意思決定リクエスト数は
+max_in_flight で上限を設ける。
+
+- ブラインドはトーナメント全体で配られたハンド数に応じてレベルが上がる
+- プレイヤーがバストするとテーブル間で人数をならし、不要になったテーブルを解散する
+  （最終的に1テーブル＝ファイナルテーブルに統合される）
+- テーブルの変更はハンドの合間（そのテーブルが進行中でないとき）にだけ行う
+
+使用例:
+    python -m poker.tournament --agents random:50 --seats 9 --max-in-flight 16 --seed 0
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .game import PokerGame
+from .game_models import GameState
+from .game_history import EventBuffer
+from .player_models import Player
+from .simulation import create_player, parse_agents
+
+
+@dataclass(frozen=True)
+class BlindLevel:
+    """ブラインドレベル"""
+
+    small_blind: int
+    big_blind: int
+    hands: int  # このレベルが続くハンド数（トーナメント全体で配られたハンド数）
+
+
+DEFAULT_BLIND_SCHEDULE: Tuple[BlindLevel, ...] = (
+    BlindLevel(10, 20, 100),
+    BlindLevel(15, 30, 100),
+    BlindLevel(25, 50, 100),
+    BlindLevel(50, 100, 100),
+    BlindLevel(75, 150, 100),
+    BlindLevel(100, 200, 100),
+    BlindLevel(150, 300, 100),
+    BlindLevel(200, 400, 100),
+    BlindLevel(300, 600, 100),
+    BlindLevel(500, 1000, 100),
+)
+
+
+class BlindSchedule:
+    """
+    ブラインドの上昇スケジュール
+
+    時間の代わりにトーナメント全体で配られたハンド数でレベルを進める。
+    最後のレベルに達した後はそのレベルが続く。
+    """
+
+    def __init__(self, levels: Sequence[BlindLevel] = DEFAULT_BLIND_SCHEDULE):
+        if not levels:
+            raise ValueError("Blind schedule needs at least one level")
+        for level in levels:
+            if not 0 < level.small_blind <= level.big_blind or level.hands <= 0:
+                raise ValueError(f"Invalid blind level: {level}")
+        self.levels: Tuple[BlindLevel, ...] = tuple(levels)
+
+    def level_index(self, hands_dealt: int) -> int:
+        """配られたハンド数に対応するレベル番号（0始まり）"""
+        for index, level in enumerate(self.levels):
+            if hands_dealt < level.hands:
+                return index
+            hands_dealt -= level.hands
+        return len(self.levels) - 1
+
+    def level_at(self, hands_dealt: int) -> BlindLevel:
+        """配られたハンド数に対応するブラインドレベル"""
+        return self.levels[self.level_index(hands_dealt)]
+
+
+@dataclass
+class TournamentConfig:
+    """トーナメント設定"""
+
+    seats_per_table: int = 9
+    initial_chips: int = 2000
+    schedule: BlindSchedule = field(default_factory=BlindSchedule)
+    seed: Optional[int] = None
+    max_in_flight: int = 8  # 同時に処理する意思決定リクエスト数の上限
+    # False の場合は意思決定をイベントループ上で直接呼ぶ（テーブルが1ハンドずつ順に進むため、
+    # 同じシードなら結果も再現できる）
+    threaded_decisions: bool = True
+    record_history: bool = False  # 各テーブルの履歴を履歴DBに記録する（ログ出力も有効になる）
+    max_hands: Optional[int] = None  # 総ハンド数の上限（到達後は進行中のハンドを終えてチップ量で順位を決める）
+
+
+@dataclass
+class Entrant:
+    """トーナメント参加者"""
+
+    entrant_id: int
+    agent: str
+    player: Player
+    table_id: Optional[int] = None
+    place: Optional[int] = None  # 確定した順位
+    hands_played: int = 0
+
+
+@dataclass
+class Standing:
+    """最終順位の1行"""
+
+    place: int
+    name: str
+    agent: str
+    chips: int
+    hands_played: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "place": self.place,
+            "name": self.name,
+            "agent": self.agent,
+            "chips": self.chips,
+            "hands_played": self.hands_played,
+        }
+
+
+@dataclass
+class TournamentResult:
+    """トーナメント結果"""
+
+    standings: List[Standing]
+    hands: int
+    tables: int  # 開始時のテーブル数
+    blind_level: int  # 終了時のブラインドレベル（0始まり）
+    elapsed: float
+    decisions: int = 0  # 意思決定リクエストの総数
+    peak_in_flight: int = 0  # 同時処理中だった意思決定リクエスト数の最大値
+
+    @property
+    def winner(self) -> Standing:
+        """優勝者"""
+        return self.standings[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "standings": [standing.to_dict() for standing in self.standings],
+            "hands": self.hands,
+            "tables": self.tables,
+            "blind_level": self.blind_level,
+            "elapsed": self.elapsed,
+            "decisions": self.decisions,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+class TournamentTable:
+    """トーナメントの1テーブル"""
+
+    def __init__(self, table_id: int, game: PokerGame):
+        self.table_id = table_id
+        self.game = game
+        self.entrants: List[Entrant] = []  # 着席中の参加者（座席順）
+        self.pending: List[Entrant] = []  # 次のハンドの前に着席する参加者
+        self.busy = False  # ハンド進行中
+        self.closed = False
+        self.hands = 0
+        self.wakeup = asyncio.Event()
+
+    @property
+    def size(self) -> int:
+        """着席予定を含めた人数"""
+        return len(self.entrants) + len(self.pending)
+
+    def seat_pending(self):
+        """着席待ちの参加者を着席させる（ハンドの合間にだけ呼ぶ）"""
+        if self.pending:
+            self.entrants.extend(self.pending)
+            self.pending.clear()
+            self.sync_players()
+
+    def sync_players(self):
+        """参加者の並びをゲームのプレイヤーリストに反映（プレイヤーIDは座席番号）"""
+        for seat, entrant in enumerate(self.entrants):
+            entrant.player.id = seat
+            entrant.table_id = self.table_id
+        self.game.players = [entrant.player for entrant in self.entrants]
+
+    def take_player_to_move(self) -> Entrant:
+        """
+        他のテーブルへ移動させる参加者を取り出す
+
+        次のハンドでビッグブラインドになる席（現在のBBの左隣）の参加者を選ぶ。
+        """
+        bb_seat = self.game._get_big_blind_seat()
+        seat = (bb_seat + 1) % len(self.entrants) if bb_seat is not None else 0
+        entrant = self.entrants.pop(seat)
+        if seat < self.game.dealer_button:
+            self.game.dealer_button -= 1  # ボタン位置を同じプレイヤーに保つ
+        self.sync_players()
+        return entrant
+
+
+class Tournament:
+    """
+    マルチテーブル・トーナメント
+
+    使用例:
+        result = Tournament(["random"] * 50, TournamentConfig(seed=0)).run()
+        print(result.winner.name)
+    """
+
+    def __init__(self, agents: List[str], config: Optional[TournamentConfig] = None):
+        """
+        Args:
+            agents: 参加者ごとのエージェント名（simulation.create_player で生成できる名前）
+            config: トーナメント設定
+        """
+        self.config = config or TournamentConfig()
+        if not 2 <= self.config.seats_per_table <= 10:
+            raise ValueError("seats_per_table must be between 2 and 10")
+        if len(agents) < 2:
+            raise ValueError("A tournament needs at least 2 players")
+        if self.config.max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+
+        self.rng = random.Random(self.config.seed)
+        self.entrants = [
+            Entrant(
+                entrant_id=index,
+                agent=agent,
+                player=create_player(agent, index, self.config.initial_chips),
+            )
+            for index, agent in enumerate(agents)
+        ]
+        self.tables: List[TournamentTable] = []
+        self.hands_dealt = 0
+        self.decisions = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._alive = len(self.entrants)
+        self._finished = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._run_id = f"{self.rng.getrandbits(16):04x}"
+
+    def run(self) -> TournamentResult:
+        """トーナメントを最後まで実行（同期版）"""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> TournamentResult:
+        """トーナメントを最後まで実行"""
+        started = time.monotonic()
+        self._seat_players()
+        self._slots = asyncio.Semaphore(self.config.max_in_flight)
+        if self.config.threaded_decisions:
+            self._executor = ThreadPoolExecutor(max_workers=self.config.max_in_flight)
+        try:
+            await asyncio.gather(*(self._run_table(table) for table in self.tables))
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            for table in self.tables:
+                table.game.db.close()
+
+        return TournamentResult(
+            standings=self._standings(),
+            hands=self.hands_dealt,
+            tables=len(self.tables),
+            blind_level=self.config.schedule.level_index(max(self.hands_dealt - 1, 0)),
+            elapsed=time.monotonic() - started,
+            decisions=self.decisions,
+            peak_in_flight=self.peak_in_flight,
+        )
+
+    def _seat_players(self):
+        """参加者を抽選でテーブルに振り分ける"""
+        seats = self.config.seats_per_table
+        table_count = math.ceil(len(self.entrants) / seats)
+        draw = list(self.entrants)
+        self.rng.shuffle(draw)
+
+        for table_id in range(table_count):
+            game = PokerGame(
+                initial_chips=self.config.initial_chips,
+                uuid_suffix=(
+                    f"tour{self._run_id}_t{table_id}" if self.config.record_history else None
+                ),
+                sim_mode=not self.config.record_history,
+                seed=self.rng.getrandbits(64),
+            )
+            table = TournamentTable(table_id, game)
+            for entrant in draw[table_id::table_count]:
+                entrant.player.id = len(table.entrants)
+                entrant.table_id = table_id
+                table.entrants.append(entrant)
+                game.add_player(entrant.player)
+            game.dealer_button = game.rng.randrange(len(game.players))
+            self.tables.append(table)
+
+    async def _run_table(self, table: TournamentTable):
+        """1テーブル分のタスク（トーナメント終了またはテーブル解散まで）"""
+        while not self._finished:
+            self._rebalance()
+            if table.closed or self._finished:
+                return
+            if len(table.entrants) >= 2:
+                await self._play_hand(table)
+                await asyncio.sleep(0)  # 意思決定を直接呼ぶ場合も他のテーブルに順番を回す
+                continue
+            # 人数が揃うまで他のテーブルからの移動を待つ
+            table.wakeup.clear()
+            await table.wakeup.wait()
+
+    async def _play_hand(self, table: TournamentTable):
+        """テーブルで1ハンドを実行し、バストした参加者の順位を確定する"""
+        game = table.game
+        level = self.config.schedule.level_at(self.hands_dealt)
+        game.small_blind = level.small_blind
+        game.big_blind = level.big_blind
+        self.hands_dealt += 1
+        table.hands += 1
+        chips_before = [entrant.player.chips for entrant in table.entrants]
+
+        table.busy = True
+        try:
+            steps = game.hand_steps()
+            try:
+                player, game_state = next(steps)
+                while True:
+                    decision = await self._decide(player, game_state)
+                    player, game_state = steps.send(decision)
+            except StopIteration:
+                pass
+        finally:
+            table.busy = False
+
+        for entrant in table.entrants:
+            entrant.hands_played += 1
+        if isinstance(game.db, EventBuffer):
+            game.db.drain()
+
+        busted = [
+            (chips_before[seat], entrant)
+            for seat, entrant in enumerate(table.entrants)
+            if entrant.player.chips <= 0
+        ]
+        if busted:
+            # 同じハンドでバストした場合は開始時のチップが多いほうが上位
+            busted.sort(key=lambda item: item[0])
+            for _, entrant in busted:
+                entrant.place = self._alive
+                self._alive -= 1
+            removed = {id(entrant) for _, entrant in busted}
+            table.entrants = [e for e in table.entrants if id(e) not in removed]
+            table.sync_players()
+
+        max_hands = self.config.max_hands
+        if self._alive <= 1 or (max_hands is not None and self.hands_dealt >= max_hands):
+            self._finish()
+
+    async def _decide(self, player: Player, game_state: GameState) -> Dict[str, Any]:
+        """エージェントの意思決定を実行（同時実行数は max_in_flight まで）"""
+        self.decisions += 1
+        if self._executor is None:
+            return player.make_decision(game_state)
+        async with self._slots:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor, player.make_decision, game_state
+                )
+            finally:
+                self.in_flight -= 1
+
+    def _rebalance(self):
+        """
+        テーブルを解散・人数調整する
+
+        進行中でないテーブルだけを変更する。進行中のテーブルへ移動する参加者は
+        着席待ちとして、そのテーブルの次のハンドの前に着席させる。
+        """
+        seats = self.config.seats_per_table
+        open_tables = [table for table in self.tables if not table.closed]
+        remaining = sum(table.size for table in open_tables)
+        needed = max(1, math.ceil(remaining / seats))
+
+        # 不要になったテーブルを人数の少ない順に解散する
+        while len(open_tables) > needed:
+            idle = [table for table in open_tables if not table.busy]
+            if not idle:
+                break
+            breaking = min(idle, key=lambda table: (table.size, -table.table_id))
+            open_tables.remove(breaking)
+            breaking.closed = True
+            movers = breaking.entrants + breaking.pending
+            breaking.entrants = []
+            breaking.pending = []
+            breaking.sync_players()
+            for entrant in movers:
+                target = min(open_tables, key=lambda table: (table.size, table.table_id))
+                target.pending.append(entrant)
+                entrant.table_id = target.table_id
+            breaking.wakeup.set()
+
+        # 人数差が2人以上あれば、多いテーブルから少ないテーブルへ1人ずつ移す
+        while len(open_tables) > 1:
+            smallest = min(open_tables, key=lambda table: (table.size, table.table_id))
+            sources = [
+                table
+                for table in open_tables
+                if not table.busy and len(table.entrants) > 0
+                and table.size > smallest.size + 1
+            ]
+            if not sources:
+                break
+            source = max(sources, key=lambda table: (table.size, -table.table_id))
+            entrant = source.take_player_to_move()
+            entrant.table_id = smallest.table_id
+            smallest.pending.append(entrant)
+
+        for table in open_tables:
+            if not table.busy:
+                table.seat_pending()
+                if len(table.entrants) >= 2:
+                    table.wakeup.set()
+
+    def _finish(self):
+        """トーナメントを終了し、待機中のテーブルを起こす"""
+        self._finished = True
+        for table in self.tables:
+            table.wakeup.set()
+
+    def _standings(self) -> List[Standing]:
+        """最終順位（残っている参加者はチップの多い順に上位）"""
+        survivors = sorted(
+            (entrant for entrant in self.entrants if entrant.place is None),
+            key=lambda entrant: entrant.player.chips,
+            reverse=True,
+        )
+        for place, entrant in enumerate(survivors, 1):
+            entrant.place = place
+        ranked = sorted(self.entrants, key=lambda entrant: entrant.place)
+        return [
+            Standing(
+                place=entrant.place,
+                name=entrant.player.name,
+                agent=entrant.agent,
+                chips=entrant.player.chips,
+                hands_played=entrant.hands_played,
+            )
+            for entrant in ranked
+        ]
+
+
+def run_tournament(agents: List[str], **kwargs) -> TournamentResult:
+    """
+    トーナメントを実行
+
+    Args:
+        agents: 参加者ごとのエージェント名
+        **kwargs: TournamentConfig のフィールド
+    """
+    return Tournament(agents, TournamentConfig(**kwargs)).run()
+
+
+def main(argv: Optional[List[str]] = None):
+    """トーナメントのコマンドラインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="Run a multi-table poker tournament")
+    parser.add_argument(
+        "--agents",
+        default="random:50",
+        help="参加エージェントと人数（例: random:40,mypkg.bots.TightPlayer:10）",
+    )
+    parser.add_argument("--seats", type=int, default=9, help="1テーブルの座席数")
+    parser.add_argument("--chips", type=int, default=2000, help="初期チップ")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=8, help="同時に処理する意思決定リクエスト数の上限"
+    )
+    parser.add_argument("--max-hands", type=int, default=None, help="総ハンド数の上限")
+    parser.add_argument("--seed", type=int, default=None, help="乱数シード")
+    parser.add_argument("--record-history", action="store_true", help="各テーブルの履歴をDBに記録")
+    args = parser.parse_args(argv)
+
+    result = run_tournament(
+        parse_agents(args.agents, max_players=10_000),
+        seats_per_table=args.seats,
+        initial_chips=args.chips,
+        max_in_flight=args.max_in_flight,
+        max_hands=args.max_hands,
+        seed=args.seed,
+        record_history=args.record_history,
+    )
+
+    print(
+        f"{len(result.standings)} players on {result.tables} tables: "
+        f"{result.hands} hands in {result.elapsed:.1f}s "
+        f"(blind level {result.blind_level + 1}, peak {result.peak_in_flight} requests in flight)"
+    )
+    for standing in result.standings[:10]:
+        print(
+            f"{standing.place:3d}. {standing.name:>24s} ({standing.agent}) "
+            f"chips {standing.chips} | hands {standing.hands_played}"
+        )
+
+
+if __name__ == "__main__":
+    main()
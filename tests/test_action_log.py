@@ -0,0 +1,87 @@
+"""
+Tests for poker.action_log module
+"""
+
+from poker.action_log import ActionEvent, ActionLog
+from poker.game import PokerGame
+from poker.game_models import Card
+
+
+class TestActionLog:
+    """構造化アクションログのテスト"""
+
+    def test_render_matches_legacy_strings(self):
+        """イベントが従来と同じ表示文字列になることを確認"""
+        log = ActionLog()
+        log.record(ActionEvent(1, "preflop", 0, "small_blind", 10, 10))
+        log.record(ActionEvent(1, "preflop", 1, "big_blind", 20, 30))
+        log.record(ActionEvent(1, "preflop", 2, "raise", 60, 90))
+        log.record(ActionEvent(1, "preflop", 3, "all_in", 500, 590))
+        flop = tuple(Card.from_str(c) for c in ("As", "Kd", "2c"))
+        log.record(ActionEvent(1, "flop", None, "deal", 0, 590, flop))
+        log.record(ActionEvent(1, "flop", 0, "call", 50, 640))
+        log.append("Showdown: Player 3 won 640")
+
+        assert list(log) == [
+            "Player 0 posted small blind 10",
+            "Player 1 posted big blind 20",
+            "Player 2 raised to 60",
+            "Player 3 went all-in with 500",
+            "Flop dealt: A♠, K♦, 2♣",
+            "Player 0 called 50",
+            "Showdown: Player 3 won 640",
+        ]
+        assert log[-2:] == ["Player 0 called 50", "Showdown: Player 3 won 640"]
+        assert next(reversed(log)) == "Showdown: Player 3 won 640"
+
+    def test_latest_for_player(self):
+        """プレイヤーごとの最新ベッティングアクションを取得できることを確認"""
+        log = ActionLog()
+        log.record(ActionEvent(1, "preflop", 1, "big_blind", 20, 30))
+        assert log.latest_for(1) is None  # ブラインドは対象外
+
+        log.record(ActionEvent(1, "preflop", 1, "check", 0, 30))
+        log.record(ActionEvent(1, "flop", 1, "raise", 40, 70))
+        assert (log.latest_for(1).action, log.latest_for(1).amount) == ("raise", 40)
+        assert log.latest_for(2) is None
+
+    def test_truncate_restores_latest_index(self):
+        """切り詰めると最新アクションの索引も巻き戻ることを確認"""
+        log = ActionLog()
+        log.record(ActionEvent(1, "preflop", 1, "call", 20, 40))
+        log.record(ActionEvent(1, "preflop", 2, "check", 0, 40))
+        log.record(ActionEvent(1, "flop", 1, "fold", 0, 40))
+
+        log.truncate(2)
+
+        assert len(log) == 2
+        assert log.latest_for(1).action == "call"
+        assert log.latest_for(2).action == "check"
+
+    def test_game_records_structured_events(self):
+        """ゲームのアクションが構造化イベントとして記録されることを確認"""
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+        actor = game.current_player_index
+
+        game.process_player_action(actor, "fold")
+        event = game.action_history.events[-1]
+
+        assert (event.hand, event.street, event.seat, event.action) == (
+            1,
+            "preflop",
+            actor,
+            "fold",
+        )
+        assert event.pot_after == game.pot
+        assert game.action_history.latest_for(actor) is event
+        assert game.action_history[-1] == f"Player {actor} folded"
+
+    def test_list_assignment_is_wrapped(self):
+        """文字列リストを代入しても ActionLog として扱われることを確認"""
+        game = PokerGame(sim_mode=True)
+        game.action_history = ["test action"]
+
+        assert isinstance(game.action_history, ActionLog)
+        assert game.action_history == ["test action"]
@@ -0,0 +1,86 @@
+"""
+Tests for poker.cli_ui module
+"""
+
+import sqlite3
+
+from poker import cli_ui
+from poker.cli_ui import PokerUI
+
+
+def _random_configs(agent_ids):
+    """LLM API を使わずに動かせるランダムプレイヤーの設定を作成"""
+    return [
+        {"type": "random", "agent_id": agent_id, "user_id": f"player_{i}"}
+        for i, agent_id in enumerate(agent_ids)
+    ]
+
+
+class TestDuplicateMode:
+    """デュプリケートモードの集計テスト"""
+
+    def test_entrant_labels(self):
+        """同じエージェントが複数いる場合だけ番号付きの表示名になることを確認"""
+        configs = _random_configs(["team1_agent", "team2_agent", "team1_agent"])
+
+        assert PokerUI._entrant_labels(configs) == [
+            "team1_agent#1",
+            "team2_agent",
+            "team1_agent#2",
+        ]
+
+    def test_same_agent_on_two_seats_is_reported_separately(self, monkeypatch):
+        """同じエージェントの2席が1行にまとめられず、勝利数も席ごとに数えられることを確認"""
+        configs = _random_configs(["team1_agent", "team1_agent", "team2_agent"])
+        ui = PokerUI()
+        monkeypatch.setattr(ui, "_parse_agents_config", lambda agents_config: configs)
+
+        stats = ui.run_duplicate_agent_mode(max_hands=4, seed=7)
+
+        assert set(stats) == {"team1_agent#1", "team1_agent#2", "team2_agent"}
+        for entrant in stats.values():
+            assert entrant.seats == 3
+            assert entrant.hands_played == 12
+        assert sum(entrant.net_chips for entrant in stats.values()) == 0
+        assert sum(entrant.hands_won for entrant in stats.values()) >= 12
+
+
+class TestAgentOnlyResume:
+    """エージェント専用モードの再開のテスト"""
+
+    def test_resume_does_not_record_replayed_hands_twice(
+        self, tmp_path, monkeypatch, isolated_history_db
+    ):
+        """チェックポイント後に記録済みのハンドは再実行前に消され、同じセッションに続けて記録されることを確認"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(cli_ui, "sleep", lambda seconds: None)
+        configs = _random_configs(["team1_agent", "team2_agent"])
+        save_checkpoint = PokerUI._save_checkpoint
+
+        def save_unless_completed(path, data):
+            # 最後のハンドの後に落ちたものとして、完了時のチェックポイントを書かない
+            if not data["completed"]:
+                save_checkpoint(path, data)
+
+        ui = PokerUI()
+        monkeypatch.setattr(ui, "_parse_agents_config", lambda agents_config: configs)
+        monkeypatch.setattr(PokerUI, "_save_checkpoint", staticmethod(save_unless_completed))
+        ui.run_agent_only_mode(max_hands=3, uuid_suffix="run", seed=3, checkpoint_interval=2)
+        ui.game.db.close()
+
+        monkeypatch.setattr(PokerUI, "_save_checkpoint", staticmethod(save_checkpoint))
+        resumed = PokerUI()
+        monkeypatch.setattr(resumed, "_parse_agents_config", lambda agents_config: configs)
+        resumed.run_agent_only_mode(resume_from="latest")
+        resumed.game.db.close()
+
+        conn = sqlite3.connect(isolated_history_db)
+        try:
+            assert conn.execute("SELECT session_id, hands FROM sessions").fetchall() == [
+                (resumed.game.db.session_id, 3)
+            ]
+            assert conn.execute("SELECT COUNT(*) FROM hands").fetchone()[0] == 3
+            dealt = conn.execute("SELECT SUM(hands_dealt) FROM player_stats").fetchone()[0]
+            assert dealt == 3 * len(configs)
+        finally:
+            conn.close()
@@ -0,0 +1,249 @@
+"""
+Tests for poker.equity module
+"""
+
+import pytest
+from poker.equity import (
+    EquityCache,
+    EquityResult,
+    canonical_key,
+    enumeration_size,
+    estimate_equity,
+    exact_equity,
+    shutdown_pool,
+    to_card,
+)
+from poker.game_models import Card, Suit
+
+
+class TestToCard:
+    """カード入力の正規化テスト"""
+
+    def test_accepts_card_int_and_string(self):
+        """Card・整数表現・文字列のいずれも受け付けることを確認"""
+        ace = Card(14, Suit.SPADES)
+        assert to_card(ace) is ace
+        assert to_card(51) is ace
+        assert to_card("A♠") is ace
+        assert to_card("As") is ace
+
+
+class TestEstimateEquity:
+    """モンテカルロ推定のテスト"""
+
+    def test_aces_vs_random_hand(self):
+        """AAのランダムハンド相手のエクイティ（約85%）"""
+        result = estimate_equity(["As", "Ad"], samples=4000, workers=1, seed=1)
+
+        assert isinstance(result, EquityResult)
+        assert result.samples == 4000
+        assert result.equity == pytest.approx(0.85, abs=4 * result.std_error + 0.01)
+        assert 0 < result.std_error < 0.01
+
+    def test_same_seed_is_reproducible(self):
+        """同じシードなら同じ結果になることを確認"""
+        first = estimate_equity(["Kh", "Qh"], ["2h", "7h", "Jc"], samples=1000, workers=1, seed=7)
+        second = estimate_equity(["Kh", "Qh"], ["2h", "7h", "Jc"], samples=1000, workers=1, seed=7)
+
+        assert first.equity == second.equity
+
+    def test_river_nut_hand_always_wins(self):
+        """リバーでロイヤルフラッシュなら常に勝つことを確認"""
+        result = estimate_equity(
+            ["As", "Ks"], ["Qs", "Js", "Ts", "2d", "3c"], num_opponents=3, samples=500, workers=1
+        )
+
+        assert result.equity == 1.0
+        assert result.win == 1.0
+        assert result.std_error == 0.0
+
+    def test_opponent_range(self):
+        """相手レンジ指定（AKs vs QQ は約46%）"""
+        queens = [("Qh", "Qd"), ("Qc", "Qs"), ("Qh", "Qc")]
+        result = estimate_equity(
+            ["As", "Ks"], opponent_ranges=[queens], samples=4000, workers=1, seed=3
+        )
+
+        assert result.equity == pytest.approx(0.46, abs=4 * result.std_error + 0.01)
+
+    def test_time_budget_stops_early(self):
+        """時間予算で打ち切られることを確認"""
+        result = estimate_equity(
+            ["7c", "2d"], num_opponents=5, samples=10_000_000, time_budget=0.05, workers=1
+        )
+
+        assert 0 < result.samples < 10_000_000
+
+    def test_process_pool(self):
+        """プロセスプールでの分散実行"""
+        try:
+            result = estimate_equity(["As", "Ad"], samples=6000, workers=2, seed=5)
+        finally:
+            shutdown_pool()
+
+        assert result.samples == 6000
+        assert result.equity == pytest.approx(0.85, abs=4 * result.std_error + 0.01)
+
+    def test_invalid_input(self):
+        """不正な入力はエラーになることを確認"""
+        with pytest.raises(ValueError, match="Duplicate"):
+            estimate_equity(["As", "Ad"], ["As", "2c", "3c"], workers=1)
+        with pytest.raises(ValueError, match="exactly 2 cards"):
+            estimate_equity(["As"], workers=1)
+        with pytest.raises(ValueError, match="At most 9 opponents"):
+            estimate_equity(["As", "Ad"], num_opponents=10, workers=1)
+
+    def test_ranges_that_cannot_be_dealt_together(self):
+        """同時に配れないレンジはエラーになり、配りにくいレンジも引き直しで止まらないことを確認"""
+        aces_kings = [("Ac", "Kc")]
+        with pytest.raises(ValueError, match="dealt together"):
+            estimate_equity(
+                ["Qs", "Qh"],
+                opponent_ranges=[aces_kings, aces_kings],
+                time_budget=1.0,
+                workers=1,
+            )
+
+        # 2つ目のレンジは1組を除いて1つ目と衝突する
+        first = [("Ac", "Kc")]
+        second = [("Ac", card) for card in ("2c", "3c", "4c", "5c")] + [("Ad", "Kd")]
+        result = estimate_equity(
+            ["Qs", "Qh"],
+            opponent_ranges=[first, second],
+            samples=2000,
+            mode="monte_carlo",
+            workers=1,
+            seed=1,
+        )
+        assert result.samples == 2000
+
+    def test_rejected_deals_are_bounded(self, monkeypatch):
+        """レンジの衝突で引き直しが続く場合は上限で止まることを確認"""
+        monkeypatch.setattr("poker.equity._MAX_REJECTED_DEALS", 50)
+        monkeypatch.setattr("poker.equity._deal_from_ranges", lambda rng, ranges: None)
+        with pytest.raises(ValueError, match="rarely"):
+            estimate_equity(
+                ["Qs", "Qh"],
+                opponent_ranges=[[("Ac", "Kc")]],
+                samples=1000,
+                mode="monte_carlo",
+                workers=1,
+            )
+
+
+class TestExactEquity:
+    """全列挙による厳密エクイティのテスト"""
+
+    def test_river_against_random_hand(self):
+        """リバーでは相手ハンド990通りを全列挙する"""
+        result = exact_equity(["As", "Ks"], ["Qs", "Js", "2d", "3c", "4h"])
+
+        assert result.exact
+        assert result.samples == 990
+        assert result.std_error == 0.0
+        assert result.equity == pytest.approx(360.5 / 990)
+
+    def test_flop_against_known_hand(self):
+        """フロップのヘッズアップ（既知ハンド）はランアウト990通りを列挙"""
+        result = exact_equity(
+            ["As", "Ks"], ["Qs", "Js", "2d"], opponent_ranges=[[("Qh", "Qd")]]
+        )
+
+        assert result.samples == 990
+        assert result.equity == pytest.approx(335 / 990)
+        assert result.tie == 0.0
+
+    def test_exact_agrees_with_monte_carlo(self):
+        """厳密値がモンテカルロ推定の誤差範囲内に入ることを確認"""
+        exact = exact_equity(["As", "Ks"], ["Qs", "Js", "2d", "3c"])
+        estimate = estimate_equity(
+            ["As", "Ks"],
+            ["Qs", "Js", "2d", "3c"],
+            samples=5000,
+            workers=1,
+            seed=11,
+            mode="monte_carlo",
+        )
+
+        assert not estimate.exact
+        assert estimate.equity == pytest.approx(exact.equity, abs=4 * estimate.std_error)
+
+    def test_auto_mode_selects_exact_for_small_enumerations(self):
+        """auto モードは列挙数が samples 以下なら全列挙を選ぶ"""
+        hero = [to_card("As"), to_card("Ks")]
+        board = [to_card(c) for c in ("Qs", "Js", "2d", "3c", "4h")]
+        assert enumeration_size(hero, board, [], 1) == 990
+
+        assert estimate_equity(hero, board, samples=1000, workers=1).exact
+        assert not estimate_equity(hero, board, samples=500, workers=1, seed=1).exact
+
+    def test_invalid_mode(self):
+        """不明なモードはエラーになることを確認"""
+        with pytest.raises(ValueError, match="Unknown mode"):
+            estimate_equity(["As", "Ad"], mode="fast", workers=1)
+
+
+class TestEquityCache:
+    """スート同型の正規化とキャッシュのテスト"""
+
+    def test_canonical_key_is_suit_isomorphic(self):
+        """スートの入れ替え・カードの順序違いは同じキーになることを確認"""
+        key = canonical_key(["Ah", "Kh"], ["Qh", "Jd", "2c"])
+
+        assert canonical_key(["Ks", "As"], ["2d", "Jc", "Qs"]) == key
+        assert canonical_key(["Ad", "Kd"], ["Jc", "Qd", "2h"]) == key
+        # スーテッドとオフスートは区別される
+        assert canonical_key(["Ah", "Kd"], ["Qh", "Jd", "2c"]) != key
+
+    def test_canonical_key_with_ranges(self):
+        """相手レンジも同じスート置換で正規化されることを確認"""
+        key = canonical_key(["Ah", "Kh"], opponent_ranges=[[("Qh", "Qd")]])
+
+        assert canonical_key(["As", "Ks"], opponent_ranges=[[("Qd", "Qs")]]) == key
+        assert canonical_key(["As", "Ks"], opponent_ranges=[[("Qc", "Qd")]]) != key
+
+    def test_cache_hits_for_isomorphic_states(self):
+        """同型の状況ではキャッシュ済みの結果を返すことを確認"""
+        cache = EquityCache()
+        first = cache.estimate(["Ah", "Kh"], ["Qh", "Jd", "2c"], samples=500, workers=1)
+        second = cache.estimate(["As", "Ks"], ["Qs", "Jc", "2d"], samples=500, workers=1)
+        other = cache.estimate(
+            ["As", "Ks"], ["Qs", "Jc", "2d"], num_opponents=2, samples=500, workers=1
+        )
+
+        assert second is first
+        assert other is not first
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_cut_short_result_is_not_reused(self):
+        """時間予算で打ち切られた結果は、同じサンプル数の要求に再利用されないことを確認"""
+        cache = EquityCache()
+        options = dict(samples=2000, workers=1, mode="monte_carlo")
+        short = cache.estimate(["Ah", "Kh"], time_budget=0, **options)
+        full = cache.estimate(["Ah", "Kh"], **options)
+
+        assert short.samples < 2000
+        assert full is not short
+        assert full.samples == 2000
+        # 要求より多くのサンプルで計算済みの結果は再利用する
+        assert cache.estimate(["As", "Ks"], samples=1000, workers=1, mode="monte_carlo") is full
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_cache_evicts_least_recently_used(self):
+        """上限を超えると最も古いエントリから破棄されることを確認"""
+        cache = EquityCache(maxsize=2)
+        boards = [["2c", "7d", "9h", "Js", "Kc"], ["3c", "7d", "9h", "Js", "Kc"]]
+        for board in boards:
+            cache.estimate(["As", "Ad"], board, workers=1)
+        cache.estimate(["As", "Ad"], boards[0], workers=1)  # boards[0] を最新にする
+        cache.estimate(["As", "Ad"], ["4c", "7d", "9h", "Js", "Kc"], workers=1)
+
+        assert len(cache) == 2
+        cache.estimate(["As", "Ad"], boards[0], workers=1)
+        assert cache.stats()["hits"] == 2
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hit_rate"] == 0.0
@@ -4,7 +4,13 @@ Tests for poker.evaluator module
 
 import pytest
 from poker.game_models import Card, Suit
-from poker.evaluator import HandRank, HandResult, HandEvaluator
+from poker.evaluator import (
+    HandRank,
+    HandResult,
+    HandEvaluator,
+    IncrementalHand,
+    ShowdownResult,
+)
 
 
 class TestHandRank:
@@ -138,7 +144,23 @@ class TestHandEvaluator:
 
         assert result.rank == HandRank.STRAIGHT_FLUSH
         assert result.kickers == [9]
-        assert "Straight Flush" in result.description
+        assert result.description == "Straight Flush: 9-high"
+
+    def test_steel_wheel(self):
+        """A-5のストレートフラッシュ（スティールホイール）は5-highと表示されることを確認"""
+        hole_cards = [Card(14, Suit.CLUBS), Card(2, Suit.CLUBS)]
+        community_cards = [
+            Card(3, Suit.CLUBS),
+            Card(4, Suit.CLUBS),
+            Card(5, Suit.CLUBS),
+            Card(13, Suit.HEARTS),
+        ]
+
+        result = HandEvaluator.evaluate_hand(hole_cards, community_cards)
+
+        assert result.rank == HandRank.STRAIGHT_FLUSH
+        assert result.kickers == [5]
+        assert result.description == "Straight Flush: 5-high"
 
     def test_four_of_a_kind(self):
         """フォーカードのテスト"""
@@ -215,6 +237,7 @@ class TestHandEvaluator:
 
         assert result.rank == HandRank.STRAIGHT
         assert result.kickers == [5]  # A-5 straight is 5-high
+        assert result.description == "Straight: 5-high"
 
     def test_three_of_a_kind(self):
         """スリーカードのテスト"""
@@ -390,3 +413,276 @@ class TestHandEvaluator:
 
         with pytest.raises(ValueError, match="Must evaluate exactly 5 cards"):
             HandEvaluator._evaluate_five_cards(cards)
+
+
+class TestHandStrength:
+    """整数強度（ルックアップテーブル評価）のテスト"""
+
+    def test_strength_orders_categories(self):
+        """役カテゴリの順に強度が大きくなることを確認"""
+        board = [Card(12, Suit.SPADES), Card(11, Suit.SPADES), Card(10, Suit.SPADES)]
+        royal = HandEvaluator.evaluate_strength(
+            [Card(14, Suit.SPADES), Card(13, Suit.SPADES)] + board
+        )
+        straight = HandEvaluator.evaluate_strength(
+            [Card(14, Suit.HEARTS), Card(13, Suit.HEARTS)] + board
+        )
+        pair = HandEvaluator.evaluate_strength(
+            [Card(12, Suit.HEARTS), Card(2, Suit.HEARTS)] + board
+        )
+
+        assert royal > straight > pair
+
+    def test_strength_matches_hand_result(self):
+        """evaluate_hand の結果と整数強度が一致することを確認"""
+        hole_cards = [Card(9, Suit.CLUBS), Card(9, Suit.DIAMONDS)]
+        community_cards = [
+            Card(9, Suit.HEARTS),
+            Card(4, Suit.SPADES),
+            Card(4, Suit.CLUBS),
+            Card(4, Suit.HEARTS),
+        ]
+
+        result = HandEvaluator.evaluate_hand(hole_cards, community_cards)
+        strength = HandEvaluator.evaluate_strength(hole_cards + community_cards)
+
+        assert result.rank == HandRank.FULL_HOUSE
+        assert result.kickers == [9, 4]
+        assert result.strength == strength
+
+    def test_evaluate_with_board_matches_full_evaluation(self):
+        """ボード事前計算＋ホールカード差分評価が全体評価と一致することを確認"""
+        board = [
+            Card(14, Suit.HEARTS),
+            Card(10, Suit.HEARTS),
+            Card(7, Suit.HEARTS),
+            Card(7, Suit.CLUBS),
+            Card(2, Suit.SPADES),
+        ]
+        board_state = HandEvaluator.prepare_board(board)
+        hands = [
+            [Card(13, Suit.HEARTS), Card(3, Suit.DIAMONDS)],  # フラッシュ
+            [Card(7, Suit.DIAMONDS), Card(2, Suit.CLUBS)],  # フルハウス
+            [Card(9, Suit.SPADES), Card(8, Suit.SPADES)],  # ワンペア
+        ]
+
+        for hole in hands:
+            assert HandEvaluator.evaluate_with_board(
+                board_state, hole
+            ) == HandEvaluator.evaluate_strength(hole + board)
+
+    def test_wheel_is_lowest_straight(self):
+        """A-5ストレートが6-highストレートより弱いことを確認"""
+        wheel = HandEvaluator.evaluate_strength(
+            [
+                Card(14, Suit.SPADES),
+                Card(2, Suit.HEARTS),
+                Card(3, Suit.DIAMONDS),
+                Card(4, Suit.CLUBS),
+                Card(5, Suit.SPADES),
+            ]
+        )
+        six_high = HandEvaluator.evaluate_strength(
+            [
+                Card(6, Suit.SPADES),
+                Card(2, Suit.HEARTS),
+                Card(3, Suit.DIAMONDS),
+                Card(4, Suit.CLUBS),
+                Card(5, Suit.SPADES),
+            ]
+        )
+
+        assert wheel < six_high
+
+    def test_seven_card_flush_uses_best_five(self):
+        """7枚中6枚が同スートでも上位5枚のフラッシュになることを確認"""
+        hole_cards = [Card(14, Suit.HEARTS), Card(2, Suit.HEARTS)]
+        community_cards = [
+            Card(9, Suit.HEARTS),
+            Card(7, Suit.HEARTS),
+            Card(5, Suit.HEARTS),
+            Card(3, Suit.HEARTS),
+            Card(13, Suit.CLUBS),
+        ]
+
+        result = HandEvaluator.evaluate_hand(hole_cards, community_cards)
+
+        assert result.rank == HandRank.FLUSH
+        assert result.kickers == [14, 9, 7, 5, 3]
+        assert len(result.cards) == 5
+        assert all(card.suit == Suit.HEARTS for card in result.cards)
+
+
+class TestIncrementalHand:
+    """ストリートごとの評価状態のテスト"""
+
+    def test_strength_matches_full_evaluation_each_street(self):
+        """1枚ずつ追加した状態の強度が全体評価と一致することを確認"""
+        cards = [
+            Card.from_str(text) for text in ("Ah", "Kh", "Qh", "7c", "2h", "Jh", "Th")
+        ]
+        hand = IncrementalHand(cards[:5])
+
+        for count in range(5, 8):
+            assert hand.strength == HandEvaluator.evaluate_strength(cards[:count])
+            if count < 7:
+                hand.add(cards[count])
+
+        assert hand.hand_rank == HandRank.ROYAL_FLUSH
+        assert hand.result().rank == HandRank.ROYAL_FLUSH
+
+    def test_copy_is_independent(self):
+        """ボード状態から派生させたハンドが元の状態を変更しないことを確認"""
+        board = IncrementalHand([Card.from_str(t) for t in ("9s", "9d", "4c")])
+        hand = board.copy().extend([Card.from_str("9h"), Card.from_str("4d")])
+
+        assert len(board) == 3
+        assert Card.from_str("9h") not in board
+        assert hand.hand_rank == HandRank.FULL_HOUSE
+
+    def test_draw_detection(self):
+        """フラッシュドロー・オープンエンド・ガットショットの判定"""
+        combo_draw = IncrementalHand(
+            [Card.from_str(t) for t in ("9h", "8h", "7h", "6d", "2h")]
+        )
+        gutshot = IncrementalHand(
+            [Card.from_str(t) for t in ("As", "Ks", "Qd", "Jc", "3h")]
+        )
+
+        assert combo_draw.draws() == {
+            "flush_draw": Suit.HEARTS,
+            "straight_draw": "OESD",
+            "straight_ranks": [10, 5],
+        }
+        assert gutshot.draws()["straight_draw"] == "GUTSHOT"
+        assert gutshot.draws()["flush_draw"] is None
+
+    def test_outs(self):
+        """アウツがフラッシュとストレートの重複を除いて数えられることを確認"""
+        hand = IncrementalHand(
+            [Card.from_str(t) for t in ("9h", "8h", "7h", "6d", "2h")]
+        )
+
+        outs = hand.outs(target=HandRank.STRAIGHT)
+        assert len(outs) == 15  # フラッシュ9枚 + ストレート8枚 - 重複2枚
+        dead = [Card.from_str("Th"), Card.from_str("5c")]
+        assert len(hand.outs(dead_cards=dead, target=HandRank.STRAIGHT)) == 13
+        # リバー後はアウツなし
+        hand.extend([Card.from_str("Kc"), Card.from_str("Kd")])
+        assert hand.outs() == []
+
+    def test_rejects_duplicates_and_short_hands(self):
+        """重複カード・5枚未満での強度計算はエラーになることを確認"""
+        hand = IncrementalHand([Card.from_str("As")])
+
+        with pytest.raises(ValueError, match="Duplicate"):
+            hand.add(Card.from_str("As"))
+        with pytest.raises(ValueError, match="At least 5 cards"):
+            hand.strength
+
+
+class TestEvaluateShowdown:
+    """複数プレイヤーのショーダウン評価のテスト"""
+
+    def _board(self):
+        return [Card.from_str(t) for t in ("Ac", "Kd", "Qh", "2s", "3s")]
+
+    def test_ranking_with_ties(self):
+        """強い順の順位と同点グループを返すことを確認"""
+        hands = {
+            "p0": [Card.from_str("Jc"), Card.from_str("Tc")],  # ストレート
+            "p1": [Card.from_str("9d"), Card.from_str("9c")],  # ワンペア9
+            "p2": [Card.from_str("9h"), Card.from_str("9s")],  # ワンペア9（同点）
+            "p3": [Card.from_str("Ad"), Card.from_str("Ah")],  # スリーカードA
+        }
+
+        result = HandEvaluator.evaluate_showdown(hands, self._board())
+
+        assert isinstance(result, ShowdownResult)
+        assert result.ranking == [["p0"], ["p3"], ["p1", "p2"]]
+        assert result.winners() == ["p0"]
+        assert result.winners(["p1", "p2", "p3"]) == ["p3"]
+        assert result.winners(["p1", "p2"]) == ["p1", "p2"]
+        for player, hole in hands.items():
+            assert result.strengths[player] == HandEvaluator.evaluate_strength(
+                hole + self._board()
+            )
+
+    def test_accepts_incremental_board(self):
+        """IncrementalHand のボード状態からも同じ結果が得られることを確認"""
+        hands = {
+            0: [Card.from_str("Kc"), Card.from_str("Ks")],
+            1: [Card.from_str("4s"), Card.from_str("5s")],
+        }
+
+        from_list = HandEvaluator.evaluate_showdown(hands, self._board())
+        from_state = HandEvaluator.evaluate_showdown(
+            hands, IncrementalHand(self._board())
+        )
+
+        assert from_state == from_list
+        assert from_list.ranking == [[1], [0]]
+
+    def test_short_board_falls_back(self):
+        """ボードが3枚未満の場合も評価できることを確認"""
+        hands = {
+            0: [Card.from_str("Ac"), Card.from_str("Ad")],
+            1: [Card.from_str("Kc"), Card.from_str("Kd")],
+        }
+
+        result = HandEvaluator.evaluate_showdown(hands, [])
+
+        assert result.ranking == [[0], [1]]
+
+
+class TestEvaluateBatch:
+    """NumPy一括評価のテスト"""
+
+    def test_batch_matches_scalar_strength(self):
+        """一括評価が1ハンドずつの評価と一致することを確認"""
+        np = pytest.importorskip("numpy")
+        rng = np.random.default_rng(42)
+        cards = np.argsort(rng.random((500, 52)), axis=1)[:, :7]
+
+        strengths = HandEvaluator.evaluate_batch(cards[:, :2], cards[:, 2:])
+
+        assert strengths.shape == (500,)
+        for row, strength in zip(cards, strengths):
+            assert strength == HandEvaluator.evaluate_strength(row.tolist())
+
+    def test_batch_with_shared_board(self):
+        """全ハンド共通のボードをブロードキャストできることを確認"""
+        np = pytest.importorskip("numpy")
+        board = [Card(12, Suit.SPADES), Card(11, Suit.SPADES), Card(10, Suit.SPADES)]
+        hole = np.array(
+            [
+                [Card(14, Suit.SPADES), Card(13, Suit.SPADES)],
+                [Card(2, Suit.HEARTS), Card(7, Suit.CLUBS)],
+            ]
+        )
+
+        strengths = HandEvaluator.evaluate_batch(hole, board)
+
+        assert strengths[0] == HandEvaluator.evaluate_strength(list(hole[0]) + board)
+        assert strengths[0] > strengths[1]
+
+    def test_batch_rejects_invalid_card_count(self):
+        """5〜7枚以外のハンドはエラーになることを確認"""
+        np = pytest.importorskip("numpy")
+
+        with pytest.raises(ValueError, match="5 to 7 cards"):
+            HandEvaluator.evaluate_batch(np.array([[0, 1]]), np.array([[2, 3]]))
+
+    def test_batch_rejects_duplicate_cards(self):
+        """ハンド内の重複（ホールカードとボードの重なりを含む）や範囲外のカードはエラーになることを確認"""
+        np = pytest.importorskip("numpy")
+        hole = np.array([[0, 1], [4, 5]])
+
+        with pytest.raises(ValueError, match="Duplicate card in hand 1"):
+            HandEvaluator.evaluate_batch(hole, np.array([[8, 9, 10], [8, 9, 5]]))
+        with pytest.raises(ValueError, match="Duplicate card in hand 0"):
+            HandEvaluator.evaluate_batch(np.array([[0, 0]]), [8, 9, 10])
+        with pytest.raises(ValueError, match="0 to 51"):
+            HandEvaluator.evaluate_batch(hole, [8, 9, 52])
+        with pytest.raises(ValueError, match="0 to 51"):
+            HandEvaluator.evaluate_batch(hole, [8, 9, -1])
@@ -2,9 +2,13 @@
 Tests for poker.game module
 """
 
+import dataclasses
+import json
+
 import pytest
 from poker.player_models import HumanPlayer, RandomPlayer, LLMPlayer, PlayerStatus
 from poker.game import GamePhase, PokerGame
+from poker.game_history import EventBuffer
 
 
 class TestGamePhase:
@@ -226,6 +230,51 @@ class TestPokerGame:
         # 他のプレイヤー情報（自分以外の3人）
         assert len(game_state["players"]) == 3
 
+    def test_get_llm_game_state_is_cached_until_state_changes(self):
+        """状態が変わるまで同じゲーム状態が返され、変わると作り直されることを確認"""
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+        actor = game.current_player_index
+
+        state = game.get_llm_game_state(actor)
+        assert game.get_llm_game_state(actor) is state
+        assert game.get_llm_game_state_json(actor) is game.get_llm_game_state_json(actor)
+
+        game.process_player_action(actor, "fold")
+        updated = game.get_llm_game_state(actor)
+        assert updated is not state
+        assert updated.history[-1] == f"Player {actor} folded"
+        assert '"your_id": %d' % actor in game.get_llm_game_state_json(actor)
+
+        # メソッドを経由しない変更は明示的に無効化する
+        game.players[actor].chips += 1
+        game.invalidate_state_cache()
+        assert game.get_llm_game_state(actor).your_chips == updated.your_chips + 1
+
+    def test_cached_llm_game_state_cannot_be_changed_by_caller(self):
+        """キャッシュ済みのゲーム状態を呼び出し元が書き換えても他の呼び出しに漏れないことを確認"""
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+        actor = game.current_player_index
+        other = next(p.id for p in game.players if p.id != actor)
+
+        state = game.get_llm_game_state(actor)
+        actions = list(state.actions)
+        with pytest.raises(AttributeError):
+            state.actions.append("fold")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            state.your_chips = 0
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            state.players[0].chips = 0
+
+        # to_dict() は毎回新しいリストを返す
+        state.to_dict()["actions"].clear()
+        state.to_dict()["history"].append("injected")
+        assert list(game.get_llm_game_state(actor).actions) == actions
+        assert "injected" not in game.get_llm_game_state(other).history
+
     def test_get_llm_game_state_invalid_player(self):
         """無効なプレイヤーのゲーム状態取得エラーテスト"""
         game = PokerGame()
@@ -361,6 +410,226 @@ class TestPokerGame:
         assert game.game_stats["hands_played"] == 0
         assert game.game_stats["players_eliminated"] == []
 
+    def test_board_hand_tracks_community_cards(self):
+        """配られたコミュニティカードがボードの評価状態に反映されることを確認"""
+        game = PokerGame()
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+
+        assert len(game.board_hand) == 0
+        game._deal_flop()
+        game._deal_turn()
+        assert game.board_hand.cards == game.community_cards
+
+        # 直接書き換えられた場合は作り直される
+        game.community_cards = game.community_cards[:3]
+        assert game.get_board_hand().cards == game.community_cards
+
+    def test_sim_mode_play_hand(self, tmp_path, monkeypatch):
+        """シミュレーションモードでハンドを自動進行できることを確認"""
+        monkeypatch.chdir(tmp_path)
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        total_chips = sum(p.chips for p in game.players)
+
+        for _ in range(20):
+            if game.is_game_over():
+                break
+            game.play_hand()
+            assert sum(p.chips for p in game.players) == total_chips
+
+        # DBファイルは作られず、イベントはメモリ上に積まれる
+        assert game.db.db_path is None
+        assert not list(tmp_path.rglob("*.sqlite3"))
+        events = game.db.drain()
+        assert events[0][0] == "hand"
+        assert any(event[0] == "action" for event in events)
+        assert len(game.db.events) == 0
+
+    def test_event_buffer_is_bounded(self):
+        """イベントバッファが上限を超えると古いイベントから破棄されることを確認"""
+        buffer = EventBuffer(maxlen=3)
+        hand_id = buffer.start_new_hand(10, 20, 0, [0, 1])
+        for _ in range(5):
+            buffer.record_action(hand_id, "preflop", 0, "call", 20, 40)
+        buffer.end_hand(hand_id)
+
+        events = buffer.drain()
+        assert len(events) == 3
+        assert events[-1] == ("end_hand", hand_id)
+        assert buffer.start_new_hand(10, 20, 1, [0, 1]) == hand_id + 1
+
+    def test_snapshot_restore_round_trip(self):
+        """スナップショットから復元するとハンド途中の状態が元に戻ることを確認"""
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+        game._deal_flop()
+        snapshot = game.snapshot()
+        chips = [p.chips for p in game.players]
+        history_length = len(game.action_history)
+
+        # 1人目をフォールドさせ、ターンまで進めてから戻す
+        game.process_player_action(game.current_player_index, "fold")
+        game._deal_turn()
+        game.restore(snapshot)
+
+        assert game.snapshot() == snapshot
+        assert [p.chips for p in game.players] == chips
+        assert len(game.community_cards) == 3
+        assert game.get_board_hand().cards == game.community_cards
+        assert len(game.action_history) == history_length
+        assert game.deck.cards_remaining() == 52 - 8 - 4
+
+    def test_clone_is_independent(self):
+        """複製を進めても元のゲームとDBには影響しないことを確認"""
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+        snapshot = game.snapshot()
+        event_count = len(game.db.events)
+
+        clone = game.clone()
+        while not clone.betting_round_complete:
+            clone.process_player_action(clone.current_player_index, "fold")
+
+        assert clone.db is not game.db
+        assert clone.players[0] is not game.players[0]
+        assert game.snapshot() == snapshot
+        assert len(game.db.events) == event_count
+        assert sum(p.chips for p in clone.players) + clone.pot == sum(
+            p.chips for p in game.players
+        ) + game.pot
+
+    @pytest.mark.parametrize(
+        "options", [dict(sim_mode=True), dict(sim_mode=True, seed=5), dict(seed=5), dict()]
+    )
+    def test_clone_and_restore_deal_same_runout(self, options):
+        """複製と元のゲーム、復元後のゲームでターンとリバーが同じになることを確認"""
+        game = PokerGame(**options)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+        game._deal_flop()
+        snapshot = game.snapshot()
+        clone = game.clone()
+
+        runouts = []
+        for target in (game, clone):
+            target._deal_turn()
+            target._deal_river()
+            runouts.append(list(target.community_cards))
+        game.restore(snapshot)
+        game._deal_turn()
+        game._deal_river()
+        runouts.append(list(game.community_cards))
+
+        assert len(runouts[0]) == 5
+        assert runouts[1] == runouts[0]
+        assert runouts[2] == runouts[0]
+        game.db.close()
+
+    def test_seat_index_tracks_status_changes(self):
+        """プレイヤーの状態変化が座席インデックスに反映されることを確認"""
+        game = PokerGame(sim_mode=True)
+        game.setup_cpu_only_game()
+        game.start_new_hand()
+
+        assert game.get_player(2) is game.players[2]
+        assert game.get_player(99) is None
+        assert game._count_seats(PlayerStatus.ACTIVE) == 4
+
+        game.players[1].fold()
+        game.players[2].bet(game.players[2].chips)  # オールイン
+        assert game._seats_with(PlayerStatus.ACTIVE) == 0b1001
+        assert game._seats_with(PlayerStatus.FOLDED) == 0b0010
+        assert game._seats_with(PlayerStatus.ALL_IN) == 0b0100
+
+        # 次のアクティブな座席（一周して戻る）
+        assert game._next_seat(0b1001, 0) == 3
+        assert game._next_seat(0b1001, 3) == 0
+        assert game._next_seat(0b1000, 3) is None
+        assert game._next_seat(0b1000, 3, include_self=True) == 3
+
+        # 次のハンドではチップのないプレイヤーだけがバスト扱いになる
+        game.start_new_hand()
+        assert game._count_seats(PlayerStatus.ACTIVE) == 3
+        assert game._seats_with(PlayerStatus.BUSTED) == 0b0100
+
+    def test_seat_index_follows_player_list_changes(self):
+        """プレイヤーリストの差し替え・直接追加でもインデックスが作り直されることを確認"""
+        game = PokerGame(sim_mode=True)
+        game.players = [RandomPlayer(0, "A", 100), RandomPlayer(1, "B", 0)]
+        game.players[1].status = PlayerStatus.BUSTED
+        assert game._count_seats(PlayerStatus.ACTIVE) == 1
+
+        game.players.append(RandomPlayer(7, "C", 100))
+        assert game.get_player(7) is game.players[2]
+        assert game._seats_with(PlayerStatus.ACTIVE) == 0b101
+
+    def test_seeded_games_are_reproducible(self):
+        """同じシードのゲームはボタン位置・配牌・行動まで同じになることを確認"""
+
+        def play(seed):
+            game = PokerGame(sim_mode=True, seed=seed)
+            game.setup_cpu_only_game()
+            for _ in range(10):
+                game.play_hand()
+            return game.dealer_button, list(game.action_history), [
+                p.chips for p in game.players
+            ]
+
+        assert play(5) == play(5)
+        assert play(5) != play(6)
+
+    def test_checkpoint_resume_continues_identically(self):
+        """チェックポイントから再開したゲームが中断しなかった場合と同じ展開になることを確認"""
+        game = PokerGame(sim_mode=True, seed=8)
+        game.setup_cpu_only_game()
+        for _ in range(5):
+            game.play_hand()
+        state = json.loads(json.dumps(game.checkpoint_state()))
+
+        for _ in range(5):
+            game.play_hand()
+
+        resumed = PokerGame(sim_mode=True, seed=8)
+        resumed.setup_cpu_only_game()
+        resumed.restore_checkpoint_state(state)
+        assert resumed.hand_number == 5
+        for _ in range(5):
+            resumed.play_hand()
+
+        assert [p.chips for p in resumed.players] == [p.chips for p in game.players]
+        assert list(resumed.action_history) == list(game.action_history)
+        with pytest.raises(ValueError):
+            PokerGame(sim_mode=True).restore_checkpoint_state(state)
+
+    def test_deck_for_hand_regenerates_deal(self):
+        """(seed, hand_number) から実際に配られたカードを再現できることを確認"""
+        game = PokerGame(seed=42)
+        game.setup_cpu_only_game()
+        for _ in range(3):
+            game.start_new_hand()
+        hole_cards = [list(p.hole_cards) for p in game.players]
+        game._deal_flop()
+        game._deal_turn()
+        game._deal_river()
+
+        deck = game.deck_for_hand(3)
+        first = [deck.deal_card() for _ in game.players]
+        second = [deck.deal_card() for _ in game.players]
+        assert [list(cards) for cards in zip(first, second)] == hole_cards
+        deck.deal_card()
+        board = [deck.deal_card() for _ in range(3)]
+        deck.deal_card()
+        board.append(deck.deal_card())
+        deck.deal_card()
+        board.append(deck.deal_card())
+        assert board == game.community_cards
+
+        with pytest.raises(ValueError):
+            PokerGame(sim_mode=True).deck_for_hand(1)
+
     def test_setup_cpu_only_game(self):
         """CPU専用ゲームセットアップのテスト"""
         game = PokerGame()
@@ -0,0 +1,583 @@
+"""
+Tests for poker.game_history module
+"""
+
+import sqlite3
+import threading
+
+import pytest
+from poker.game import PokerGame
+from poker import game_history
+from poker.game_history import GameHistoryDB, GameHistoryReader
+
+
+def _committed_hands(db_path):
+    """別の接続から見えるハンド数（コミット済みの行だけが見える）"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM hands").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _play_hand(db):
+    hand_id = db.start_new_hand(10, 20, 0, [0, 1])
+    db.record_action(hand_id, "preflop", 0, "call", 20, 40)
+    db.record_community_cards(hand_id, "flop", ["A♠", "K♥", "Q♣"])
+    db.record_showdown(hand_id, 0, ["J♠", "10♠"], "Straight", 40)
+    db.end_hand(hand_id)
+    return hand_id
+
+
+class TestWriteBatching:
+    """書き込みのバッチ化のテスト"""
+
+    def test_commits_every_n_hands(self, tmp_path):
+        """指定したハンド数ごとにまとめてコミットされることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path, batch_hands=2)
+
+        hand_id = _play_hand(db)
+        # コミットまではメモリ上に溜めるだけなので、同じ接続からも見えない
+        assert db.get_hand_history(hand_id) is None
+        assert _committed_hands(path) == 0
+
+        _play_hand(db)
+        assert _committed_hands(path) == 2
+
+        _play_hand(db)
+        db.close()  # まとめている書き込みは閉じるときにコミットされる
+        assert _committed_hands(path) == 3
+
+    def test_commits_each_write_without_batching(self, tmp_path):
+        """バッチ化しない場合は書き込みごとにコミットされることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path)
+
+        db.start_new_hand(10, 20, 0, [0, 1])
+        assert _committed_hands(path) == 1
+        db.close()
+
+    def test_game_writes_in_progress_hand_by_default(self, tmp_path, monkeypatch):
+        """通常のゲームでは進行中のハンドのアクションも他の接続からすぐに見えることを確認"""
+        monkeypatch.chdir(tmp_path)
+        game = PokerGame(seed=1)
+        assert game.db.batch_hands is None
+
+        hand_id = game.db.start_new_hand(10, 20, 0, [0, 1])
+        game.db.record_action(hand_id, "preflop", 0, "call", 20, 40)
+        conn = sqlite3.connect(game.db.db_path)
+        try:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM actions WHERE hand_id = ?", (hand_id,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        assert count == 1
+        game.db.close()
+
+    def test_pragmas(self, tmp_path):
+        """WAL モードと synchronous プラグマが設定されることを確認"""
+        db = GameHistoryDB(db_path=str(tmp_path / "history.sqlite3"), synchronous="off")
+
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+        db.close()
+
+    def test_invalid_options(self, tmp_path):
+        """不正な設定はエラーになることを確認"""
+        with pytest.raises(ValueError):
+            GameHistoryDB(db_path=str(tmp_path / "a.sqlite3"), batch_hands=0)
+        with pytest.raises(ValueError):
+            GameHistoryDB(db_path=str(tmp_path / "b.sqlite3"), synchronous="FAST")
+
+
+class TestBackgroundWriter:
+    """書き込みスレッドによる非同期書き込みのテスト"""
+
+    def test_same_rows_as_direct_writes(self, tmp_path):
+        """直接書き込む場合と同じ行が記録され、flush 後に読めることを確認"""
+        direct = GameHistoryDB(db_path=str(tmp_path / "direct.sqlite3"), batch_hands=1)
+        background = GameHistoryDB(
+            db_path=str(tmp_path / "background.sqlite3"), batch_hands=1, async_writes=True
+        )
+
+        direct_ids = [_play_hand(direct) for _ in range(3)]
+        background_ids = [_play_hand(background) for _ in range(3)]
+        background.flush()
+
+        assert background_ids == direct_ids == [1, 2, 3]
+        for hand_id in direct_ids:
+            expected = direct.get_hand_history(hand_id)
+            actual = background.get_hand_history(hand_id)
+            for hand in (expected, actual):
+                hand.pop("timestamp")
+                hand.pop("ended_at")
+                hand.pop("session_id")
+                for row in hand["actions"]:
+                    row.pop("session_id")
+                for row in hand["actions"] + hand["showdown_results"]:
+                    row.pop("timestamp")
+            assert actual == expected
+        # 各ハンドの5行に、集計テーブルの UPSERT（プレイヤー2人 + アクション回数1行）と
+        # セッション一覧の UPSERT が加わる
+        assert background.writer_stats()["rows_written"] == 3 * (5 + 3 + 1)
+        assert direct.writer_stats()["rows_written"] == 3 * (5 + 3 + 1)
+        direct.close()
+        background.close()
+
+    def test_close_writes_pending_rows(self, tmp_path):
+        """close で未コミットの記録も書き出され、次に開いたときは続きの hand_id になることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path, batch_hands=100, async_writes=True)
+        _play_hand(db)
+        _play_hand(db)
+        db.close()
+        assert _committed_hands(path) == 2
+
+        db = GameHistoryDB(db_path=path, async_writes=True)
+        assert _play_hand(db) == 3
+        db.close()
+
+    def test_backpressure_is_measured(self, tmp_path):
+        """書き込みが詰まるとキューが上限で止まり、記録側が待った回数が記録されることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path, batch_hands=1, async_writes=True, queue_size=2)
+
+        # 別の接続が書き込みロックを持っている間は書き込みスレッドが進めない
+        blocker = sqlite3.connect(path, check_same_thread=False)
+        blocker.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.2, blocker.commit)
+        release.start()
+        for _ in range(6):
+            _play_hand(db)
+        db.flush()
+        release.join()
+        blocker.close()
+
+        stats = db.writer_stats()
+        assert stats["blocked_puts"] > 0
+        assert stats["blocked_seconds"] > 0
+        assert stats["peak_queue_depth"] <= 2
+        assert stats["batches_sent"] == 7  # 6ハンド + flush
+        db.close()
+        assert _committed_hands(path) == 6
+
+    def test_writer_error_is_raised(self, tmp_path):
+        """書き込みスレッドでのエラーが flush で送出されることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path, async_writes=True)
+        other = sqlite3.connect(path)
+        other.execute("DROP TABLE actions")
+        other.close()
+
+        _play_hand(db)
+        with pytest.raises(sqlite3.OperationalError):
+            db.flush()
+        with pytest.raises(sqlite3.OperationalError):
+            db.record_action(1, "flop", 0, "check")
+        with pytest.raises(sqlite3.OperationalError):
+            db.close()
+
+
+class TestBulkFetch:
+    """複数ハンドの一括取得のテスト"""
+
+    def test_matches_single_hand_fetch(self, tmp_path, monkeypatch):
+        """一括取得の結果がハンドごとの取得と一致し、指定した順に並ぶことを確認"""
+        monkeypatch.setattr("poker.game_history._FETCH_CHUNK_SIZE", 2)
+        db = GameHistoryDB(db_path=str(tmp_path / "history.sqlite3"), batch_hands=1)
+        hand_ids = [_play_hand(db) for _ in range(5)]
+        db.record_action(hand_ids[2], "turn", 1, "fold")
+        db.flush()
+
+        requested = [4, 99, 1, 3, 3]
+        hands = db.get_hands(requested)
+
+        assert [hand["hand_id"] for hand in hands] == [4, 1, 3, 3]
+        assert hands == [db.get_hand_history(hand_id) for hand_id in (4, 1, 3, 3)]
+        assert len(hands[2]["actions"]) == 2
+        assert db.get_recent_hands(3) == [db.get_hand_history(i) for i in (5, 4, 3)]
+        assert db.get_hands([]) == []
+        db.close()
+
+
+def _legacy_action_stats(db, player_id):
+    """集計テーブルを使わずに actions / showdown_results を直接集計する"""
+    cursor = db.conn.cursor()
+    cursor.execute(
+        "SELECT action_type, COUNT(*) FROM actions WHERE player_id = ? GROUP BY action_type",
+        (player_id,),
+    )
+    action_counts = dict(cursor.fetchall())
+    cursor.execute(
+        "SELECT COUNT(DISTINCT hand_id) FROM actions WHERE player_id = ?", (player_id,)
+    )
+    hands_played = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        SELECT COUNT(*), SUM(CASE WHEN winnings > 0 THEN 1 ELSE 0 END), SUM(winnings)
+        FROM showdown_results WHERE player_id = ?
+    """,
+        (player_id,),
+    )
+    showdowns, wins, winnings = cursor.fetchone()
+    return {
+        "hands_played": hands_played,
+        "action_counts": action_counts,
+        "showdowns": showdowns,
+        "showdown_wins": wins or 0,
+        "total_winnings": winnings or 0,
+    }
+
+
+class TestPlayerStats:
+    """プレイヤー別の集計テーブルのテスト"""
+
+    def _record_hands(self, db):
+        # ハンド1: 2がレイズ、1がコールしてフロップへ。フロップで2がレイズ、1がコールして2が勝つ
+        hand_id = db.start_new_hand(10, 20, 0, [0, 1, 2])
+        db.record_action(hand_id, "preflop", 0, "small_blind", 10, 10)
+        db.record_action(hand_id, "preflop", 1, "big_blind", 20, 30)
+        db.record_action(hand_id, "preflop", 2, "raise", 60, 90)
+        db.record_action(hand_id, "preflop", 0, "fold")
+        db.record_action(hand_id, "preflop", 1, "call", 40, 130)
+        db.record_community_cards(hand_id, "flop", ["A♠", "K♥", "Q♣"])
+        db.record_action(hand_id, "flop", 1, "check")
+        db.record_action(hand_id, "flop", 2, "raise", 100, 230)
+        db.record_action(hand_id, "flop", 1, "call", 100, 330)
+        db.record_showdown(hand_id, 1, ["2♠", "3♠"], "High Card", 0)
+        db.record_showdown(hand_id, 2, ["A♥", "A♦"], "Three of a Kind", 330)
+        db.end_hand(hand_id)
+
+        # ハンド2: 0のレイズに全員フォールド
+        hand_id = db.start_new_hand(10, 20, 1, [0, 1, 2])
+        db.record_action(hand_id, "preflop", 1, "small_blind", 10, 10)
+        db.record_action(hand_id, "preflop", 2, "big_blind", 20, 30)
+        db.record_action(hand_id, "preflop", 0, "raise", 60, 90)
+        db.record_action(hand_id, "preflop", 1, "fold")
+        db.record_action(hand_id, "preflop", 2, "fold")
+        db.end_hand(hand_id)
+
+    def _assert_hud(self, db):
+        winner = db.get_player_stats(2)
+        assert winner["hands_dealt"] == 2
+        assert winner["vpip"] == winner["pfr"] == 0.5
+        assert winner["aggression_factor"] is None  # コールがない
+        assert winner["wtsd"] == winner["wsd"] == 1.0
+        assert winner["total_winnings"] == 330
+        assert winner["action_counts_by_street"] == {
+            "flop": {"raise": 1},
+            "preflop": {"big_blind": 1, "fold": 1, "raise": 1},
+        }
+
+        caller = db.get_player_stats(1)
+        assert caller["vpip"] == 0.5
+        assert caller["pfr"] == 0.0
+        assert caller["aggression_factor"] == 0.0
+        assert caller["saw_flop"] == 1
+        assert caller["wtsd"] == 1.0
+        assert caller["wsd"] == 0.0
+
+        raiser = db.get_player_stats(0)
+        assert raiser["vpip"] == raiser["pfr"] == 0.5
+        assert raiser["saw_flop"] == 0
+        assert raiser["wtsd"] is None
+
+        assert db.get_player_stats(9)["hands_dealt"] == 0
+
+    def test_hud_values(self, tmp_path):
+        """VPIP・PFR・AF・WTSD・W$SD が記録から正しく集計されることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path, batch_hands=100)
+        self._record_hands(db)
+        # 集計はコミットした記録と同じトランザクションで反映される
+        assert db.get_player_stats(2)["hands_dealt"] == 0
+        db.flush()
+        self._assert_hud(db)
+        db.close()
+
+        db = GameHistoryDB(db_path=path, session_id=db.session_id)
+        self._assert_hud(db)
+        db.close()
+
+    def test_background_writer_updates_stats(self, tmp_path):
+        """書き込みスレッドを使う場合も集計テーブルが更新されることを確認"""
+        db = GameHistoryDB(db_path=str(tmp_path / "history.sqlite3"), async_writes=True)
+        self._record_hands(db)
+        db.flush()
+        self._assert_hud(db)
+        db.close()
+
+    def test_matches_full_scan_after_games(self, tmp_path, monkeypatch):
+        """実際のゲームの記録で、集計テーブルの値が履歴の全走査と一致することを確認"""
+        monkeypatch.chdir(tmp_path)
+        game = PokerGame(seed=3)
+        game.setup_cpu_only_game()
+        for _ in range(30):
+            for player in game.players:
+                if player.chips <= 0:
+                    player.chips = game.initial_chips
+            game.play_hand()
+        db = game.db
+
+        # ブラインドは記録中のハンドに入り、フォールドで終わったハンドも終了が記録される
+        for hand in db.get_recent_hands(30):
+            assert hand["ended_at"] is not None
+            assert [a["action_type"] for a in hand["actions"][:2]] == [
+                "small_blind",
+                "big_blind",
+            ]
+
+        for player in game.players:
+            stats = db.get_player_action_stats(player.id)
+            expected = _legacy_action_stats(db, player.id)
+            assert {key: stats[key] for key in expected} == expected
+            assert db.get_player_stats(player.id)["hands_dealt"] == 30
+
+        before = [db.get_player_stats(player.id) for player in game.players]
+        db.rebuild_player_stats()
+        assert [db.get_player_stats(player.id) for player in game.players] == before
+        db.close()
+
+    def test_existing_db_is_backfilled(self, tmp_path):
+        """集計テーブルがない既存のDBを開くと、履歴から集計が作られることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path)
+        self._record_hands(db)
+        db.conn.execute("DROP TABLE player_stats")
+        db.conn.execute("DROP TABLE player_action_counts")
+        db.close()
+
+        db = GameHistoryDB(db_path=path, session_id=db.session_id)
+        self._assert_hud(db)
+        db.close()
+
+
+def _legacy_db(tmp_path):
+    """2ハンドを記録した旧形式（session_id 列と集計テーブルがない）のDBを作る"""
+    path = str(tmp_path / "game_history_20240101_000000_abcd.sqlite3")
+    db = GameHistoryDB(db_path=path, batch_hands=1)
+    _play_hand(db)
+    _play_hand(db)
+    db.close()
+
+    conn = sqlite3.connect(path)
+    for table in ("sessions", "session_players", "player_stats", "player_action_counts"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.execute("DROP INDEX idx_hands_session_id")
+    conn.execute("DROP INDEX idx_actions_session_player")
+    conn.execute("ALTER TABLE hands DROP COLUMN session_id")
+    conn.execute("ALTER TABLE actions DROP COLUMN session_id")
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestSessions:
+    """1つのDBに複数のセッションを記録するテスト"""
+
+    def test_sessions_share_one_file(self, tmp_path):
+        """同時に書き込むセッションの hand_id が重ならず、読み込みがセッションごとに分かれることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        first = GameHistoryDB(db_path=path, batch_hands=1, session_id="first")
+        second = GameHistoryDB(db_path=path, batch_hands=1, async_writes=True, session_id="second")
+
+        first_ids, second_ids = [], []
+        for _ in range(2):
+            first_ids.append(_play_hand(first))
+            second_ids.append(_play_hand(second))
+        first_ids.append(_play_hand(first))
+        second.flush()
+
+        block = game_history._HAND_ID_BLOCK_MIN
+        assert first_ids == [1, 2, 3]
+        assert second_ids == [block + 1, block + 2]
+        assert [hand["hand_id"] for hand in first.get_recent_hands(10)] == [3, 2, 1]
+        assert [hand["hand_id"] for hand in second.get_recent_hands(10)] == second_ids[::-1]
+        assert first.get_player_stats(0)["hands_dealt"] == 3
+        assert first.get_player_stats(0, session_id="second")["hands_dealt"] == 2
+        assert len(first.get_player_recent_actions(0, session_id="second")) == 2
+        assert {s["session_id"]: s["hands"] for s in first.get_sessions()} == {
+            "first": 3,
+            "second": 2,
+        }
+
+        # 最後に予約した接続が閉じると使わなかった hand_id が返り、続きから採番される
+        first.close()
+        second.close()
+        db = GameHistoryDB(db_path=path, batch_hands=1)
+        assert _play_hand(db) == block + 3
+        db.close()
+
+    def test_truncate_session_before_resume(self, tmp_path):
+        """チェックポイント後のハンドを消してから、同じセッションに続けて記録できることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        db = GameHistoryDB(db_path=path, session_id="run")
+        other = GameHistoryDB(db_path=path, session_id="other")
+        checkpoint = _play_hand(db)
+        _play_hand(other)
+        _play_hand(db)  # チェックポイントの後に記録され、再開後に再実行されるハンド
+        db.close()
+
+        resumed = GameHistoryDB(db_path=path, session_id="run")
+        resumed.truncate_session(checkpoint)
+        replayed = _play_hand(resumed)
+
+        assert [h["hand_id"] for h in resumed.get_recent_hands(10)] == [replayed, checkpoint]
+        assert resumed.get_player_stats(0)["hands_dealt"] == 2
+        assert resumed.get_player_stats(0)["showdown_wins"] == 2
+        assert resumed.get_player_stats(0, session_id="other")["hands_dealt"] == 1
+        assert {s["session_id"]: s["hands"] for s in resumed.get_sessions()} == {
+            "run": 2,
+            "other": 1,
+        }
+        other.close()
+        resumed.close()
+
+    def test_unbatched_sessions_do_not_skip_hand_ids(self, tmp_path):
+        """書き込みごとにコミットするセッションは閉じなくても hand_id が連番になることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        sessions = [GameHistoryDB(db_path=path, session_id=f"s{i}") for i in range(3)]
+
+        hand_ids = [_play_hand(db) for db in sessions for _ in range(2)]
+
+        assert hand_ids == [1, 2, 3, 4, 5, 6]
+        # まとめて書き込む接続が予約した範囲は避けて採番される
+        batched = GameHistoryDB(db_path=path, batch_hands=10, session_id="batched")
+        assert _play_hand(batched) == 7
+        assert _play_hand(sessions[0]) == 7 + game_history._HAND_ID_BLOCK_MIN
+        for db in sessions + [batched]:
+            db.close()
+
+    def test_session_catalog(self, tmp_path, monkeypatch):
+        """ゲームを開始するとセッションが一覧に載り、参照だけの接続はセッションを作らないことを確認"""
+        monkeypatch.chdir(tmp_path)
+        reader = GameHistoryDB()
+        assert reader.db_path == game_history.DEFAULT_DB_PATH
+        assert reader.get_latest_session_id() is None
+
+        old = PokerGame(uuid_suffix="old")
+        old.setup_cpu_only_game()
+        game = PokerGame(uuid_suffix="new")
+        game.setup_cpu_only_game()
+        game.play_hand()
+        game.db.close()
+        old.db.close()
+
+        sessions = reader.get_sessions()
+        assert [s["session_id"] for s in sessions] == [game.db.session_id, old.db.session_id]
+        assert game.db.session_id.endswith("_new")
+        assert sessions[0]["hands"] == 1
+        assert sessions[0]["last_hand_at"] is not None
+        assert sessions[1]["hands"] == 0
+        assert sessions[0]["players"] == {p.id: p.name for p in game.players}
+        assert reader.get_latest_session_id() == game.db.session_id
+        reader.close()
+
+    def test_stats_by_name_across_sessions(self, tmp_path):
+        """席が変わっても、プレイヤー名でセッションをまたいだ集計が取れることを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        for seats in (["Alice", "Bob"], ["Bob", "Alice"]):
+            db = GameHistoryDB(db_path=path, batch_hands=1)
+            for player_id, name in enumerate(seats):
+                db.register_player(player_id, name)
+            _play_hand(db)
+            db.close()
+
+        db = GameHistoryDB(db_path=path)
+        for name in ("Alice", "Bob"):
+            stats = db.get_player_stats_by_name(name)
+            assert stats["sessions"] == 2
+            assert stats["hands_dealt"] == 2
+            assert stats["vpip"] == 0.5
+            assert stats["total_winnings"] == 40
+            assert stats["action_counts_by_street"] == {"preflop": {"call": 1}}
+
+        unknown = db.get_player_stats_by_name("Carol")
+        assert unknown["sessions"] == 0
+        assert unknown["hands_dealt"] == 0
+        assert unknown["vpip"] is None
+        db.close()
+
+    def test_legacy_file_is_migrated(self, tmp_path):
+        """実行ごとに作っていた旧形式のDBは、ファイル名のセッションとして読めることを確認"""
+        path = _legacy_db(tmp_path)
+        db = GameHistoryDB(db_path=path)
+        session_id = db.get_latest_session_id()
+        assert session_id == "game_history_20240101_000000_abcd"
+        assert db.get_sessions()[0]["hands"] == 2
+        assert [h["hand_id"] for h in db.get_recent_hands(5, session_id=session_id)] == [2, 1]
+        assert db.get_player_stats(0, session_id=session_id)["showdown_wins"] == 2
+        db.close()
+
+    def test_agent_api_follows_latest_session(self, tmp_path, monkeypatch):
+        """エージェント向けAPIは呼び出しのたびに最新のセッションを参照することを確認"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(game_history, "_db_instance", None)
+        first = GameHistoryDB(batch_hands=1, session_id="first")
+        first.register_player(0, "Alice")
+        _play_hand(first)
+        assert game_history.get_last_hand_id() == 1
+
+        second = GameHistoryDB(batch_hands=1, session_id="second")
+        second.register_player(0, "Alice")
+        hand_id = _play_hand(second)
+        assert game_history.get_last_hand_id() == hand_id
+        history = game_history.get_game_history(player_id=0)
+        assert [hand["hand_id"] for hand in history["recent_hands"]] == [hand_id]
+        assert game_history.get_opponent_stats([0])[0]["hands_played"] == 1
+        assert game_history.get_last_hand_id(session_id="first") == 1
+        # 読み込み専用の接続で読み、エージェント側が空のセッションを追加しない
+        assert not isinstance(game_history._db_instance, GameHistoryDB)
+        assert [s["session_id"] for s in second.get_sessions()] == ["second", "first"]
+
+        first.close()
+        second.close()
+        game_history._db_instance.close()
+
+
+class TestReader:
+    """読み込み専用の接続のテスト"""
+
+    def test_reads_latest_session(self, tmp_path):
+        """最後に開始したセッションを読み、書き込みはできないことを確認"""
+        path = str(tmp_path / "history.sqlite3")
+        old = GameHistoryDB(db_path=path, batch_hands=1, session_id="old")
+        _play_hand(old)
+        new = GameHistoryDB(db_path=path, batch_hands=1, session_id="new")
+        new.register_player(0, "Alice")
+        hand_id = _play_hand(new)
+
+        reader = GameHistoryReader(db_path=path)
+        assert reader.session_id == "new"
+        assert [hand["hand_id"] for hand in reader.get_recent_hands(5)] == [hand_id]
+        assert reader.get_player_stats(0)["hands_dealt"] == 1
+        assert reader.get_player_stats_by_name("Alice")["sessions"] == 1
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            reader.conn.execute("DELETE FROM hands")
+        reader.close()
+        old.close()
+        new.close()
+
+    def test_does_not_create_or_migrate(self, tmp_path):
+        """存在しないファイルは作らず、旧形式のファイルは移行せずにそのまま読むことを確認"""
+        missing = tmp_path / "missing.sqlite3"
+        with pytest.raises(sqlite3.OperationalError):
+            GameHistoryReader(db_path=str(missing))
+        assert not missing.exists()
+
+        path = _legacy_db(tmp_path)
+        reader = GameHistoryReader(db_path=path)
+        assert reader.session_id is None
+        assert [hand["hand_id"] for hand in reader.get_recent_hands(5)] == [2, 1]
+        reader.close()
+
+        conn = sqlite3.connect(path)
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(hands)")}
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        finally:
+            conn.close()
+        assert "session_id" not in columns
+        assert "sessions" not in tables
@@ -0,0 +1,106 @@
+"""
+Tests for poker.league module
+"""
+
+import pytest
+from poker.game_history import GameHistoryDB
+from poker.league import (
+    League,
+    MatchSpec,
+    Rating,
+    play_match,
+    update_elo,
+    update_trueskill,
+)
+from poker.player_models import Player
+
+
+class PassivePlayer(Player):
+    """チェックできるときだけチェックし、ベットには必ずフォールドするテスト用プレイヤー"""
+
+    def make_decision(self, game_state):
+        if any(action.startswith("check") for action in game_state.actions):
+            return {"action": "check", "amount": 0}
+        return {"action": "fold", "amount": 0}
+
+
+class TestRatings:
+    """レーティング更新のテスト"""
+
+    def test_trueskill_update(self):
+        """勝者の平均が上がり、両者の不確かさが小さくなることを確認"""
+        winner, loser = Rating(), Rating()
+        update_trueskill(winner, loser)
+
+        assert winner.mu > 25 > loser.mu
+        assert winner.mu - 25 == pytest.approx(25 - loser.mu)
+        assert winner.sigma < 25 / 3
+        assert loser.sigma < 25 / 3
+
+    def test_elo_update(self):
+        """Elo が対称に移動し、引き分けなら同じ値のままであることを確認"""
+        a, b = Rating(), Rating()
+        update_elo(a, b, 1.0)
+        assert a.elo == pytest.approx(1512)
+        assert b.elo == pytest.approx(1488)
+
+        c, d = Rating(), Rating()
+        update_elo(c, d, 0.5)
+        assert c.elo == d.elo == 1500
+
+
+class TestLeague:
+    """リーグ戦のテスト"""
+
+    def test_duplicate_match_cancels_luck(self):
+        """同じ戦略同士のデュプリケートマッチは引き分けになることを確認"""
+        match = play_match(
+            MatchSpec(
+                round=1,
+                agent_a="random",
+                agent_b="poker.player_models.RandomPlayer",
+                seed=3,
+                hands=30,
+            )
+        )
+
+        assert match.hands == 60
+        assert match.net_a == match.net_b == 0
+        assert match.winner is None
+
+    def test_league_stops_when_ranking_is_settled(self, tmp_path):
+        """順位が確定した組み合わせは上限前に打ち切られ、結果がDBに記録されることを確認"""
+        db = GameHistoryDB(db_path=str(tmp_path / "league.sqlite3"))
+        league = League(
+            ["random", "tests.test_league.PassivePlayer"],
+            hands_per_match=30,
+            min_matches=2,
+            max_matches=30,
+            workers=1,
+            seed=0,
+            db=db,
+        )
+        result = league.run()
+
+        assert len(result.matches) < 30
+        assert result.settled_pairs == 1
+        assert result.matches_saved == 30 - len(result.matches)
+        assert result.ranking()[0][0] == "random"
+        assert league.pairing_settled("random", "tests.test_league.PassivePlayer")
+
+        rows = db.get_league_matches(result.league_id)
+        assert len(rows) == len(result.matches)
+        assert rows[0]["winner"] == "random"
+        assert rows[0]["net_a"] == -rows[0]["net_b"]
+        db.close()
+
+    def test_invalid_league(self, tmp_path):
+        """不正な設定はエラーになることを確認"""
+        db = GameHistoryDB(db_path=str(tmp_path / "league.sqlite3"))
+        with pytest.raises(ValueError):
+            League(["random"], db=db)
+        with pytest.raises(ValueError):
+            League(["random", "random"], db=db)
+        with pytest.raises(ValueError):
+            League(["random", "nonexistent"], db=db)
+        db.close()
@@ -94,6 +94,31 @@ class TestCard:
         card = Card(14, Suit.SPADES)
         assert repr(card) == "Card(A, spades)"
 
+    def test_integer_representation(self):
+        """カードが整数表現（0〜51）を持つことを確認"""
+        assert int(Card(2, Suit.HEARTS)) == 0
+        assert int(Card(14, Suit.SPADES)) == 51
+        assert Card.from_index(51) == Card(14, Suit.SPADES)
+        assert Card(2, Suit.HEARTS)  # 0番のカードも真
+
+    def test_from_str(self):
+        """文字列表記（記号・英字）からの変換テスト"""
+        assert Card.from_str("A♠") == Card(14, Suit.SPADES)
+        assert Card.from_str("Th") == Card(10, Suit.HEARTS)
+        assert Card.from_str("10♦") == Card(10, Suit.DIAMONDS)
+        with pytest.raises(ValueError, match="Invalid card string"):
+            Card.from_str("1x")
+
+    def test_cards_are_shared_instances(self):
+        """同じカードは同一インスタンスであることを確認"""
+        import copy
+        import pickle
+
+        card = Card(13, Suit.CLUBS)
+        assert Card(13, Suit.CLUBS) is card
+        assert pickle.loads(pickle.dumps(card)) is card
+        assert copy.deepcopy(card) is card
+
 
 class TestDeck:
     """Deckクラスのテスト"""
@@ -140,6 +165,11 @@ class TestDeck:
         with pytest.raises(ValueError, match="Cannot deal from empty deck"):
             deck.deal_card()
 
+    def test_deck_cards_are_unique_integers(self):
+        """デッキが0〜51の整数表現を1枚ずつ持つことを確認"""
+        deck = Deck()
+        assert sorted(int(card) for card in deck.cards) == list(range(52))
+
     def test_reset(self):
         """デッキリセットのテスト"""
         deck = Deck()
@@ -152,6 +182,28 @@ class TestDeck:
         deck.reset()
         assert deck.cards_remaining() == 52
 
+    def test_lazy_deck_deals_unique_cards(self):
+        """遅延シャッフルのデッキでも52枚が重複なく配られることを確認"""
+        deck = Deck(lazy=True)
+        dealt = [deck.deal_card() for _ in range(52)]
+
+        assert sorted(int(card) for card in dealt) == list(range(52))
+        with pytest.raises(ValueError, match="Cannot deal from empty deck"):
+            deck.deal_card()
+
+        deck.reset()
+        assert deck.cards_remaining() == 52
+
+    def test_deck_with_rng_is_reproducible(self):
+        """同じ乱数生成器の状態からは同じ順序で配られることを確認"""
+        for lazy in (False, True):
+            deck1 = Deck(lazy=lazy, rng=random.Random(123))
+            deck2 = Deck(lazy=lazy, rng=random.Random(123))
+            dealt = [deck1.deal_card() for _ in range(52)]
+
+            assert dealt == [deck2.deal_card() for _ in range(52)]
+            assert sorted(int(card) for card in dealt) == list(range(52))
+
     def test_shuffle(self):
         """シャッフルのテスト（統計的テスト）"""
         deck1 = Deck()
@@ -0,0 +1,103 @@
+"""
+Tests for poker.preflop_equity module
+"""
+
+import pytest
+from poker import preflop_equity
+from poker.preflop_equity import (
+    NUM_HANDS,
+    canonical_hand,
+    equity_vs_random,
+    hand_index,
+    hand_label,
+    load_table,
+    lookup,
+    write_table,
+)
+from poker.game_models import Card, Suit
+
+
+class TestHandNotation:
+    """正規化ハンド表記のテスト"""
+
+    def test_label_index_round_trip(self):
+        """169種類のハンドがインデックスと1対1に対応することを確認"""
+        labels = [hand_label(i) for i in range(NUM_HANDS)]
+
+        assert len(set(labels)) == NUM_HANDS
+        assert all(hand_index(label) == i for i, label in enumerate(labels))
+        assert labels[0] == "AA"
+        assert labels[1] == "AKs"
+        assert labels[13] == "AKo"
+        assert labels[-1] == "22"
+
+    def test_canonical_hand_from_cards(self):
+        """カード2枚から正規化ハンド表記に変換できることを確認"""
+        assert canonical_hand([Card(13, Suit.HEARTS), Card(14, Suit.HEARTS)]) == "AKs"
+        assert canonical_hand(["Td", "9c"]) == "T9o"
+        assert canonical_hand(["7♠", "7♥"]) == "77"
+        assert canonical_hand("akS") == "AKs"
+        assert hand_index(["As", "Kd"]) == hand_index("AKo")
+
+    def test_invalid_notation(self):
+        """不正な表記はエラーになることを確認"""
+        for invalid in ("AK", "KAs", "AAs", "XYo", "A"):
+            with pytest.raises(ValueError):
+                hand_index(invalid)
+        with pytest.raises(ValueError, match="Duplicate"):
+            canonical_hand(["As", "As"])
+
+
+class TestLookup:
+    """同梱テーブル参照のテスト"""
+
+    def test_known_matchups(self):
+        """代表的なマッチアップのエクイティが既知の値に近いことを確認"""
+        assert lookup("AA", "KK") == pytest.approx(0.82, abs=0.015)
+        assert lookup("AKs", "QQ") == pytest.approx(0.46, abs=0.015)
+        assert lookup("22", "AKo") == pytest.approx(0.52, abs=0.015)
+        assert lookup(["As", "Ah"], ["Kd", "Kc"]) == lookup("AA", "KK")
+
+    def test_matrix_is_antisymmetric(self):
+        """lookup(a, b) + lookup(b, a) が1になることを確認"""
+        for hand_a, hand_b in [("AA", "72o"), ("T9s", "AKo"), ("55", "JTs")]:
+            assert lookup(hand_a, hand_b) + lookup(hand_b, hand_a) == pytest.approx(
+                1.0, abs=2e-5
+            )
+        assert lookup("AKs", "AKs") == pytest.approx(0.5, abs=1e-4)
+
+    def test_equity_vs_random(self):
+        """ランダムハンドに対するエクイティ"""
+        assert equity_vs_random("AA") == pytest.approx(0.85, abs=0.01)
+        assert equity_vs_random("72o") == pytest.approx(0.35, abs=0.01)
+        assert equity_vs_random("AKs") > equity_vs_random("AKo")
+
+
+class TestTableFile:
+    """テーブルファイルの書き出し・読み込みのテスト"""
+
+    def test_write_and_load_round_trip(self, tmp_path):
+        """書き出したテーブルを読み込んで参照できることを確認"""
+        np = pytest.importorskip("numpy")
+        matrix = np.full((NUM_HANDS, NUM_HANDS), 0.5)
+        matrix[hand_index("AA"), hand_index("KK")] = 0.25
+        vs_random = np.linspace(0.0, 1.0, NUM_HANDS)
+        path = write_table(matrix, vs_random, str(tmp_path / "table.bin"))
+
+        try:
+            load_table(path)
+            assert lookup("AA", "KK") == pytest.approx(0.25, abs=1e-4)
+            assert equity_vs_random(hand_label(NUM_HANDS - 1)) == pytest.approx(1.0)
+        finally:
+            load_table()
+
+    def test_rejects_invalid_file(self, tmp_path):
+        """形式の異なるファイルはエラーになることを確認"""
+        path = tmp_path / "broken.bin"
+        path.write_bytes(b"not a table")
+
+        with pytest.raises(ValueError, match="Invalid preflop equity table"):
+            load_table(str(path))
+        assert preflop_equity._table_path == preflop_equity.DEFAULT_TABLE_PATH or (
+            preflop_equity._table is None
+        )
@@ -161,6 +161,8 @@ def test_side_pot_multiple_allins_three_layers():
     assert pid_to_win.get(1, 0) == 210
     assert pid_to_win.get(2, 0) == 160
     assert pid_to_win.get(3, 0) == 0
+    # Full winner ordering (best to worst)
+    assert results["ranking"] == [[0], [1], [2], [3]]
     # Pot fully distributed
     assert game.pot == 0
 
@@ -272,3 +274,53 @@ def test_side_pot_tie_split_remainder_by_id():
     assert pid_to_win.get(2, 0) == 0
     assert pid_to_win.get(3, 0) == 0
     assert game.pot == 0
+
+
+def test_uncalled_bet_returned_to_folded_bettor():
+    """Chips a folded player put in above every live contribution are refunded.
+
+    Scenario contributions:
+    - P0 folded after investing 240 (uncalled above 200)
+    - P1 all-in 200
+    - P2 all-in 150
+
+    Pot layers:
+      main  = 150 * 3 = 450 (eligible: P1,P2)
+      side1 = 50 * 2 = 100 (eligible: P1)
+      side2 = 40 * 1 = 40 (nobody live -> returned to P0)
+    """
+
+    game = PokerGame()
+    p0 = RandomPlayer(0, "P0", 0)
+    p1 = RandomPlayer(1, "P1", 0)
+    p2 = RandomPlayer(2, "P2", 0)
+    for player in (p0, p1, p2):
+        game.add_player(player)
+
+    game.community_cards = [
+        Card(14, Suit.CLUBS),
+        Card(13, Suit.DIAMONDS),
+        Card(12, Suit.HEARTS),
+        Card(2, Suit.SPADES),
+        Card(3, Suit.SPADES),
+    ]
+    p0.hole_cards = [Card(8, Suit.CLUBS), Card(7, Suit.DIAMONDS)]
+    p1.hole_cards = [Card(9, Suit.CLUBS), Card(9, Suit.DIAMONDS)]  # Pair 9
+    p2.hole_cards = [Card(14, Suit.DIAMONDS), Card(14, Suit.HEARTS)]  # Trips A
+
+    p0.status = PlayerStatus.FOLDED
+    p1.status = PlayerStatus.ALL_IN
+    p2.status = PlayerStatus.ALL_IN
+    p0.total_bet_this_hand = 240
+    p1.total_bet_this_hand = 200
+    p2.total_bet_this_hand = 150
+    game.pot = 240 + 200 + 150
+
+    game.current_phase = GamePhase.SHOWDOWN
+    results = game.conduct_showdown()
+
+    pid_to_win = {r["player_id"]: r["winnings"] for r in results["results"]}
+    assert pid_to_win == {1: 100, 2: 450}
+    assert p0.chips == 40
+    # No chips are lost
+    assert p0.chips + p1.chips + p2.chips == 590
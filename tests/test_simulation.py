@@ -0,0 +1,143 @@
+"""
+Tests for poker.simulation module
+"""
+
+import pytest
+from poker.player_models import LLMApiPlayer, RandomPlayer
+from poker.simulation import (
+    AgentStats,
+    TableConfig,
+    create_player,
+    parse_agents,
+    rotate_seats,
+    run_simulation,
+    run_table,
+)
+
+
+class TestAgentSpec:
+    """エージェント指定の解析テスト"""
+
+    def test_parse_agents(self):
+        """人数付きの指定が座席順に展開されることを確認"""
+        assert parse_agents("random:2, poker.player_models.RandomPlayer:1") == [
+            "random",
+            "random",
+            "poker.player_models.RandomPlayer",
+        ]
+        assert parse_agents("random,random") == ["random", "random"]
+
+    def test_invalid_spec(self):
+        """不正な指定はエラーになることを確認"""
+        for spec in ("random:1", "random:x", "random:0,random:2", "random:11"):
+            with pytest.raises(ValueError):
+                parse_agents(spec)
+
+    def test_create_player(self):
+        """名前またはクラスパスからプレイヤーを生成できることを確認"""
+        player = create_player("poker.player_models.RandomPlayer", 3, 500)
+
+        assert isinstance(player, RandomPlayer)
+        assert player.id == 3
+        assert player.chips == 500
+        api_player = create_player("api:team1_agent", 2, 500)
+        assert isinstance(api_player, LLMApiPlayer)
+        assert api_player.app_name == "team1_agent"
+        assert api_player.chips == 500
+        with pytest.raises(ValueError, match="Unknown agent"):
+            create_player("nonexistent", 0, 500)
+        with pytest.raises(ValueError, match="Not a Player class"):
+            create_player("poker.game.PokerGame", 0, 500)
+
+
+class TestRunTable:
+    """1テーブル実行のテスト"""
+
+    def test_same_seed_same_result(self):
+        """同じシードなら同じ結果になることを確認"""
+        config = TableConfig(table_id=0, agents=["random"] * 3, hands=50, seed=7)
+
+        first = run_table(config)
+        second = run_table(config)
+
+        assert first.hands == 50
+        assert first.agents == second.agents
+
+    def test_chips_are_zero_sum(self):
+        """エージェント間の収支の合計が0になることを確認"""
+        agents = ["random", "poker.player_models.RandomPlayer"] * 2
+        result = run_table(TableConfig(table_id=0, agents=agents, hands=200, seed=1))
+
+        assert sum(stats.net_chips for stats in result.agents.values()) == 0
+        assert sum(stats.seats for stats in result.agents.values()) == 4
+        assert all(stats.hands_played > 0 for stats in result.agents.values())
+
+    def test_without_rebuy_stops_when_game_over(self):
+        """再購入なしではゲーム終了時点で打ち切られることを確認"""
+        config = TableConfig(
+            table_id=0,
+            agents=["random"] * 2,
+            hands=10000,
+            seed=3,
+            initial_chips=100,
+            rebuy=False,
+        )
+        result = run_table(config)
+
+        assert result.hands < config.hands
+        assert result.agents["random"].rebuys == 0
+
+
+class TestRunSimulation:
+    """複数テーブル実行のテスト"""
+
+    def test_serial_and_parallel_match(self):
+        """プロセスプールでも同一プロセス実行と同じ集計結果になることを確認"""
+        kwargs = dict(agents=["random"] * 4, tables=2, hands_per_table=30, seed=11)
+
+        serial = run_simulation(workers=1, **kwargs)
+        parallel = run_simulation(workers=2, **kwargs)
+
+        assert serial.hands == parallel.hands == 60
+        assert serial.agents == parallel.agents
+        assert serial.agents["random"].hands_played == 240
+
+    def test_to_dict(self):
+        """結果を辞書形式に変換できることを確認"""
+        result = run_simulation(["random"] * 2, tables=1, hands_per_table=10, seed=0)
+        data = result.to_dict()
+
+        assert data["hands"] == 10
+        assert data["agents"]["random"]["bb_per_100"] == 0.0
+
+    def test_duplicate_cancels_card_luck(self):
+        """デュプリケートでは同じ戦略のエージェント同士の収支がちょうど0になることを確認"""
+        agents = ["random", "poker.player_models.RandomPlayer"] * 2
+        result = run_simulation(
+            agents, tables=1, hands_per_table=40, seed=5, workers=1, duplicate=True
+        )
+
+        assert result.rotations == 4
+        assert result.hands == 160
+        for stats in result.agents.values():
+            # 同じ座席の乱数ストリームで同じ配牌を全座席分担当するため、運の差が残らない
+            assert stats.seats == 8
+            assert stats.net_chips == 0
+            assert stats.rebuys == 0
+
+    def test_rotate_seats(self):
+        """各エージェントが全座席を1回ずつ担当することを確認"""
+        agents = ["a", "b", "c"]
+
+        assert rotate_seats(agents, 0) == ["a", "b", "c"]
+        assert rotate_seats(agents, 1) == ["c", "a", "b"]
+        for seat in range(3):
+            assert {rotate_seats(agents, r)[seat] for r in range(3)} == set(agents)
+
+    def test_merge_stats(self):
+        """統計の加算"""
+        stats = AgentStats(seats=1, hands_played=10, net_chips=100)
+        stats.merge(AgentStats(seats=1, hands_played=5, hands_won=2, net_chips=-40))
+
+        assert stats == AgentStats(seats=2, hands_played=15, hands_won=2, net_chips=60)
+        assert stats.bb_per_100(20) == pytest.approx(20.0)
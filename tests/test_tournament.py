@@ -0,0 +1,127 @@
+"""
+Tests for poker.tournament module
+"""
+
+import pytest
+from poker.tournament import (
+    BlindLevel,
+    BlindSchedule,
+    Tournament,
+    TournamentConfig,
+    run_tournament,
+)
+
+
+class TestBlindSchedule:
+    """ブラインドスケジュールのテスト"""
+
+    def test_levels_advance_with_hands(self):
+        """配られたハンド数に応じてレベルが上がり、最後のレベルが続くことを確認"""
+        schedule = BlindSchedule([BlindLevel(10, 20, 5), BlindLevel(20, 40, 3)])
+
+        assert schedule.level_at(0) == BlindLevel(10, 20, 5)
+        assert schedule.level_index(4) == 0
+        assert schedule.level_index(5) == 1
+        assert schedule.level_index(100) == 1
+
+    def test_invalid_schedule(self):
+        """不正なスケジュールはエラーになることを確認"""
+        with pytest.raises(ValueError):
+            BlindSchedule([])
+        with pytest.raises(ValueError):
+            BlindSchedule([BlindLevel(20, 10, 5)])
+
+
+class TestTournament:
+    """トーナメント実行のテスト"""
+
+    def test_runs_to_single_winner(self):
+        """全員の順位が確定し、チップが優勝者に集まることを確認"""
+        result = run_tournament(
+            ["random"] * 23, seats_per_table=6, seed=4, threaded_decisions=False
+        )
+
+        assert result.tables == 4
+        assert [s.place for s in result.standings] == list(range(1, 24))
+        assert result.winner.chips == 23 * 2000
+        assert all(s.chips == 0 for s in result.standings[1:])
+        assert len({s.name for s in result.standings}) == 23
+
+    def test_same_seed_same_result(self):
+        """意思決定を直接呼ぶ場合は同じシードで同じ結果になることを確認"""
+        kwargs = dict(seats_per_table=5, seed=9, threaded_decisions=False)
+
+        first = run_tournament(["random"] * 12, **kwargs)
+        second = run_tournament(["random"] * 12, **kwargs)
+
+        assert first.standings == second.standings
+        assert first.hands == second.hands
+
+    def test_requests_in_flight_are_bounded(self):
+        """同時に処理中の意思決定リクエストが上限を超えないことを確認"""
+        result = run_tournament(["random"] * 30, seats_per_table=6, seed=2, max_in_flight=3)
+
+        assert 0 < result.peak_in_flight <= 3
+        assert result.decisions > 0
+        assert result.winner.place == 1
+
+    def test_blinds_rise_and_hand_limit(self):
+        """ブラインドが上がり、総ハンド数の上限でチップ順に打ち切られることを確認"""
+        schedule = BlindSchedule([BlindLevel(10, 20, 4), BlindLevel(50, 100, 4)])
+        result = run_tournament(
+            ["random"] * 8,
+            seats_per_table=4,
+            schedule=schedule,
+            max_hands=6,
+            seed=1,
+            threaded_decisions=False,
+        )
+
+        assert result.hands >= 6
+        assert result.blind_level == 1
+        chips = [s.chips for s in result.standings if s.chips > 0]
+        assert chips == sorted(chips, reverse=True)
+        assert sum(s.chips for s in result.standings) == 8 * 2000
+
+
+class TestTableBalancing:
+    """テーブルの人数調整のテスト"""
+
+    def test_short_table_is_broken_up(self):
+        """人数が減ったテーブルを解散し、残りのテーブルに振り分けることを確認"""
+        tournament = Tournament(["random"] * 10, TournamentConfig(seats_per_table=4, seed=0))
+        tournament._seat_players()
+        assert [len(t.entrants) for t in tournament.tables] == [4, 3, 3]
+
+        # テーブル0から3人がバストした状態にする
+        table = tournament.tables[0]
+        table.entrants = table.entrants[:1]
+        table.sync_players()
+        tournament._rebalance()
+
+        assert table.closed
+        assert table.game.players == []
+        assert sorted(len(t.entrants) for t in tournament.tables[1:]) == [3, 4]
+        for t in tournament.tables[1:]:
+            assert [p.id for p in t.game.players] == list(range(len(t.entrants)))
+            assert all(e.table_id == t.table_id for e in t.entrants)
+
+    def test_busy_table_receives_players_later(self):
+        """進行中のテーブルへの移動は次のハンドの前まで保留されることを確認"""
+        tournament = Tournament(["random"] * 12, TournamentConfig(seats_per_table=6, seed=0))
+        tournament._seat_players()
+        source, target = tournament.tables
+        target.entrants = target.entrants[:2]
+        target.sync_players()
+        target.busy = True
+
+        tournament._rebalance()
+
+        assert len(source.entrants) == 4
+        assert len(target.entrants) == 2
+        assert len(target.pending) == 2
+
+        target.busy = False
+        tournament._rebalance()
+        assert len(target.entrants) == 4
+        assert not target.pending